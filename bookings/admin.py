@@ -1,7 +1,14 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.html import format_html
+from .forms import BookingAdminForm
 from .models import (
-    EventType, Event, Booking,
-    Staff, Client, Appointment, AppointmentStatusHistory
+    EventType, Event, EventStatus, Booking,
+    Staff, Client, Appointment, AppointmentSeries, AppointmentStatusHistory,
+    OutboxJob, JobStatus, SeatsUnavailable,
 )
 
 @admin.register(EventType)
@@ -17,6 +24,22 @@ class EventAdmin(admin.ModelAdmin):
     search_fields = ("title",)
     date_hierarchy = "start"
     ordering = ("-start",)
+    actions = ["cancel_and_notify"]
+
+    @admin.action(description="Cancelar y avisar a los asistentes")
+    def cancel_and_notify(self, request, queryset):
+        from .jobs import enqueue_event_cancelled
+
+        # Los ya cancelados no se vuelven a avisar
+        events = list(queryset.exclude(status=EventStatus.CANCELLED))
+        for event in events:
+            event.cancel()
+            enqueue_event_cancelled(event)
+        skipped = queryset.count() - len(events)
+        message = f"{len(events)} eventos cancelados; avisos encolados."
+        if skipped:
+            message += f" {skipped} ya estaban cancelados."
+        self.message_user(request, message)
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
@@ -25,18 +48,75 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ("name", "email")
     date_hierarchy = "created_at"
     ordering = ("-created_at",)
+    form = BookingAdminForm
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        # save_model corre dentro del atomic de este view: si el UPDATE condicional de
+        # Booking.save() pierde la carrera contra otra reserva se revierte todo
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except SeatsUnavailable as exc:
+            messages.error(request, f"No se guardó la reserva: {exc}")
+            return redirect(request.get_full_path())
 
 @admin.register(Staff)
 class StaffAdmin(admin.ModelAdmin):
     list_display = ("name", "role", "specialty")
     search_fields = ("name", "role", "specialty")
     ordering = ("name",)
+    readonly_fields = ("calendar_feed",)
+
+    @admin.display(description="Calendario (.ics)")
+    def calendar_feed(self, obj):
+        if not obj.pk:
+            return "—"
+        from .views_calendar import staff_feed_url
+        return format_html('<a href="{0}">{0}</a>', staff_feed_url(obj.pk))
 
 @admin.register(Client)
 class ClientAdmin(admin.ModelAdmin):
     list_display = ("name", "phone", "email")
     search_fields = ("name", "email", "phone")
     ordering = ("name",)
+    actions = ["merge_selected"]
+    change_list_template = "admin/bookings/client/change_list.html"
+
+    @admin.action(description="Fusionar seleccionados en el más antiguo")
+    def merge_selected(self, request, queryset):
+        from .dedupe import merge_clients
+        keep, *duplicates = sorted(queryset.values_list("pk", flat=True))
+        if not duplicates:
+            self.message_user(request, "Selecciona al menos dos clientes para fusionar.", messages.WARNING)
+            return
+        moved = merge_clients(keep, duplicates)
+        self.message_user(request, f"{len(duplicates)} clientes fusionados en #{keep} ({moved} citas movidas).")
+
+    def get_urls(self):
+        urls = [
+            path("duplicados/", self.admin_site.admin_view(self.duplicates_view), name="bookings_client_duplicates"),
+        ]
+        return urls + super().get_urls()
+
+    def duplicates_view(self, request):
+        """Grupos candidatos (mismo teléfono E.164 o correo); POST fusiona un grupo."""
+        from .dedupe import find_duplicate_groups, merge_clients
+
+        if request.method == "POST":
+            ids = sorted(int(pk) for pk in request.POST.getlist("ids"))
+            if len(ids) > 1:
+                moved = merge_clients(ids[0], ids[1:])
+                messages.success(request, f"Grupo fusionado en #{ids[0]} ({moved} citas movidas).")
+            return redirect("admin:bookings_client_duplicates")
+
+        groups = find_duplicate_groups()[:200]
+        clients = Client.objects.in_bulk([pk for g in groups for pk in g])
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Clientes duplicados",
+            "groups": [[clients[pk] for pk in g if pk in clients] for g in groups],
+        }
+        return TemplateResponse(request, "admin/bookings/client/duplicates.html", context)
 
 class AppointmentStatusHistoryInline(admin.TabularInline):
     model = AppointmentStatusHistory
@@ -57,6 +137,18 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_per_page = 25
     inlines = [AppointmentStatusHistoryInline]
 
+@admin.register(AppointmentSeries)
+class AppointmentSeriesAdmin(admin.ModelAdmin):
+    # Alta y cambios masivos desde la agenda (recurrence.py); aquí solo consulta
+    list_display = ("id", "client", "staff", "frequency", "start", "until", "count")
+    list_filter = ("frequency", "staff")
+    search_fields = ("client__name", "staff__name")
+    list_select_related = ("client", "staff")
+    raw_id_fields = ("client", "staff")
+
+    def has_add_permission(self, request):
+        return False
+
 @admin.register(AppointmentStatusHistory)
 class AppointmentStatusHistoryAdmin(admin.ModelAdmin):
     list_display = ("appointment", "old_status", "new_status", "changed_at", "changed_by")
@@ -65,3 +157,18 @@ class AppointmentStatusHistoryAdmin(admin.ModelAdmin):
     date_hierarchy = "changed_at"
     search_fields = ("appointment__client__name", "appointment__staff__name")
     ordering = ("-changed_at",)
+
+@admin.register(OutboxJob)
+class OutboxJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "run_after", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("payload", "attempts", "locked_at", "last_error", "created_at", "finished_at")
+    ordering = ("-created_at",)
+    actions = ["retry_jobs"]
+
+    @admin.action(description="Reintentar trabajos seleccionados")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=JobStatus.RUNNING).update(
+            status=JobStatus.PENDING, attempts=0, run_after=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"{updated} trabajos reencolados.")
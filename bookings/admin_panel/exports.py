@@ -0,0 +1,109 @@
+"""
+📤 Exportación de reservas en streaming
+---------------------------------------
+La memoria se mantiene constante sin importar el número de filas:
+  • CSV  → StreamingHttpResponse alimentado por queryset.iterator().
+  • XLSX → openpyxl en modo write-only (las filas van a un archivo temporal)
+           y la respuesta se sirve por bloques desde ese archivo.
+
+El ancho de columnas se estima con las primeras SAMPLE_ROWS filas (en modo
+write-only hay que fijarlo antes de escribir); después solo se escriben filas.
+"""
+
+import csv
+import tempfile
+from itertools import islice
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.timezone import localtime
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+CHUNK_SIZE = 2000
+SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 60
+
+COLUMNS = [
+    ("event__title", "Evento"),
+    ("name", "Nombre"),
+    ("email", "Correo"),
+    ("phone", "Teléfono"),
+    ("quantity", "Cantidad"),
+    ("created_at", "Fecha de creación"),
+    ("cancelled", "Cancelada"),
+]
+HEADERS = [label for _, label in COLUMNS]
+
+
+def _rows(bookings):
+    """Filas ya formateadas, leídas por bloques del cursor."""
+    fields = [field for field, _ in COLUMNS]
+    qs = bookings.values_list(*fields)
+    for title, name, email, phone, quantity, created_at, cancelled in qs.iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            title, name, email, phone, quantity,
+            localtime(created_at).strftime("%d/%m/%Y %H:%M") if created_at else "",
+            "Sí" if cancelled else "No",
+        ]
+
+
+# ============================================================
+# CSV
+# ============================================================
+
+class _Echo:
+    """Pseudo-buffer: csv.writer escribe y devolvemos la línea tal cual."""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(bookings, filename="reservas_filtradas.csv"):
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield "\ufeff"  # BOM para que Excel detecte UTF-8
+        yield writer.writerow(HEADERS)
+        for row in _rows(bookings):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ============================================================
+# XLSX
+# ============================================================
+
+def export_xlsx(bookings, filename="reservas_filtradas.xlsx"):
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet("Reservas")
+
+    rows = _rows(bookings)
+    sample = list(islice(rows, SAMPLE_ROWS))
+
+    # Ancho estimado de forma incremental sobre la muestra
+    widths = [len(h) for h in HEADERS]
+    for row in sample:
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(str(value)))
+    for i, width in enumerate(widths, start=1):
+        sheet.column_dimensions[get_column_letter(i)].width = min(width, MAX_COLUMN_WIDTH) + 3
+
+    sheet.append(HEADERS)
+    for row in sample:
+        sheet.append(row)
+    for row in rows:
+        sheet.append(row)
+
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename=filename,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
@@ -4,19 +4,21 @@
 Incluye:
   • Dashboard general de eventos y reservas.
   • Creación y edición de eventos.
-  • Listado y exportación de reservas (Excel).
+  • Listado y exportación de reservas (Excel / CSV).
 
 Autor: El Cris 🔥
 """
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.http import HttpResponse
-from django.db.models import Q, Count
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
 from django import forms
-import pandas as pd
 
-from bookings.models import Event, Booking, EventType
+from bookings.keyset import ApproxCount, approximate_count, keyset_paginate
+from bookings.models import Event, Booking, EventType, DailyStats
+from bookings.search import search_bookings
+from .exports import export_csv, export_xlsx
 from django.contrib.auth.decorators import login_required, user_passes_test
 
 
@@ -51,16 +53,25 @@ class EventForm(forms.ModelForm):
 def dashboard(request):
     """
     Vista principal del panel:
-      - Muestra todos los eventos creados.
-      - Incluye KPIs de conteo general.
+      - Muestra los eventos por páginas (keyset sobre event_start_idx).
+      - Incluye KPIs de conteo general (leídos de los acumulados, ver rollups.py).
     """
-    events = Event.objects.annotate(num_bookings=Count("bookings")).order_by("-start")
-    total_bookings = Booking.objects.count()
-    total_events = events.count()
+    events = (
+        Event.objects.with_availability()
+        .annotate(num_bookings=Coalesce(F("stats__bookings"), 0))
+    )
+    totals = DailyStats.objects.aggregate(
+        bookings=Coalesce(Sum("bookings"), 0),
+        tickets=Coalesce(Sum("tickets"), 0),
+    )
+    total_events = approximate_count(Event.objects.all())
+    page = keyset_paginate(request, events, ("-start", "-id"))
 
     context = {
-        "events": events,
-        "total_bookings": total_bookings,
+        "events": page.object_list,
+        "page": page,
+        "total_bookings": totals["bookings"],
+        "total_tickets": totals["tickets"],
         "total_events": total_events,
     }
     return render(request, "admin_panel/dashboard.html", context)
@@ -114,23 +125,18 @@ def booking_list(request):
     """
     Vista principal de reservas:
       - Permite buscar, filtrar y exportar.
-      - Exporta en Excel con formato limpio y columnas autoajustadas.
+      - Exporta en Excel o CSV en streaming (memoria constante).
     """
     query = request.GET.get("q", "").strip()
     status_filter = request.GET.get("status", "all")
     export = request.GET.get("export", "")
 
     # Base query optimizada
-    bookings = Booking.objects.select_related("event").order_by("-created_at")
+    bookings = Booking.objects.select_related("event").order_by("-created_at", "-id")
 
-    # --- 🔍 Filtrado por texto libre ---
+    # --- 🔍 Filtrado por texto libre (índice FTS5 / pg_trgm) ---
     if query:
-        bookings = bookings.filter(
-            Q(name__icontains=query)
-            | Q(email__icontains=query)
-            | Q(phone__icontains=query)
-            | Q(event__title__icontains=query)
-        )
+        bookings = search_bookings(bookings, query)
 
     # --- ⚙️ Filtrado por estado ---
     if status_filter == "active":
@@ -138,69 +144,37 @@ def booking_list(request):
     elif status_filter == "cancelled":
         bookings = bookings.filter(cancelled=True)
 
-    # --- 📊 Totales para KPIs ---
-    total = bookings.count()
-    total_active = bookings.filter(cancelled=False).count()
-    total_cancelled = bookings.filter(cancelled=True).count()
-
     # ============================================================
-    # 📤 EXPORTACIÓN A EXCEL
+    # 📤 EXPORTACIÓN (streaming, memoria constante)
     # ============================================================
     if export == "excel":
-        df = pd.DataFrame(list(bookings.values(
-            "event__title", "name", "email", "phone", "quantity",
-            "created_at", "cancelled"
-        )))
-
-        # --- Renombrar columnas ---
-        df.rename(columns={
-            "event__title": "Evento",
-            "name": "Nombre",
-            "email": "Correo",
-            "phone": "Teléfono",
-            "quantity": "Cantidad",
-            "created_at": "Fecha de creación",
-            "cancelled": "Cancelada",
-        }, inplace=True)
-
-        # --- Normalización de datos ---
-        if "Fecha de creación" in df.columns:
-            df["Fecha de creación"] = (
-                pd.to_datetime(df["Fecha de creación"], errors="coerce")
-                .dt.tz_localize(None)
-                .dt.strftime("%d/%m/%Y %H:%M")
-            )
-        df["Cancelada"] = df["Cancelada"].apply(lambda x: "Sí" if x else "No")
-
-        # --- Configurar respuesta ---
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        return export_xlsx(bookings)
+    if export == "csv":
+        return export_csv(bookings)
+
+    # --- 📊 Totales para KPIs ---
+    if not query and status_filter == "all":
+        # Sin filtros: exactos y baratos desde los acumulados diarios
+        totals = DailyStats.objects.aggregate(
+            bookings=Coalesce(Sum("bookings"), 0),
+            cancellations=Coalesce(Sum("cancellations"), 0),
         )
-        response["Content-Disposition"] = 'attachment; filename="reservas_filtradas.xlsx"'
-
-        # --- Escritura con formato dinámico ---
-        with pd.ExcelWriter(response, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Reservas")
-            sheet = writer.sheets["Reservas"]
-
-            # Ancho automático de columnas
-            for col in sheet.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        max_length = max(max_length, len(str(cell.value)))
-                    except Exception:
-                        pass
-                sheet.column_dimensions[column].width = max_length + 3
-
-        return response
+        total = ApproxCount(totals["bookings"])
+        total_cancelled = ApproxCount(totals["cancellations"])
+        total_active = ApproxCount(total - total_cancelled)
+    else:
+        total = approximate_count(bookings)
+        total_active = approximate_count(bookings.filter(cancelled=False))
+        total_cancelled = approximate_count(bookings.filter(cancelled=True))
+
+    page = keyset_paginate(request, bookings, ("-created_at", "-id"))
 
     # ============================================================
     # 🧭 Render del listado normal
     # ============================================================
     context = {
-        "bookings": bookings,
+        "bookings": page.object_list,
+        "page": page,
         "query": query,
         "status_filter": status_filter,
         "total": total,
@@ -0,0 +1,141 @@
+"""
+Caché de la agenda.
+-------------------
+Resumen anual: una sola consulta agrupada (mes × estado) por año, guardada en
+la caché de Django y borrada cuando se crea, modifica o elimina una cita de
+ese año (ver signals.py).
+
+Fragmentos HTML: cada vista de agenda se guarda ya renderizada bajo una clave
+que incluye la URL, el día actual (local) y las *versiones* de lo que muestra:
+  • "d:YYYY-MM-DD" → un día (citas de ese día)
+  • "y:YYYY"       → un año (vista anual)
+  • "people"       → staff y clientes (nombres, lista de staff)
+  • "events"       → eventos públicos y sus tipos (feeds .ics)
+Guardar/eliminar una cita incrementa la versión de su día y su año; guardar
+staff o clientes incrementa "people"; guardar eventos o tipos, "events". Las claves viejas simplemente dejan de
+consultarse y expiran solas.
+
+Los UPDATE masivos (sin señales) deben llamar a bump_agenda() e
+invalidate_year_summary() por su cuenta.
+"""
+
+import calendar
+import hashlib
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth
+from django.http import HttpResponse
+from django.utils.timezone import get_current_timezone, localdate, make_aware
+
+from .models import Appointment
+
+TIMEOUT = getattr(settings, "AGENDA_CACHE_TIMEOUT", 60 * 60 * 24)
+STATUSES = [value for value, _ in Appointment._meta.get_field("status").choices]
+
+
+def _year_key(year):
+    return f"agenda:year:{year}"
+
+
+def year_bounds(year):
+    """Rango [1 ene, 1 ene siguiente) en la zona local, como datetimes aware."""
+    tz = get_current_timezone()
+    return make_aware(datetime(year, 1, 1), tz), make_aware(datetime(year + 1, 1, 1), tz)
+
+
+def year_summary(year):
+    """Lista de 12 meses con total y desglose por estado."""
+    months = cache.get(_year_key(year))
+    if months is not None:
+        return months
+
+    months = [
+        {"year": year, "month": m, "name": calendar.month_name[m], "count": 0, **dict.fromkeys(STATUSES, 0)}
+        for m in range(1, 13)
+    ]
+    start, end = year_bounds(year)
+    rows = (
+        Appointment.objects.filter(start__gte=start, start__lt=end)
+        .annotate(month=ExtractMonth("start"))
+        .values("month", "status")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        month = months[row["month"] - 1]
+        month[row["status"]] = row["n"]
+        month["count"] += row["n"]
+
+    cache.set(_year_key(year), months, TIMEOUT)
+    return months
+
+
+def invalidate_year_summary(*years):
+    cache.delete_many([_year_key(y) for y in set(years) if y])
+
+
+# ============================
+#  VERSIONES + FRAGMENTOS
+# ============================
+def day_scopes(days):
+    return [f"d:{d.isoformat()}" for d in days]
+
+
+def year_scope(year):
+    return f"y:{year}"
+
+
+def _version_key(scope):
+    return f"agenda:v:{scope}"
+
+
+def _versions(scopes):
+    keys = [_version_key(s) for s in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Semilla única: si la versión fue expulsada no reaparece un valor ya usado
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[k] for k in keys]
+
+
+def bump_agenda(days=(), years=(), people=False, events=False):
+    """Invalida los fragmentos que incluyen esos días / años / personas / eventos."""
+    scopes = set(day_scopes(days)) | {year_scope(y) for y in years}
+    if people:
+        scopes.add("people")
+    if events:
+        scopes.add("events")
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def versions_etag(scopes, *extra):
+    """ETag barato (solo caché, sin tocar la base) para respuestas que dependen de `scopes`."""
+    raw = "|".join(map(str, [*extra, *_versions(scopes)]))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def cached_agenda(request, scopes, render_fn):
+    """Devuelve el HTML cacheado para (URL, hoy, versiones) o lo renderiza y guarda."""
+    versions = _versions(["people", *scopes])
+    raw = "|".join([request.get_full_path(), localdate().isoformat(), *map(str, versions)])
+    key = "agenda:frag:" + hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    html = cache.get(key)
+    if html is not None:
+        return HttpResponse(html)
+
+    response = render_fn()
+    if response.status_code == 200:
+        cache.set(key, response.content, TIMEOUT)
+    return response
@@ -0,0 +1,22 @@
+"""
+Paginación por cursor (keyset) para la API.
+-------------------------------------------
+Cada página filtra `WHERE columna > último_valor ORDER BY columna LIMIT n`
+sobre una columna indexada, así que la página 1 000 cuesta lo mismo que la
+primera (sin OFFSET) y no se salta ni repite filas si hay altas a mitad de
+la sincronización.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "id"
+
+
+class StartKeysetPagination(KeysetPagination):
+    """Para eventos y citas: índices event_start_idx / appointment_start_idx."""
+    ordering = ("start", "id")
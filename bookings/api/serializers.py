@@ -0,0 +1,89 @@
+"""
+Serializers de solo lectura.
+----------------------------
+Cada uno declara exactamente las columnas que lee; las vistas usan esas
+mismas listas en `only()` y resuelven las FK con `select_related`, de modo
+que una página completa es UNA consulta.
+"""
+
+from rest_framework import serializers
+
+from ..models import Appointment, Booking, Client, Event, Staff
+
+
+class EventSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source="type.name")
+    seats_available = serializers.IntegerField(source="seats_left")
+
+    class Meta:
+        model = Event
+        fields = [
+            "id", "title", "description", "start", "type", "status",
+            "capacity", "seats_available", "allow_group_booking", "max_tickets_per_booking",
+        ]
+
+
+EVENT_COLUMNS = [
+    "id", "title", "description", "start", "status", "capacity", "seats_taken",
+    "allow_group_booking", "max_tickets_per_booking", "type__name",
+]
+
+
+class EventRefSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    start = serializers.DateTimeField()
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    event = EventRefSerializer()
+
+    class Meta:
+        model = Booking
+        fields = ["confirmation_code", "name", "quantity", "cancelled", "created_at", "event"]
+
+
+BOOKING_COLUMNS = [
+    "id", "confirmation_code", "name", "quantity", "cancelled", "created_at",
+    "event__id", "event__title", "event__start",
+]
+
+
+class PersonRefSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+
+
+class AppointmentSerializer(serializers.ModelSerializer):
+    client = PersonRefSerializer()
+    staff = PersonRefSerializer()
+    service = serializers.CharField(source="service.name", default=None)
+    series = serializers.IntegerField(source="series_id")
+
+    class Meta:
+        model = Appointment
+        fields = [
+            "id", "start", "end", "duration_minutes", "status", "notes",
+            "client", "staff", "service", "series",
+        ]
+
+
+APPOINTMENT_COLUMNS = [
+    "id", "start", "end", "duration_minutes", "status", "notes", "series_id",
+    "client__id", "client__name", "staff__id", "staff__name", "service__name",
+]
+
+
+PERSON_FIELDS = ["id", "name", "phone", "email", "available_days", "active", "created_at"]
+
+
+class ClientSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Client
+        fields = PERSON_FIELDS + ["company", "is_whatsapp"]
+
+
+class StaffSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Staff
+        fields = PERSON_FIELDS + ["role", "specialty", "allow_multiple", "is_whatsapp"]
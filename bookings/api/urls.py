@@ -0,0 +1,14 @@
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = "api"
+
+router = DefaultRouter()
+router.register("events", views.EventViewSet, basename="event")
+router.register("bookings", views.BookingViewSet, basename="booking")
+router.register("appointments", views.AppointmentViewSet, basename="appointment")
+router.register("clients", views.ClientViewSet, basename="client")
+router.register("staff", views.StaffViewSet, basename="staff")
+
+urlpatterns = router.urls
@@ -0,0 +1,98 @@
+"""
+API JSON de solo lectura (kiosco / app móvil).
+----------------------------------------------
+  • /api/events/                 → eventos con lugares disponibles (público)
+  • /api/bookings/<código>/      → reserva por código de confirmación (público)
+  • /api/appointments/?from=&to=&staff=&status=   (requiere sesión o Basic)
+  • /api/clients/ · /api/staff/                   (requiere sesión o Basic)
+
+Todas las listas usan paginación por cursor sobre columnas indexadas.
+"""
+
+from datetime import date, timedelta
+
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+
+from ..models import Appointment, Booking, Client, Event, EventStatus, Staff
+from ..scheduling import day_start
+from . import serializers as s
+from .pagination import KeysetPagination, StartKeysetPagination
+
+MAX_RANGE_DAYS = 366
+
+
+def _int_list(values, name):
+    try:
+        return [int(v) for v in values]
+    except ValueError:
+        raise ValidationError({name: "Debe ser una lista de ids numéricos."})
+
+
+class EventViewSet(viewsets.ReadOnlyModelViewSet):
+    permission_classes = [AllowAny]
+    serializer_class = s.EventSerializer
+    pagination_class = StartKeysetPagination
+
+    def get_queryset(self):
+        qs = (
+            Event.objects.with_availability()
+            .select_related("type")
+            .only(*s.EVENT_COLUMNS)
+        )
+        if self.action == "list" and self.request.query_params.get("all") != "1":
+            qs = qs.filter(status=EventStatus.ACTIVE)
+        return qs
+
+
+class BookingViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Solo consulta puntual: el código UUID funciona como credencial, igual que en el PDF del boleto."""
+    permission_classes = [AllowAny]
+    serializer_class = s.BookingSerializer
+    lookup_field = "confirmation_code"
+    queryset = Booking.objects.select_related("event").only(*s.BOOKING_COLUMNS)
+
+
+class AppointmentViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = s.AppointmentSerializer
+    pagination_class = StartKeysetPagination
+
+    def get_queryset(self):
+        qs = Appointment.objects.select_related("client", "staff", "service").only(*s.APPOINTMENT_COLUMNS)
+        if self.action != "list":
+            return qs
+
+        params = self.request.query_params
+        try:
+            first = date.fromisoformat(params["from"]) if params.get("from") else None
+            last = date.fromisoformat(params["to"]) if params.get("to") else None
+        except ValueError:
+            raise ValidationError({"from": "Usa fechas YYYY-MM-DD."})
+        if first and last and not 0 <= (last - first).days <= MAX_RANGE_DAYS:
+            raise ValidationError({"to": f"El rango debe ser de 0 a {MAX_RANGE_DAYS} días."})
+
+        # Rango semiabierto en hora local: usa appointment_start_idx / appointment_staff_start_idx
+        if first:
+            qs = qs.filter(start__gte=day_start(first))
+        if last:
+            qs = qs.filter(start__lt=day_start(last + timedelta(days=1)))
+        staff_ids = _int_list(params.getlist("staff"), "staff")
+        if staff_ids:
+            qs = qs.filter(staff_id__in=staff_ids)
+        statuses = params.getlist("status")
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        return qs
+
+
+class ClientViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = s.ClientSerializer
+    pagination_class = KeysetPagination
+    queryset = Client.objects.only(*s.ClientSerializer.Meta.fields)
+
+
+class StaffViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = s.StaffSerializer
+    pagination_class = KeysetPagination
+    queryset = Staff.objects.only(*s.StaffSerializer.Meta.fields)
@@ -0,0 +1,26 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """Reinstala el índice de búsqueda (en SQLite las migraciones pueden borrar sus triggers)."""
+    from django.db import connections
+    from .search import install_search_index
+
+    conn = connections[using]
+    with conn.cursor() as cursor:
+        if "bookings_booking" not in conn.introspection.table_names(cursor):
+            return
+        columns = {c.name for c in conn.introspection.get_table_description(cursor, "bookings_booking")}
+    if "search_document" in columns:
+        install_search_index(conn)
+
+
+class BookingsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "bookings"
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registra los receivers)
+
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -0,0 +1,332 @@
+"""
+Benchmark por ruta con presupuesto de consultas.
+------------------------------------------------
+Cada ruta de bookings/urls.py y admin_panel/urls.py se declara en ROUTES con
+su presupuesto de consultas SQL (constante: no debe crecer con el volumen de
+datos). run_routes() las recorre con el cliente de pruebas de Django y mide:
+  • latencia (p50 / p90 / p99 de las repeticiones y la primera petición, "cold"),
+  • número de consultas (máximo de las repeticiones) y tiempo en SQL.
+
+Las peticiones POST corren dentro de una transacción que se revierte, así
+que todas las repeticiones ven los mismos datos.
+
+check() compara contra el presupuesto y, si se da, contra un JSON anterior
+(regresión de latencia mayor al umbral o más consultas que antes). Una ruta
+nueva sin declarar también cuenta como falla. Lo usa `manage.py benchmark_routes`.
+"""
+
+import statistics
+import time
+from datetime import datetime, time as clock, timedelta
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client as TestClient
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timezone import get_current_timezone, localdate, localtime, make_aware
+
+from . import urls as bookings_urls
+from .admin_panel import urls as panel_urls
+from .models import Appointment, AppointmentSeries, Booking, Client, Event, EventStatus, EventType, Staff
+from .views_calendar import staff_feed_token
+
+# Regresiones de menos de esto (ms) se consideran ruido
+NOISE_MS = 2.0
+
+
+class Route:
+    """
+    Una petición a medir. `args`, `params` y `data` pueden ser funciones que
+    reciben los fixtures (ver _fixtures) para armar URL y cuerpo.
+    """
+
+    def __init__(self, name, budget, label=None, method="GET", args=None, params=None, data=None,
+                 json=False, expect=200, needs=()):
+        self.name = name
+        self.budget = budget
+        self.label = label or name.split(":")[-1]
+        self.method = method
+        self.args = args
+        self.params = params
+        self.data = data
+        self.json = json
+        self.expect = expect
+        self.needs = needs
+
+    @staticmethod
+    def _resolve(value, fx):
+        return value(fx) if callable(value) else value
+
+    def request(self, client, fx):
+        url = reverse(self.name, args=self._resolve(self.args, fx) or [])
+        params = self._resolve(self.params, fx)
+        if self.method == "GET":
+            return client.get(url, params or {})
+        if params:
+            url += "?" + urlencode(params)
+        data = self._resolve(self.data, fx) or {}
+        if self.json:
+            return client.post(url, data, content_type="application/json")
+        return client.post(url, data)
+
+
+def _local_input(dt):
+    return localtime(dt).strftime("%Y-%m-%dT%H:%M")
+
+
+def _appointment_data(fx, **extra):
+    return {
+        "client": fx["client"].pk, "staff": fx["shared_staff"].pk, "service": "",
+        "start": _local_input(fx["free_start"]), "duration_minutes": 30, "notes": "", "status": "pending",
+        **extra,
+    }
+
+
+def _import_file(fx):
+    rows = "".join(f"Bench {i};55990000{i:02d};bench{i}@gmail.com\n" for i in range(50))
+    return {"type": "client", "file": SimpleUploadedFile("bench.csv", f"Nombre;Teléfono;Correo\n{rows}".encode())}
+
+
+ROUTES = [
+    # 🏠 Públicas
+    Route("bookings:home", budget=2),
+    Route("bookings:event_list", budget=3),
+    Route("bookings:event_detail", budget=1, args=lambda fx: [fx["event"].pk], needs=["event"]),
+    Route("bookings:event_detail", budget=12, label="event_detail POST", method="POST", expect=200,
+          args=lambda fx: [fx["event"].pk], needs=["event"],
+          data={"name": "Bench", "email": "bench@gmail.com", "phone": "5512345678", "quantity": 1}),
+    Route("bookings:booking_success", budget=2, args=lambda fx: [fx["booking"].confirmation_code], needs=["booking"]),
+    Route("bookings:booking_ticket_pdf", budget=1, args=lambda fx: [fx["booking"].confirmation_code],
+          needs=["booking"]),
+
+    # 🗓️ Agenda
+    Route("bookings:agenda", budget=6),
+    Route("bookings:agenda_semanal", budget=1, label="agenda_semanal week"),
+    Route("bookings:agenda_semanal", budget=1, label="agenda_semanal month", params={"view": "month"}),
+    Route("bookings:agenda_semanal", budget=1, label="agenda_semanal year", params={"view": "year"}),
+    Route("bookings:free_slots", budget=2, params={"duration": 60}),
+    Route("bookings:create_appointment", budget=1),
+    Route("bookings:create_appointment", budget=6, label="create_appointment POST", method="POST", expect=302,
+          data=_appointment_data, needs=["client", "shared_staff"]),
+    Route("bookings:edit_appointment", budget=4, args=lambda fx: [fx["appointment"].pk], needs=["appointment"]),
+    Route("bookings:edit_appointment", budget=7, label="edit_appointment POST", method="POST", expect=302,
+          args=lambda fx: [fx["appointment"].pk], needs=["appointment", "client", "shared_staff"],
+          data=lambda fx: _appointment_data(fx, notes="bench")),
+    Route("bookings:delete_appointment", budget=4, label="delete_appointment POST", method="POST", expect=302,
+          args=lambda fx: [fx["appointment"].pk], needs=["appointment"]),
+    Route("bookings:change_appointment_status", budget=11, method="POST", expect=302,
+          args=lambda fx: [fx["appointment"].pk, "confirmed"], needs=["appointment"]),
+    Route("bookings:bulk_change_appointment_status", budget=8, method="POST", json=True,
+          data=lambda fx: {"ids": fx["pending_ids"], "status": "confirmed"}, needs=["pending_ids"]),
+    Route("bookings:create_series", budget=1),
+    Route("bookings:create_series", budget=9, label="create_series POST", method="POST", expect=302,
+          needs=["client", "shared_staff"],
+          data=lambda fx: {**_appointment_data(fx), "frequency": "weekly", "count": 4}),
+    Route("bookings:edit_series", budget=3, args=lambda fx: [fx["series"].pk], needs=["series"]),
+    Route("bookings:edit_series", budget=7, label="edit_series POST", method="POST", expect=302,
+          args=lambda fx: [fx["series"].pk], needs=["series"], data={"notes": "bench"}),
+    Route("bookings:cancel_series", budget=9, method="POST", expect=302,
+          args=lambda fx: [fx["series"].pk], needs=["series"]),
+
+    # 📆 Feeds
+    Route("bookings:events_calendar", budget=1),
+    Route("bookings:event_type_calendar", budget=2, args=lambda fx: [fx["event_type"].pk], needs=["event_type"]),
+    Route("bookings:staff_calendar", budget=2, needs=["staff"],
+          args=lambda fx: [fx["staff"].pk, staff_feed_token(fx["staff"].pk)]),
+
+    # 👥 Personas
+    Route("bookings:person_list", budget=2),
+    Route("bookings:person_list", budget=2, label="person_list search", params={"q": "gar"}),
+    Route("bookings:person_form", budget=0),
+    Route("bookings:person_form", budget=2, label="person_form POST", method="POST", expect=302,
+          params={"type": "client"}, data={"name": "Bench", "phone": "5512340000"}),
+    Route("bookings:person_import", budget=0),
+    Route("bookings:person_import", budget=5, label="person_import POST", method="POST", data=_import_file),
+    Route("bookings:person_lookup", budget=1, args=["client"], params={"q": "gar"}),
+    Route("bookings:person_edit", budget=1, args=lambda fx: [fx["client"].pk], needs=["client"]),
+
+    # 📊 Panel
+    Route("admin_panel:dashboard", budget=3),
+    Route("admin_panel:event_create", budget=1),
+    Route("admin_panel:event_edit", budget=2, args=lambda fx: [fx["event"].pk], needs=["event"]),
+    Route("admin_panel:booking_list", budget=2),
+    Route("admin_panel:booking_list", budget=5, label="booking_list search", params={"q": "garcia"}),
+]
+
+
+def declared_names():
+    return {route.name for route in ROUTES}
+
+
+def undeclared_routes():
+    """Nombres de URL de las dos apps sin ninguna Route declarada."""
+    names = {f"bookings:{p.name}" for p in bookings_urls.urlpatterns if p.name}
+    names |= {f"admin_panel:{p.name}" for p in panel_urls.urlpatterns if p.name}
+    return sorted(names - declared_names())
+
+
+# ============================
+#  FIXTURES
+# ============================
+def _fixtures():
+    """Objetos existentes que usan las rutas con parámetros (None si no hay datos)."""
+    now = timezone.now()
+    today = localdate()
+    fx = {
+        "event": Event.objects.filter(status=EventStatus.ACTIVE, start__gte=now).order_by("start").first(),
+        "booking": Booking.objects.filter(cancelled=False).order_by("-id").first(),
+        "appointment": Appointment.objects.filter(status="pending", start__gte=now).order_by("start").first(),
+        "series": AppointmentSeries.objects.order_by("-id").first(),
+        "event_type": EventType.objects.order_by("id").first(),
+        "staff": Staff.objects.filter(active=True).order_by("id").first(),
+        "shared_staff": Staff.objects.filter(active=True, allow_multiple=True).order_by("id").first(),
+        "client": Client.objects.filter(active=True).order_by("id").first(),
+        "pending_ids": list(
+            Appointment.objects.filter(status="pending", start__gte=now).order_by("start")
+            .values_list("pk", flat=True)[:20]
+        ) or None,
+        # Próximo domingo 7:00: fuera del horario de la agenda generada
+        "free_start": make_aware(
+            datetime.combine(today + timedelta(days=(6 - today.weekday()) or 7), clock(7)), get_current_timezone()
+        ),
+    }
+    return fx
+
+
+def ensure_series(fx):
+    """Crea una serie corta si no hay ninguna, para medir sus rutas."""
+    if fx["series"] or not fx["shared_staff"] or not fx["client"]:
+        return fx
+    from . import recurrence
+    series = AppointmentSeries(staff=fx["shared_staff"], client=fx["client"],
+                               start=fx["free_start"] + timedelta(hours=1), duration_minutes=30, count=4)
+    recurrence.create_series(series)
+    fx["series"] = series
+    return fx
+
+
+def benchmark_user(create=True):
+    User = get_user_model()
+    user = User.objects.filter(is_superuser=True).order_by("id").first()
+    if user is None and create:
+        user = User.objects.create_superuser("benchmark", "benchmark@example.com", None)
+    return user
+
+
+# ============================
+#  MEDICIÓN
+# ============================
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _QueryTimer:
+    """execute_wrapper que cuenta consultas y mide su tiempo con perf_counter."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def _measure(route, client, fx):
+    timer = _QueryTimer()
+    with connection.execute_wrapper(timer):
+        started = time.perf_counter()
+        if route.method == "GET":
+            response = route.request(client, fx)
+            _consume(response)
+        else:
+            with transaction.atomic():
+                response = route.request(client, fx)
+                _consume(response)
+                transaction.set_rollback(True)
+        elapsed = (time.perf_counter() - started) * 1000
+    return response.status_code, elapsed, timer.count, timer.seconds * 1000
+
+
+def _consume(response):
+    # Las respuestas en streaming (CSV, .ics) se miden completas
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+        response.close()
+
+
+def run_routes(repeat=10, user=None, routes=ROUTES, create_missing=True, progress=None):
+    """
+    Mide cada ruta `repeat` veces. Devuelve {label: resultados}.
+    Con create_missing=False no se escribe nada fuera de las transacciones revertidas.
+    """
+    fx = _fixtures()
+    if create_missing:
+        fx = ensure_series(fx)
+    client = TestClient()
+    if user is not None:
+        client.force_login(user)
+
+    results = {}
+    for route in routes:
+        missing = [name for name in route.needs if not fx.get(name)]
+        if missing:
+            results[route.label] = {"skipped": f"sin datos: {', '.join(missing)}", "budget": route.budget}
+            continue
+        runs = [_measure(route, client, fx) for _ in range(max(repeat, 1))]
+        # La primera petición (plantillas sin compilar, caché vacía) se reporta aparte
+        latencies = [r[1] for r in runs[1:]] or [runs[0][1]]
+        cold = runs[0][1]
+        results[route.label] = {
+            "route": route.name,
+            "method": route.method,
+            "status": runs[0][0],
+            "expect": route.expect,
+            "cold_ms": round(cold, 2),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p90_ms": round(_percentile(latencies, 90), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "queries": max(r[2] for r in runs),
+            "queries_warm": min(r[2] for r in runs),
+            "sql_ms": round(statistics.median(r[3] for r in runs), 2),
+            "budget": route.budget,
+        }
+        if progress:
+            progress(route.label, results[route.label])
+    return results
+
+
+# ============================
+#  VERIFICACIÓN
+# ============================
+def check(results, baseline=None, threshold=0.25):
+    """Lista de fallas (textos) de un resultado {tamaño: {label: …}} contra presupuestos y baseline."""
+    failures = [f"{name}: ruta sin declarar en benchmarks.ROUTES" for name in undeclared_routes()]
+    for size, routes in results.items():
+        before = (baseline or {}).get(size, {})
+        for label, r in routes.items():
+            if "skipped" in r:
+                continue
+            where = f"[{size}] {label}"
+            if r["status"] != r["expect"]:
+                failures.append(f"{where}: HTTP {r['status']} (se esperaba {r['expect']})")
+            if r["queries"] > r["budget"]:
+                failures.append(f"{where}: {r['queries']} consultas > presupuesto {r['budget']}")
+            old = before.get(label)
+            if not old or "skipped" in old:
+                continue
+            if r["queries"] > old["queries"]:
+                failures.append(f"{where}: {old['queries']} → {r['queries']} consultas")
+            if r["p50_ms"] > old["p50_ms"] * (1 + threshold) and r["p50_ms"] - old["p50_ms"] > NOISE_MS:
+                failures.append(f"{where}: p50 {old['p50_ms']} → {r['p50_ms']} ms")
+    return failures
@@ -0,0 +1,144 @@
+"""
+Detección y fusión de clientes duplicados.
+------------------------------------------
+En vez de comparar todos contra todos (O(n²)), cada cliente produce claves
+de bloqueo a partir de sus datos normalizados:
+  • teléfono en E.164 ("+525512345678"),
+  • correo normalizado (minúsculas, sin "+etiqueta"; en Gmail sin puntos).
+Las claves se guardan como hash corto en un dict y una sola pasada lineal
+une (union-find) a los clientes que comparten alguna: O(n) en tiempo.
+
+La fusión conserva el cliente más antiguo, completa sus campos vacíos con
+los de los duplicados, mueve citas y series con un UPDATE por tabla y borra
+los duplicados; todo en una transacción.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Appointment, AppointmentSeries, Client
+from .search import NATIONAL_DIGITS, normalize_phone
+
+COUNTRY_CODE = str(getattr(settings, "PHONE_COUNTRY_CODE", "52"))
+MIN_PHONE_DIGITS = 7
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+# Campos que se copian del duplicado si el cliente conservado los tiene vacíos
+FILL_FIELDS = ("phone", "email", "company", "preferences", "services", "notes")
+
+
+# ============================
+#  NORMALIZACIÓN
+# ============================
+def to_e164(phone):
+    """
+    Teléfono en E.164: "55 1234 5678", "045 55 1234 5678" y "+52 1 55 1234 5678"
+    dan "+525512345678". Devuelve "" si no parece un teléfono.
+    """
+    raw = (phone or "").strip()
+    digits = normalize_phone(raw)
+    if raw.startswith("00"):
+        digits = digits[2:]
+        raw = "+"
+    if len(digits) < MIN_PHONE_DIGITS:
+        return ""
+    if raw.startswith("+"):
+        # México: el "1" de celular tras la lada ya no se marca (+52 1 55… → +52 55…)
+        if COUNTRY_CODE == "52" and digits.startswith("521") and len(digits) == 13:
+            digits = "52" + digits[3:]
+        return "+" + digits
+    if len(digits) > NATIONAL_DIGITS:
+        # Prefijos nacionales viejos (044/045/01…) o lada pegada: quedarse con el número nacional
+        digits = digits[-NATIONAL_DIGITS:]
+    return f"+{COUNTRY_CODE}{digits}"
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return ""
+    local, domain = email.rsplit("@", 1)
+    local = local.split("+", 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if local else ""
+
+
+def _key(kind, value):
+    return hashlib.blake2b(f"{kind}:{value}".encode("utf-8"), digest_size=8).digest()
+
+
+def blocking_keys(phone, email):
+    keys = []
+    if phone := to_e164(phone):
+        keys.append(_key("p", phone))
+    if email := normalize_email(email):
+        keys.append(_key("e", email))
+    return keys
+
+
+# ============================
+#  AGRUPACIÓN (una pasada)
+# ============================
+def find_duplicate_groups(queryset=None):
+    """Listas de ids de clientes duplicados (cada lista ordenada; el primero es el más antiguo)."""
+    queryset = Client.objects.all() if queryset is None else queryset
+    parent = {}
+
+    def root(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    owner = {}
+    rows = queryset.order_by("id").values_list("id", "phone", "email")
+    for pk, phone, email in rows.iterator(chunk_size=2000):
+        parent[pk] = pk
+        for key in blocking_keys(phone, email):
+            other = owner.setdefault(key, pk)
+            if other != pk:
+                a, b = root(other), root(pk)
+                # El id menor (más antiguo) queda como raíz
+                parent[max(a, b)] = min(a, b)
+
+    groups = {}
+    for pk in parent:
+        groups.setdefault(root(pk), []).append(pk)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+
+# ============================
+#  FUSIÓN
+# ============================
+def merge_clients(keep_id, duplicate_ids):
+    """Fusiona `duplicate_ids` en `keep_id`. Devuelve cuántas citas se movieron."""
+    duplicate_ids = [pk for pk in duplicate_ids if pk != keep_id]
+    if not duplicate_ids:
+        return 0
+
+    with transaction.atomic():
+        keep = Client.objects.select_for_update().get(pk=keep_id)
+        duplicates = list(Client.objects.select_for_update().filter(pk__in=duplicate_ids).order_by("id"))
+
+        changed = []
+        for field in FILL_FIELDS:
+            if not (getattr(keep, field) or "").strip():
+                value = next((getattr(d, field) for d in duplicates if getattr(d, field)), "")
+                if value:
+                    setattr(keep, field, value)
+                    changed.append(field)
+        if any(d.is_whatsapp for d in duplicates) and not keep.is_whatsapp:
+            keep.is_whatsapp = True
+            changed.append("is_whatsapp")
+        if changed:
+            keep.save(update_fields=changed)
+
+        ids = [d.pk for d in duplicates]
+        moved = Appointment.objects.filter(client_id__in=ids).update(client_id=keep_id)
+        AppointmentSeries.objects.filter(client_id__in=ids).update(client_id=keep_id)
+        # delete() por queryset sigue enviando post_delete: invalida "people" en la agenda
+        Client.objects.filter(pk__in=ids).delete()
+    return moved
@@ -1,10 +1,48 @@
 from django import forms
 from django.utils.timezone import localtime
-from .models import Booking, Appointment
+from datetime import timedelta
+from .models import Booking, Appointment, AppointmentSeries, Staff, DEFAULT_APPOINTMENT_MINUTES, MAX_APPOINTMENT_MINUTES
+from .recurrence import MAX_OCCURRENCES, last_allowed_day
  
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, EmailValidator
+from django.urls import reverse
 import uuid
 
+
+class TypeaheadSelect(forms.Select):
+    """
+    <select> que solo renderiza la opción elegida; las demás llegan por AJAX
+    desde views_persons.person_lookup (ver static/bookings/typeahead.js).
+    Evita volcar la tabla completa de clientes en cada formulario.
+    """
+
+    class Media:
+        js = ("bookings/typeahead.js",)
+
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-typeahead-url"] = reverse("bookings:person_lookup", args=[self.kind])
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if v not in ("", None)]
+        try:
+            objs = list(self.choices.queryset.filter(pk__in=selected)) if selected else []
+        except (ValueError, ValidationError):
+            objs = []
+        options = [self.create_option(name, "", "---------", not objs, 0)]
+        options += [
+            self.create_option(name, obj.pk, self.choices.field.label_from_instance(obj), True, i)
+            for i, obj in enumerate(objs, start=1)
+        ]
+        return [(None, options, 0)]
+
+
 class BookingForm(forms.ModelForm):
     quantity = forms.IntegerField(
         label="Cantidad",
@@ -56,6 +94,27 @@ class BookingForm(forms.ModelForm):
 
 
 
+class BookingAdminForm(forms.ModelForm):
+    """Formulario del admin: avisa antes de guardar si el evento no tiene cupo para el cambio."""
+
+    class Meta:
+        model = Booking
+        fields = "__all__"
+
+    def clean(self):
+        cleaned = super().clean()
+        event, quantity = cleaned.get("event"), cleaned.get("quantity")
+        if event is None or quantity is None:
+            return cleaned
+        # Misma cuenta que Booking.save(); self.instance aún tiene los valores guardados
+        old = self.instance
+        held_before = old.seats_held if old.pk and old.event_id == event.pk else 0
+        delta = (0 if cleaned.get("cancelled") else quantity) - held_before
+        if delta > event.capacity - event.seats_taken:
+            self.add_error("quantity", f"No hay suficientes lugares: quedan {event.seats_available} en el evento.")
+        return cleaned
+
+
 class AppointmentForm(forms.ModelForm):
     # Asegura parseo y render del <input type="datetime-local">
     start = forms.DateTimeField(
@@ -68,10 +127,12 @@ class AppointmentForm(forms.ModelForm):
 
     class Meta:
         model = Appointment
-        fields = ["client", "staff", "start", "notes", "status"]
+        fields = ["client", "staff", "service", "start", "duration_minutes", "notes", "status"]
         widgets = {
-            "client": forms.Select(attrs={"class": "form-select"}),
-            "staff": forms.Select(attrs={"class": "form-select"}),
+            "client": TypeaheadSelect("client", attrs={"class": "form-select"}),
+            "staff": TypeaheadSelect("staff", attrs={"class": "form-select"}),
+            "service": forms.Select(attrs={"class": "form-select"}),
+            "duration_minutes": forms.NumberInput(attrs={"class": "form-control", "min": 5, "step": 5}),
             "status": forms.Select(attrs={"class": "form-select"}),
             "notes": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
         }
@@ -82,10 +143,91 @@ class AppointmentForm(forms.ModelForm):
         if self.instance and self.instance.pk and self.instance.start:
             self.fields['start'].initial = localtime(self.instance.start).strftime('%Y-%m-%dT%H:%M')
 
+    def clean(self):
+        from .scheduling import describe_conflict, find_conflict
+
+        cleaned = super().clean()
+        staff, start = cleaned.get("staff"), cleaned.get("start")
+        # Solo el staff sin citas simultáneas necesita validar traslapes
+        if not staff or not start or staff.allow_multiple or cleaned.get("status") == "cancelled":
+            return cleaned
+        service = cleaned.get("service")
+        minutes = cleaned.get("duration_minutes") or (
+            min(service.duration_minutes, MAX_APPOINTMENT_MINUTES) if service else DEFAULT_APPOINTMENT_MINUTES
+        )
+        conflict = find_conflict(
+            staff.pk, start, start + timedelta(minutes=minutes), exclude_pk=self.instance.pk
+        )
+        if conflict:
+            self.add_error("start", describe_conflict(staff, conflict))
+        return cleaned
+
+
+
+class AppointmentSeriesForm(forms.ModelForm):
+    """Alta de citas recurrentes; la validación de traslapes la hace recurrence.create_series."""
+    start = forms.DateTimeField(
+        label="Primera cita",
+        input_formats=['%Y-%m-%dT%H:%M'],
+        widget=forms.DateTimeInput(
+            attrs={'type': 'datetime-local', 'class': 'form-control', 'step': '60'},
+            format='%Y-%m-%dT%H:%M',
+        ),
+    )
+
+    class Meta:
+        model = AppointmentSeries
+        fields = ["client", "staff", "service", "start", "duration_minutes", "frequency", "until", "count", "notes"]
+        widgets = {
+            "client": TypeaheadSelect("client", attrs={"class": "form-select"}),
+            "staff": TypeaheadSelect("staff", attrs={"class": "form-select"}),
+            "service": forms.Select(attrs={"class": "form-select"}),
+            "duration_minutes": forms.NumberInput(attrs={"class": "form-control", "min": 5, "step": 5}),
+            "frequency": forms.Select(attrs={"class": "form-select"}),
+            "until": forms.DateInput(attrs={"type": "date", "class": "form-control"}, format="%Y-%m-%d"),
+            "count": forms.NumberInput(attrs={"class": "form-control", "min": 1, "max": MAX_OCCURRENCES}),
+            "notes": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
+        }
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("until") and not cleaned.get("count"):
+            raise forms.ValidationError("Indica una fecha final o el número de citas.")
+        start, until, count = cleaned.get("start"), cleaned.get("until"), cleaned.get("count")
+        if start and until and until < localtime(start).date():
+            self.add_error("until", "La fecha final es anterior a la primera cita.")
+        if count and count > MAX_OCCURRENCES:
+            self.add_error("count", f"Una serie puede tener como máximo {MAX_OCCURRENCES} citas.")
+        elif start and until and not count and cleaned.get("frequency"):
+            last_day = last_allowed_day(localtime(start).date(), cleaned["frequency"])
+            if until > last_day:
+                self.add_error("until", f"Esa fecha da más de {MAX_OCCURRENCES} citas; "
+                                        f"la última posible es el {last_day:%d/%m/%Y}.")
+        return cleaned
+
+
+class SeriesEditForm(forms.Form):
+    """Cambios aplicables a las citas futuras de una serie (vacío = sin cambio)."""
+    staff = forms.ModelChoiceField(
+        queryset=None, required=False, label="Staff",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    duration_minutes = forms.IntegerField(
+        min_value=5, max_value=MAX_APPOINTMENT_MINUTES, required=False, label="Duración (min)",
+        widget=forms.NumberInput(attrs={"class": "form-control", "step": 5}),
+    )
+    notes = forms.CharField(
+        required=False, label="Notas",
+        widget=forms.Textarea(attrs={"class": "form-control", "rows": 3}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["staff"].queryset = Staff.objects.filter(active=True)
 
 
 from django import forms
-from .models import Client, Staff
+from .models import Client
 
 class PersonBaseForm(forms.ModelForm):
     """Campos comunes entre Cliente y Staff."""
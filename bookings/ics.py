@@ -0,0 +1,81 @@
+"""
+Generación de iCalendar (RFC 5545) en streaming.
+------------------------------------------------
+Se escribe línea por línea (plegado a 75 octetos, texto escapado, horas en
+UTC) para que StreamingHttpResponse envíe el calendario mientras el cursor
+de la base de datos sigue leyendo filas.
+"""
+
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+PRODID = "-//Date//Agenda//ES"
+UID_DOMAIN = getattr(settings, "ICS_UID_DOMAIN", "date-site")
+
+APPOINTMENT_STATUS = {
+    "pending": "TENTATIVE",
+    "confirmed": "CONFIRMED",
+    "done": "CONFIRMED",
+    "cancelled": "CANCELLED",
+}
+
+
+def escape(text):
+    return (
+        (text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def format_dt(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold(line):
+    """Parte líneas de más de 75 octetos sin cortar caracteres UTF-8."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def vevent(uid, start, end, summary, description="", status="CONFIRMED", stamp=None):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{format_dt(stamp or timezone.now())}",
+        f"DTSTART:{format_dt(start)}",
+        f"DTEND:{format_dt(end)}",
+        f"SUMMARY:{escape(summary)}",
+        f"STATUS:{status}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def stream_calendar(name, vevents):
+    """Envuelve un iterable de VEVENT ya formateados en un VCALENDAR."""
+    yield "".join(fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+        f"X-WR-TIMEZONE:{settings.TIME_ZONE}",
+    ])
+    yield from vevents
+    yield "END:VCALENDAR\r\n"
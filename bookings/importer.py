@@ -0,0 +1,287 @@
+"""
+Importación masiva de clientes y staff (CSV / XLSX).
+---------------------------------------------------
+El archivo se lee fila por fila (csv.reader sobre el archivo subido,
+openpyxl en modo read-only para XLSX), así que la memoria depende del
+tamaño del bloque y no del archivo.
+
+Cada bloque de CHUNK_SIZE filas:
+  • se valida fila por fila con ClientForm / StaffForm (mismas reglas que
+    el formulario),
+  • busca en UNA consulta las personas existentes con el mismo teléfono
+    (phone_key) o correo (email_key) → upsert,
+  • escribe con bulk_create + bulk_update dentro de una transacción.
+
+Las celdas vacías no borran datos de una persona existente. Las filas con
+errores se reportan con su número de línea y no detienen la importación.
+Si el archivo deja de poder leerse a la mitad (p. ej. un CSV que no es UTF-8),
+los bloques anteriores ya quedaron guardados: ImportAborted lleva el reporte
+parcial para mostrarlos.
+"""
+
+import csv
+import io
+import zipfile
+from contextlib import nullcontext
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.forms import BooleanField
+from django.forms.models import model_to_dict
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .agenda_cache import bump_agenda
+from .forms import ClientForm, StaffForm
+from .models import Client, Staff
+from .scheduling import apply_exclusivity, describe_overlap, exclusivity_overlaps
+from .search import normalize_text, phone_search_key
+
+CHUNK_SIZE = 500
+MAX_ERRORS = 1000
+
+PEOPLE = {"client": (Client, ClientForm), "staff": (Staff, StaffForm)}
+
+# Encabezados alternativos (ya normalizados) además del nombre del campo y su verbose_name
+HEADER_ALIASES = {
+    "nombre": "name",
+    "telefono": "phone", "tel": "phone", "celular": "phone", "movil": "phone",
+    "correo": "email", "e-mail": "email", "mail": "email",
+    "empresa": "company", "procedencia": "company",
+    "rol": "role", "puesto": "role",
+    "citas simultaneas": "allow_multiple",
+}
+TRUE_VALUES = {"1", "si", "sí", "s", "x", "true", "yes", "y", "verdadero"}
+SEARCH_KEYS = ["name_key", "phone_key", "email_key"]
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # (línea, mensaje), como máximo MAX_ERRORS
+        self.error_count = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, message))
+
+
+class ImportAborted(ValueError):
+    """El archivo dejó de poder leerse; `report` tiene lo ya guardado hasta ese punto."""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+# ============================
+#  LECTURA EN STREAMING
+# ============================
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel guarda los teléfonos como número: 5512345678.0
+        value = int(value)
+    return str(value).strip()
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text, dialect)
+    try:
+        yield from reader
+    finally:
+        # No cerrar el archivo subido junto con el wrapper
+        text.detach()
+
+
+def _xlsx_rows(fileobj):
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        # Archivo dañado o renombrado (no es un ZIP de Excel)
+        raise ValueError("No se pudo leer el archivo: no es un XLSX válido.") from exc
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """Genera (número de línea, fila como lista de textos), encabezado incluido en la línea 1."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        rows = _csv_rows(fileobj)
+    elif name.endswith((".xlsx", ".xlsm")):
+        rows = _xlsx_rows(fileobj)
+    else:
+        raise ValueError("Formato no soportado: sube un archivo .csv o .xlsx.")
+    for line, row in enumerate(rows, start=1):
+        yield line, [_cell(v) for v in row]
+
+
+def _header_map(form_class, header):
+    """Índice de columna → campo del formulario; las columnas desconocidas se ignoran."""
+    model = form_class._meta.model
+    aliases = dict(HEADER_ALIASES)
+    for name in form_class._meta.fields:
+        aliases[name] = name
+        aliases[normalize_text(str(model._meta.get_field(name).verbose_name))] = name
+    fields = form_class._meta.fields
+    columns = {}
+    for index, title in enumerate(header):
+        field = aliases.get(normalize_text(title))
+        if field in fields and field not in columns.values():
+            columns[index] = field
+    if "name" not in columns.values():
+        raise ValueError("El archivo necesita una columna «Nombre».")
+    return columns
+
+
+# ============================
+#  UPSERT POR BLOQUES
+# ============================
+def _row_data(form_class, columns, row):
+    data = {}
+    for index, field in columns.items():
+        value = row[index] if index < len(row) else ""
+        if value == "":
+            continue
+        if isinstance(form_class.base_fields[field], BooleanField):
+            value = normalize_text(value) in TRUE_VALUES
+        data[field] = value
+    return data
+
+
+def _form_errors(form):
+    return "; ".join(
+        f"{form.fields[field].label}: {' '.join(messages)}" if field in form.fields else " ".join(messages)
+        for field, messages in form.errors.items()
+    )
+
+
+def _check_exclusivity(changed, updated, lines, report):
+    """
+    Igual que Staff.save(): bloquea a los staff que pasan a exclusivos y vuelve
+    a revisar sus traslapes dentro de la transacción (pudo agendarse algo
+    después de validar). Los que chocan salen del bloque con su error.
+    """
+    becoming = [obj.pk for obj in changed if not obj.allow_multiple]
+    if not becoming:
+        return
+    list(Staff.objects.select_for_update().filter(pk__in=becoming).values_list("pk", flat=True))
+    overlaps = exclusivity_overlaps(becoming, timezone.now())
+    for obj in changed:
+        if obj.pk in overlaps:
+            del updated[id(obj)]
+            report.add_error(lines[id(obj)], f"{obj._meta.get_field('allow_multiple').verbose_name}: "
+                                             f"{describe_overlap(obj, overlaps[obj.pk])}")
+
+
+def _import_chunk(model, form_class, columns, chunk, report):
+    fields = form_class._meta.fields
+    rows = [(line, _row_data(form_class, columns, row)) for line, row in chunk]
+    rows = [(line, data) for line, data in rows if data]  # filas en blanco
+
+    phones = {phone_search_key(d.get("phone")) for _, d in rows} - {""}
+    emails = {(d.get("email") or "").lower() for _, d in rows} - {""}
+    existing = list(model.objects.filter(Q(phone_key__in=phones) | Q(email_key__in=emails))) if phones or emails else []
+    by_phone, by_email = {}, {}
+    for obj in existing:
+        if obj.phone_key:
+            by_phone.setdefault(obj.phone_key, obj)
+        if obj.email_key:
+            by_email.setdefault(obj.email_key, obj)
+    allow_before = {obj.pk: obj.allow_multiple for obj in existing} if model is Staff else {}
+
+    created, updated, lines = {}, {}, {}
+    for line, data in rows:
+        phone_key, email_key = phone_search_key(data.get("phone")), (data.get("email") or "").lower()
+        instance = (phone_key and by_phone.get(phone_key)) or (email_key and by_email.get(email_key)) or None
+        target = instance or model()
+        snapshot = target.__dict__.copy()
+        # Para staff, StaffForm → Staff.clean() rechaza volverse exclusivo con citas traslapadas
+        form = form_class({**model_to_dict(target, fields=fields), **data}, instance=target)
+        if not form.is_valid():
+            # La validación ya copió valores a la instancia: deshacerlo
+            target.__dict__.update(snapshot)
+            report.add_error(line, _form_errors(form))
+            continue
+
+        target.set_search_keys()
+        # Las filas siguientes del mismo bloque también hacen match con esta persona
+        if target.phone_key:
+            by_phone[target.phone_key] = target
+        if target.email_key:
+            by_email[target.email_key] = target
+        (updated if target.pk else created)[id(target)] = target
+        lines[id(target)] = line
+
+    with transaction.atomic():
+        changed = [
+            obj for obj in updated.values() if allow_before and allow_before[obj.pk] != obj.allow_multiple
+        ]
+        if changed:
+            _check_exclusivity(changed, updated, lines, report)
+            changed = [obj for obj in changed if id(obj) in updated]
+        model.objects.bulk_create(created.values())
+        if updated:
+            model.objects.bulk_update(updated.values(), [*fields, *SEARCH_KEYS])
+        # Staff.save() propaga la exclusividad a las citas futuras; bulk_update no
+        now = timezone.now()
+        for allow in (True, False):
+            ids = [obj.pk for obj in changed if obj.allow_multiple == allow]
+            if ids:
+                apply_exclusivity(ids, not allow, now)
+
+    report.created += len(created)
+    report.updated += len(updated)
+
+
+def import_people(kind, fileobj, filename, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    Importa clientes (kind="client") o staff (kind="staff") desde un CSV/XLSX.
+    Lanza ValueError si el archivo no se puede leer (ImportAborted si ya se
+    guardaron bloques); los errores por fila van al reporte.
+    """
+    model, form_class = PEOPLE[kind]
+    report = ImportReport()
+    rows = read_rows(fileobj, filename)
+    try:
+        header = next(rows, None)
+    except UnicodeDecodeError as exc:
+        raise ValueError("No se pudo leer el archivo: el CSV debe estar en UTF-8.") from exc
+    if header is None:
+        raise ValueError("El archivo está vacío.")
+    columns = _header_map(form_class, header[1])
+
+    # En modo prueba todo corre en una transacción que se revierte al final
+    with transaction.atomic() if dry_run else nullcontext():
+        line = 1
+        try:
+            while chunk := list(islice(rows, chunk_size)):
+                _import_chunk(model, form_class, columns, chunk, report)
+                line = chunk[-1][0]
+        except UnicodeDecodeError as exc:
+            raise ImportAborted(
+                f"El CSV debe estar en UTF-8: se procesaron las filas hasta la {line} y el resto no se leyó.",
+                report,
+            ) from exc
+        if dry_run:
+            transaction.set_rollback(True)
+
+    if not dry_run and (report.created or report.updated):
+        bump_agenda(people=True)
+    return report
@@ -0,0 +1,205 @@
+"""
+Instrumentación SQL por petición (opcional).
+--------------------------------------------
+QueryInstrumentationMiddleware se activa con SQL_INSTRUMENTATION=True; si no,
+Django la descarta al arrancar (MiddlewareNotUsed) y no cuesta nada.
+
+Por cada petición registra:
+  • número de consultas y tiempo total en la base (execute_wrapper en cada conexión),
+  • tiempo de render de plantillas (solo la plantilla externa; include/extends no se suman dos veces),
+  • "huella" de cada consulta: el SQL con parámetros ya separados, listas IN
+    colapsadas y espacios normalizados. Si una huella se repite
+    SQL_N_PLUS_ONE_THRESHOLD veces o más, se marca como posible N+1 con el
+    origen de la primera repetición: línea de código del proyecto y, si ocurrió
+    al renderizar, plantilla y línea.
+
+Lo reporta en el encabezado Server-Timing (visible en las DevTools del
+navegador) y en una línea JSON del logger "bookings.instrumentation"
+(WARNING si hay N+1). Las respuestas en streaming solo incluyen lo ocurrido
+antes de empezar a enviarse.
+"""
+
+import json
+import logging
+import re
+import sys
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import base as template_base
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD = getattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+# Huellas repetidas que se reportan por petición (las más frecuentes)
+MAX_REPORTED = 5
+
+_stats = ContextVar("sql_instrumentation", default=None)
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)")
+_NUMBERS = re.compile(r"\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+THIS_FILE = __file__.rstrip("c")
+
+
+def fingerprint(sql):
+    """SQL sin valores: `IN (%s, %s, …)` → `IN (…)`, números → ?, espacios colapsados."""
+    sql = _IN_LIST.sub("IN (…)", sql)
+    sql = _NUMBERS.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+# ============================
+#  ORIGEN DE UNA CONSULTA
+# ============================
+def _origin():
+    """(archivo:línea función del proyecto, plantilla:línea) de la consulta en curso."""
+    code, template = None, None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == "render_annotated" and filename == template_base.__file__:
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin is not None and token is not None:
+                template = f"{origin.template_name or origin.name}:{token.lineno}"
+        if code is None and filename.startswith(PROJECT_DIR) and filename != THIS_FILE \
+                and "site-packages" not in filename:
+            code = f"{Path(filename).relative_to(PROJECT_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+        if code and template:
+            break
+        frame = frame.f_back
+    return code, template
+
+
+# ============================
+#  ESTADÍSTICAS POR PETICIÓN
+# ============================
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.view = None
+        self.counts = {}
+        self.origins = {}
+
+    def record(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        key = fingerprint(sql)
+        count = self.counts[key] = self.counts.get(key, 0) + 1
+        if count == 2:
+            # Solo se busca el origen de la primera repetición (recorrer la pila cuesta)
+            self.origins[key] = _origin()
+
+    def repeated(self):
+        rows = sorted(
+            ((key, n) for key, n in self.counts.items() if n >= THRESHOLD),
+            key=lambda row: row[1], reverse=True,
+        )
+        return [
+            {"count": n, "sql": key[:300], "code": self.origins[key][0], "template": self.origins[key][1]}
+            for key, n in rows[:MAX_REPORTED]
+        ]
+
+
+def _query_timer(execute, sql, params, many, context):
+    stats = _stats.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.record(sql, time.perf_counter() - started)
+
+
+def _install_template_timer():
+    """Envuelve Template._render (como hace Django en las pruebas) para medir el render."""
+    Template = template_base.Template
+    if getattr(Template._render, "_instrumented", False):
+        return
+    original = Template._render
+
+    def timed_render(self, context):
+        stats = _stats.get()
+        if stats is None:
+            return original(self, context)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            stats.template_depth -= 1
+            if stats.template_depth == 0:
+                stats.template_seconds += time.perf_counter() - started
+
+    timed_render._instrumented = True
+    Template._render = timed_render
+
+
+# ============================
+#  MIDDLEWARE
+# ============================
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_query_timer))
+                response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms, template_ms = stats.db_seconds * 1000, stats.template_seconds * 1000
+        repeated = stats.repeated()
+
+        timings = [
+            f'db;dur={db_ms:.1f};desc="SQL ({stats.queries})"',
+            f'tpl;dur={template_ms:.1f};desc="Plantillas"',
+            f'total;dur={total_ms:.1f}',
+        ]
+        if repeated:
+            timings.append(f'nplus1;desc="{len(repeated)} consultas repetidas"')
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = ", ".join(([existing] if existing else []) + timings)
+
+        line = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "view": stats.view,
+            "queries": stats.queries,
+            "db_ms": round(db_ms, 2),
+            "template_ms": round(template_ms, 2),
+            "total_ms": round(total_ms, 2),
+        }
+        if repeated:
+            line["n_plus_one"] = repeated
+        logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(line, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _stats.get()
+        if stats is not None:
+            view = getattr(view_func, "view_class", view_func)
+            stats.view = f"{view.__module__}.{view.__qualname__}"
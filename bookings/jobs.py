@@ -0,0 +1,142 @@
+"""
+Cola de trabajos respaldada en base de datos (patrón outbox).
+-------------------------------------------------------------
+Las vistas solo insertan un OutboxJob dentro de su transacción; el comando
+`manage.py run_outbox` los reclama en lotes, los ejecuta en un pool de hilos
+y registra el resultado:
+  • éxito     → done
+  • error     → pending de nuevo, con espera exponencial (run_after)
+  • agotado   → dead (queda visible en el admin para reintentar a mano)
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .mailer import send_messages
+from .models import Booking, Event, JobStatus, OutboxJob
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = getattr(settings, "OUTBOX_BACKOFF_BASE_SECONDS", 30)
+BACKOFF_MAX_SECONDS = getattr(settings, "OUTBOX_BACKOFF_MAX_SECONDS", 3600)
+# Un trabajo "running" más viejo que esto se considera huérfano (worker caído)
+LEASE_SECONDS = getattr(settings, "OUTBOX_LEASE_SECONDS", 600)
+
+
+# ============================
+#  HANDLERS
+# ============================
+def send_booking_email_job(payload):
+    from .utils import build_booking_email
+
+    try:
+        booking = Booking.objects.select_related("event").get(pk=payload["booking_id"])
+    except Booking.DoesNotExist:
+        logger.warning("Reserva %s eliminada; se omite el correo.", payload["booking_id"])
+        return
+    send_messages([build_booking_email(booking)])
+
+
+def send_event_cancelled_job(payload):
+    from .utils import build_event_cancelled_emails
+
+    event = Event.objects.filter(pk=payload["event_id"]).first()
+    if event is None:
+        return
+
+    def progress(message):
+        # run_job guarda el payload aunque el trabajo falle: el reintento sigue desde aquí
+        payload["notified_through"] = message.to[0]
+
+    sent = send_messages(
+        build_event_cancelled_emails(event, payload.get("reason"), after=payload.get("notified_through")),
+        on_sent=progress,
+        skip_refused=True,
+    )
+    logger.info("Aviso de cancelación del evento %s enviado a %s reservas.", event.pk, sent)
+
+
+HANDLERS = {
+    "booking_email": send_booking_email_job,
+    "event_cancelled": send_event_cancelled_job,
+}
+
+
+# ============================
+#  ENCOLAR
+# ============================
+def enqueue(kind, payload=None, delay=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+    run_after = timezone.now() + (delay or timedelta())
+    return OutboxJob.objects.create(kind=kind, payload=payload or {}, run_after=run_after)
+
+
+def enqueue_booking_email(booking):
+    return enqueue("booking_email", {"booking_id": booking.pk})
+
+
+def enqueue_event_cancelled(event, reason=None):
+    return enqueue("event_cancelled", {"event_id": event.pk, "reason": reason})
+
+
+# ============================
+#  RECLAMAR / EJECUTAR
+# ============================
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(limit):
+    """
+    Marca hasta `limit` trabajos listos como "running" y los devuelve.
+    En PostgreSQL usa SKIP LOCKED para que varios workers no tomen el mismo trabajo.
+    """
+    now = timezone.now()
+    ready = Q(status=JobStatus.PENDING, run_after__lte=now) | Q(
+        status=JobStatus.RUNNING, locked_at__lt=now - timedelta(seconds=LEASE_SECONDS)
+    )
+    with transaction.atomic():
+        jobs = list(
+            OutboxJob.objects.select_for_update(skip_locked=True)
+            .filter(ready)
+            .order_by("run_after")[:limit]
+        )
+        if not jobs:
+            return []
+        OutboxJob.objects.filter(pk__in=[j.pk for j in jobs]).update(
+            status=JobStatus.RUNNING, locked_at=now
+        )
+    for job in jobs:
+        job.status, job.locked_at = JobStatus.RUNNING, now
+    return jobs
+
+
+def run_job(job):
+    """Ejecuta un trabajo reclamado y persiste su resultado. Nunca lanza excepción."""
+    job.attempts += 1
+    try:
+        HANDLERS[job.kind](job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.DEAD
+            job.finished_at = timezone.now()
+            logger.error("Trabajo %s agotó sus %s intentos.", job, job.max_attempts)
+        else:
+            job.status = JobStatus.PENDING
+            job.run_after = timezone.now() + backoff_delay(job.attempts)
+            logger.warning("Trabajo %s falló (intento %s); reintento a las %s.", job, job.attempts, job.run_after)
+    else:
+        job.status = JobStatus.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ""
+    job.locked_at = None
+    job.save(update_fields=["payload", "attempts", "status", "run_after", "locked_at", "last_error", "finished_at"])
+    return job.status
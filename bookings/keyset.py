@@ -0,0 +1,191 @@
+"""
+Paginación keyset para las vistas HTML + conteos aproximados.
+-------------------------------------------------------------
+keyset_paginate() ordena por columnas indexadas (la última debe ser única,
+normalmente el id) y en lugar de OFFSET filtra "después de la última fila
+vista". El cursor viaja en la query string (?cursor=…), así que la página 500
+cuesta lo mismo que la primera y las altas a mitad de la navegación no hacen
+saltar ni repetir filas.
+
+approximate_count() evita COUNT(*) completos sobre tablas grandes:
+  • PostgreSQL → estimación del planner (EXPLAIN) si supera el tope,
+  • cualquier motor → conteo acotado a COUNT_CAP filas ("10000+").
+"""
+
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+PAGE_SIZE = getattr(settings, "KEYSET_PAGE_SIZE", 50)
+COUNT_CAP = getattr(settings, "APPROX_COUNT_CAP", 10000)
+
+
+# ============================
+#  CURSOR
+# ============================
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder recorta fechas a milisegundos; el cursor debe ser exacto."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _encode(values, backwards):
+    raw = json.dumps({"v": values, "b": backwards}, cls=_CursorEncoder)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor, fields):
+    """Valores del cursor convertidos al tipo de cada campo; None si es inválido."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = data["v"]
+        if len(values) != len(fields):
+            return None
+        return [f.to_python(v) for f, v in zip(fields, values)], bool(data["b"])
+    except (ValueError, KeyError, TypeError, ValidationError):
+        return None
+
+
+def _after(ordering, values, backwards):
+    """(a, b, c) > (x, y, z) respetando la dirección de cada columna, como OR de prefijos."""
+    condition = Q()
+    for i, (name, value) in enumerate(zip(ordering, values)):
+        field = name.lstrip("-")
+        descending = name.startswith("-") != backwards
+        step = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+        for prev_name, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_name.lstrip("-"): prev_value})
+        condition |= step
+    return condition
+
+
+# ============================
+#  PÁGINA
+# ============================
+class KeysetPage:
+    def __init__(self, request, object_list, ordering, has_next, has_previous, param):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self._request = request
+        self._ordering = ordering
+        self._param = param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _url(self, obj, backwards):
+        values = [getattr(obj, name.lstrip("-")) for name in self._ordering]
+        query = self._request.GET.copy()
+        query[self._param] = _encode(values, backwards)
+        return "?" + query.urlencode()
+
+    @property
+    def next_url(self):
+        return self._url(self.object_list[-1], False) if self.has_next else None
+
+    @property
+    def previous_url(self):
+        return self._url(self.object_list[0], True) if self.has_previous else None
+
+    @property
+    def first_url(self):
+        query = self._request.GET.copy()
+        query.pop(self._param, None)
+        return "?" + query.urlencode()
+
+
+def keyset_paginate(request, queryset, ordering, page_size=PAGE_SIZE, param="cursor"):
+    """
+    Página de `queryset` ordenada por `ordering` (p. ej. ("-created_at", "-id")).
+    Solo admite columnas locales del modelo; la última debe ser única.
+    """
+    ordering = tuple(ordering)
+    fields = [queryset.model._meta.get_field(name.lstrip("-")) for name in ordering]
+    decoded = _decode(request.GET.get(param, ""), fields) if request.GET.get(param) else None
+
+    backwards = False
+    qs = queryset.order_by(*ordering)
+    if decoded:
+        values, backwards = decoded
+        qs = queryset.filter(_after(ordering, values, backwards))
+        if backwards:
+            qs = qs.order_by(*[name[1:] if name.startswith("-") else f"-{name}" for name in ordering])
+        else:
+            qs = qs.order_by(*ordering)
+
+    rows = list(qs[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards and not more:
+        # Se llegó al inicio: mostrar la primera página completa
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        return KeysetPage(request, rows[:page_size], ordering, has_next=len(rows) > page_size,
+                          has_previous=False, param=param)
+    if backwards:
+        rows.reverse()
+        return KeysetPage(request, rows, ordering, has_next=True, has_previous=more, param=param)
+    return KeysetPage(request, rows, ordering, has_next=more, has_previous=bool(decoded), param=param)
+
+
+# ============================
+#  CONTEOS
+# ============================
+class ApproxCount(int):
+    """Entero que se muestra como "10000+" o "≈123456" cuando no es exacto."""
+
+    def __new__(cls, value, exact=True, capped=False):
+        obj = super().__new__(cls, value)
+        obj.exact, obj.capped = exact, capped
+        return obj
+
+    def __str__(self):
+        if self.capped:
+            return f"{int(self)}+"
+        return str(int(self)) if self.exact else f"≈{int(self)}"
+
+    @property
+    def display(self):
+        # Las plantillas localizan los int y se saltarían __str__: usar {{ total.display }}
+        return str(self)
+
+
+def _planner_estimate(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def approximate_count(queryset, cap=COUNT_CAP):
+    """Conteo exacto si hay menos de `cap` filas; si no, una estimación barata."""
+    if connections[queryset.db].vendor == "postgresql":
+        try:
+            estimate = _planner_estimate(queryset)
+        except DatabaseError:
+            estimate = 0
+        if estimate > cap:
+            return ApproxCount(estimate, exact=False)
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return ApproxCount(cap, exact=False, capped=True)
+    return ApproxCount(count)
@@ -0,0 +1,98 @@
+"""
+Barrido del ciclo de vida: eventos y citas que ya pasaron.
+----------------------------------------------------------
+  • Eventos activos o reprogramados (Event.duplicate() crea la nueva fecha
+    como postponed) cuyo inicio quedó antes del corte → finished.
+  • Citas pending/confirmed que terminaron antes del corte → estado final
+    configurable (LIFECYCLE_STALE_APPOINTMENTS, p. ej. confirmed → done).
+
+Se trabaja por lotes acotados: cada lote es una transacción corta que toma
+ids con SELECT … FOR UPDATE SKIP LOCKED (en PostgreSQL varios barridos no se
+pisan), hace un UPDATE por estado y un bulk_create del historial. Como
+UPDATE no dispara señales, se invalida la caché de agenda por lote. El
+historial solo se escribe para las citas que el UPDATE sí movió (donde SELECT …
+FOR UPDATE no bloquea, como SQLite, otra escritura pudo ganar la fila).
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import localdate
+
+from .agenda_cache import bump_agenda, invalidate_year_summary
+from .models import Appointment, AppointmentStatusHistory, Event, EventStatus
+
+BATCH_SIZE = 500
+
+# Estados de un evento que sigue "vigente" hasta que pasa su fecha
+OPEN_EVENT_STATUSES = [EventStatus.ACTIVE, EventStatus.POSTPONED]
+
+STALE_APPOINTMENTS = getattr(settings, "LIFECYCLE_STALE_APPOINTMENTS", {
+    "confirmed": "done",
+    "pending": "cancelled",
+})
+
+
+def finish_past_events(cutoff, batch_size=BATCH_SIZE, dry_run=False):
+    """Marca como finished los eventos vigentes que empezaron antes de `cutoff`. Devuelve cuántos."""
+    past = Event.objects.filter(status__in=OPEN_EVENT_STATUSES, start__lt=cutoff)
+    if dry_run:
+        return past.count()
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                past.select_for_update(skip_locked=True).order_by("start").values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += Event.objects.filter(pk__in=ids, status__in=OPEN_EVENT_STATUSES).update(
+                status=EventStatus.FINISHED
+            )
+        if len(ids) < batch_size:
+            break
+    if total:
+        bump_agenda(events=True)
+    return total
+
+
+def close_stale_appointments(cutoff, transitions=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Pasa las citas que terminaron antes de `cutoff` a su estado final.
+    Devuelve {estado_origen: cuántas}.
+    """
+    transitions = transitions or STALE_APPOINTMENTS
+    counts = {}
+    for old, new in transitions.items():
+        stale = Appointment.objects.filter(status=old, end__lt=cutoff)
+        if dry_run:
+            counts[old] = stale.count()
+            continue
+
+        counts[old] = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    stale.select_for_update(skip_locked=True)
+                    .order_by("end")
+                    .values_list("pk", "start")[:batch_size]
+                )
+                if not rows:
+                    break
+                ids = [pk for pk, _ in rows]
+                Appointment.objects.filter(pk__in=ids, status=old).update(status=new)
+                # Tras el UPDATE la transacción ya tiene el bloqueo de escritura
+                moved = list(Appointment.objects.filter(pk__in=ids, status=new).values_list("pk", flat=True))
+                counts[old] += len(moved)
+                AppointmentStatusHistory.objects.bulk_create([
+                    AppointmentStatusHistory(appointment_id=pk, old_status=old, new_status=new)
+                    for pk in moved
+                ])
+
+            days = {localdate(start) for _, start in rows}
+            years = {d.year for d in days}
+            invalidate_year_summary(*years)
+            bump_agenda(days=days, years=years)
+            if len(rows) < batch_size:
+                break
+    return counts
@@ -0,0 +1,156 @@
+"""
+Envío de correo con conexión SMTP persistente.
+----------------------------------------------
+Abrir SMTP + STARTTLS + login cuesta ~1 s contra Gmail (ver envio.py); hacerlo
+por cada mensaje convierte un envío masivo en minutos. PooledMailer:
+  • reutiliza una sola conexión (backend de Django configurado en settings),
+  • envía en lotes de MAIL_BATCH_SIZE (el límite de envío se aplica por lote),
+  • comprueba con NOOP las conexiones ociosas y reconecta si el servidor cortó,
+  • recicla la conexión cada MAIL_MESSAGES_PER_CONNECTION mensajes,
+  • respeta MAIL_MAX_PER_MINUTE (0 = sin límite).
+
+Es seguro entre hilos (el worker de run_outbox lo comparte). Para pruebas basta
+con apuntar EMAIL_HOST/EMAIL_PORT a un servidor SMTP local (o inyectar
+`connection_factory`, ver bookings/tests/test_mailer.py).
+
+Dentro de un lote los mensajes salen uno por uno sobre la misma conexión, así
+se sabe exactamente cuáles aceptó el servidor:
+  • si la conexión cae, se reconecta una vez y se sigue desde el mensaje en
+    curso (ese pudo llegar: entrega "al menos una vez" solo para él),
+  • los errores permanentes (destinatario o datos rechazados…) se propagan
+    sin reenviar nada de lo ya aceptado; con `skip_refused=True` un
+    destinatario rechazado se registra y se continúa con el resto.
+"""
+
+import logging
+import smtplib
+import socket
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "MAIL_BATCH_SIZE", 20)
+MESSAGES_PER_CONNECTION = getattr(settings, "MAIL_MESSAGES_PER_CONNECTION", 100)
+MAX_PER_MINUTE = getattr(settings, "MAIL_MAX_PER_MINUTE", 0)
+IDLE_CHECK_SECONDS = getattr(settings, "MAIL_IDLE_CHECK_SECONDS", 30)
+
+# Errores de conexión tras los que vale la pena reconectar y reintentar.
+# Ojo: smtplib.SMTPException hereda de OSError, así que OSError no puede ir aquí
+# (convertiría un rechazo permanente en "reconectar y reenviar").
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+class PooledMailer:
+    def __init__(self, connection_factory=get_connection, batch_size=BATCH_SIZE,
+                 messages_per_connection=MESSAGES_PER_CONNECTION, max_per_minute=MAX_PER_MINUTE):
+        self._factory = connection_factory
+        self.batch_size = batch_size
+        self.messages_per_connection = messages_per_connection
+        self.min_interval = 60.0 / max_per_minute if max_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._sent_on_conn = 0
+        self._last_used = 0.0
+        self._next_slot = 0.0
+
+    # ---------- conexión ----------
+    def _open(self):
+        self._conn = self._factory(fail_silently=False)
+        self._conn.open()
+        self._sent_on_conn = 0
+        self._last_used = time.monotonic()
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _is_alive(self):
+        smtp = getattr(self._conn, "connection", None)
+        if smtp is None:
+            return True  # backends sin socket (locmem, console…)
+        try:
+            return smtp.noop()[0] == 250
+        except RECONNECT_ERRORS:
+            return False
+
+    def _ensure_connection(self):
+        if self._conn is not None and self._sent_on_conn >= self.messages_per_connection:
+            self._close()
+        if self._conn is not None and time.monotonic() - self._last_used > IDLE_CHECK_SECONDS:
+            if not self._is_alive():
+                logger.info("Conexión SMTP inactiva cerrada por el servidor; reconectando.")
+                self._close()
+        if self._conn is None:
+            self._open()
+
+    # ---------- límite de envío ----------
+    def _throttle(self, count):
+        if not self.min_interval:
+            return
+        now = time.monotonic()
+        if self._next_slot > now:
+            time.sleep(self._next_slot - now)
+        self._next_slot = max(now, self._next_slot) + self.min_interval * count
+
+    # ---------- envío ----------
+    def _send_one(self, message):
+        self._ensure_connection()
+        try:
+            sent = self._conn.send_messages([message])
+        except RECONNECT_ERRORS as exc:
+            logger.warning("Conexión SMTP perdida (%s); reconectando.", exc)
+            self._close()
+            self._open()
+            sent = self._conn.send_messages([message])
+        self._sent_on_conn += 1
+        self._last_used = time.monotonic()
+        return sent or 0
+
+    def _send_batch(self, batch, on_sent=None, skip_refused=False):
+        sent = 0
+        for message in batch:
+            try:
+                accepted = self._send_one(message)
+            except smtplib.SMTPRecipientsRefused as exc:
+                if not skip_refused:
+                    raise
+                logger.warning("Destinatario rechazado, se omite: %s", ", ".join(exc.recipients))
+                continue
+            if accepted:
+                sent += 1
+                if on_sent:
+                    on_sent(message)
+        return sent
+
+    def send_messages(self, messages, on_sent=None, skip_refused=False):
+        """
+        Envía `messages` reutilizando la conexión. Devuelve cuántos se enviaron.
+        `on_sent(message)` se llama por cada mensaje aceptado (para registrar avance).
+        """
+        total = 0
+        messages = iter(messages)
+        with self._lock:
+            while batch := list(islice(messages, self.batch_size)):
+                self._throttle(len(batch))
+                total += self._send_batch(batch, on_sent, skip_refused)
+        return total
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+mailer = PooledMailer()
+
+
+def send_messages(messages, on_sent=None, skip_refused=False):
+    return mailer.send_messages(messages, on_sent=on_sent, skip_refused=skip_refused)
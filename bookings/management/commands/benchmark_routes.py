@@ -0,0 +1,119 @@
+"""
+Mide cada ruta de la app (latencia + consultas) contra datos sintéticos.
+------------------------------------------------------------------------
+Uso:
+    python manage.py benchmark_routes                                  # escala small
+    python manage.py benchmark_routes --sizes small,medium --output bench.json
+    python manage.py benchmark_routes --baseline main.json --threshold 0.2
+    python manage.py benchmark_routes --current-db                     # sin sembrar, base actual
+
+Por cada tamaño se crea una base de pruebas, se llena con synthetic.generate()
+y se destruye al terminar. Sale con error si alguna ruta pasa su presupuesto
+de consultas, responde un estado inesperado o empeora respecto al baseline.
+"""
+
+import json
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from bookings import benchmarks
+from bookings.synthetic import SCALES, generate
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = "Benchmark por ruta con presupuesto de consultas y comparación contra un JSON anterior."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="small", help=f"Escalas separadas por coma ({', '.join(SCALES)}).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=10, help="Peticiones por ruta.")
+        parser.add_argument("--output", help="Guarda los resultados en este JSON.")
+        parser.add_argument("--baseline", help="JSON de una corrida anterior para detectar regresiones.")
+        parser.add_argument("--threshold", type=float, default=0.25, help="Regresión tolerada en p50 (0.25 = 25%%).")
+        parser.add_argument("--current-db", action="store_true",
+                            help="Mide sobre la base configurada, sin sembrar (los POST se revierten).")
+
+    def handle(self, *args, **options):
+        sizes = ["current"] if options["current_db"] else [s.strip() for s in options["sizes"].split(",") if s.strip()]
+        unknown = [s for s in sizes if s != "current" and s not in SCALES]
+        if unknown:
+            raise CommandError(f"Escalas desconocidas: {', '.join(unknown)}")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as fh:
+                baseline = json.load(fh)["results"]
+
+        setup_test_environment()
+        results = {}
+        try:
+            for size in sizes:
+                results[size] = self._run_size(size, options)
+        finally:
+            teardown_test_environment()
+
+        failures = benchmarks.check(results, baseline, options["threshold"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump({
+                    "meta": {
+                        "commit": _git_commit(),
+                        "created": timezone.now().isoformat(),
+                        "vendor": connection.vendor,
+                        "seed": options["seed"],
+                        "repeat": options["repeat"],
+                    },
+                    "results": results,
+                }, fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultados en {options['output']}")
+
+        for failure in failures:
+            self.stderr.write(self.style.ERROR(f"  ✗ {failure}"))
+        if failures:
+            raise CommandError(f"{len(failures)} fallas de presupuesto o regresión.")
+        self.stdout.write(self.style.SUCCESS("Todas las rutas dentro de presupuesto."))
+
+    def _run_size(self, size, options):
+        if size == "current":
+            user = benchmarks.benchmark_user(create=False)
+            return self._measure(size, user, options, create_missing=False)
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.monotonic()
+            counts = generate(scale=size, seed=options["seed"])
+            self.stdout.write(f"[{size}] datos: {sum(counts.values()):,} filas ({time.monotonic() - started:.1f} s)")
+            return self._measure(size, benchmarks.benchmark_user(), options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _measure(self, size, user, options, create_missing=True):
+        self.stdout.write(f"[{size}] {'ruta':<32} {'HTTP':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'SQL':>7} {'ms SQL':>8}")
+
+        def progress(label, r):
+            flag = "" if r["queries"] <= r["budget"] and r["status"] == r["expect"] else "  ✗"
+            self.stdout.write(
+                f"[{size}] {label:<32} {r['status']:>4} {r['p50_ms']:>8.1f} {r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+                f" {r['queries']:>3}/{r['budget']:<3} {r['sql_ms']:>8.1f}{flag}"
+            )
+
+        results = benchmarks.run_routes(
+            repeat=options["repeat"], user=user, create_missing=create_missing, progress=progress,
+        )
+        for label, r in results.items():
+            if "skipped" in r:
+                self.stdout.write(f"[{size}] {label:<32} omitida ({r['skipped']})")
+        return results
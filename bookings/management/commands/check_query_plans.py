@@ -0,0 +1,34 @@
+"""
+Verifica que las consultas calientes usen índices (EXPLAIN).
+------------------------------------------------------------
+Uso:
+    python manage.py check_query_plans
+
+Falla (código de salida 1) si alguna consulta recorre la tabla completa.
+La misma verificación corre en las pruebas (bookings/tests/test_query_plans.py);
+este comando sirve para revisarla contra una base real. Ver bookings/query_plans.py.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.query_plans import SUPPORTED_VENDORS, check_plans
+
+
+class Command(BaseCommand):
+    help = "Comprueba con EXPLAIN que las consultas de agenda/reservas usen índices."
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(f"Motor no soportado: {connection.vendor}")
+
+        failures = 0
+        for label, plan, indexed in check_plans():
+            if indexed:
+                self.stdout.write(self.style.SUCCESS(f"✓ {label}"))
+            else:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"✗ {label}\n{plan}"))
+
+        if failures:
+            raise CommandError(f"{failures} consultas sin índice.")
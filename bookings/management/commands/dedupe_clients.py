@@ -0,0 +1,43 @@
+"""
+Busca y fusiona clientes duplicados (mismo teléfono E.164 o correo normalizado).
+--------------------------------------------------------------------------------
+Uso:
+    python manage.py dedupe_clients            # solo reporta los grupos
+    python manage.py dedupe_clients --merge    # fusiona cada grupo en su cliente más antiguo
+"""
+
+from django.core.management.base import BaseCommand
+
+from bookings.dedupe import find_duplicate_groups, merge_clients
+from bookings.models import Client
+
+
+class Command(BaseCommand):
+    help = "Detecta clientes duplicados por claves de bloqueo y opcionalmente los fusiona."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--merge", action="store_true", help="Fusiona los duplicados encontrados.")
+        parser.add_argument("--limit", type=int, default=0, help="Máximo de grupos a procesar (0 = todos).")
+
+    def handle(self, *args, **options):
+        groups = find_duplicate_groups()
+        if options["limit"]:
+            groups = groups[:options["limit"]]
+
+        names = dict(Client.objects.filter(pk__in=[pk for g in groups for pk in g]).values_list("pk", "name"))
+        moved = 0
+        for group in groups:
+            keep, *duplicates = group
+            self.stdout.write(
+                f"  #{keep} {names.get(keep)} ← " + ", ".join(f"#{pk} {names.get(pk)}" for pk in duplicates)
+            )
+            if options["merge"]:
+                moved += merge_clients(keep, duplicates)
+
+        extra = sum(len(g) - 1 for g in groups)
+        if options["merge"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Grupos fusionados: {len(groups)} · clientes eliminados: {extra} · citas movidas: {moved}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Grupos: {len(groups)} · duplicados: {extra}"))
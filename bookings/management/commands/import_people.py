@@ -0,0 +1,38 @@
+"""
+Importa clientes o staff desde un CSV/XLSX (upsert por teléfono o correo).
+-------------------------------------------------------------------------
+Uso:
+    python manage.py import_people clientes.xlsx
+    python manage.py import_people staff.csv --type staff --dry-run
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.importer import CHUNK_SIZE, import_people
+
+
+class Command(BaseCommand):
+    help = "Importa clientes o staff en bloques, validando cada fila con el formulario."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo .csv o .xlsx (la primera fila son los encabezados).")
+        parser.add_argument("--type", choices=["client", "staff"], default="client")
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Filas por transacción.")
+        parser.add_argument("--dry-run", action="store_true", help="Valida todo y revierte al final.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as fileobj:
+                report = import_people(
+                    options["type"], fileobj, options["path"],
+                    chunk_size=options["chunk"], dry_run=options["dry_run"],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for line, message in report.errors:
+            self.stderr.write(f"  fila {line}: {message}")
+        prefix = "[prueba] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Nuevos: {report.created} · actualizados: {report.updated} · con errores: {report.error_count}"
+        ))
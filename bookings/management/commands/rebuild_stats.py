@@ -0,0 +1,18 @@
+"""
+Reconstruye los acumulados del dashboard (EventStats / DailyStats).
+------------------------------------------------------------------
+Uso:
+    python manage.py rebuild_stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from bookings.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula los acumulados por evento y por día a partir de las reservas."
+
+    def handle(self, *args, **options):
+        events, days = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Acumulados reconstruidos: {events} eventos, {days} días."))
@@ -0,0 +1,48 @@
+"""
+Recalcula Event.seats_taken a partir de las reservas no canceladas.
+-------------------------------------------------------------------
+Uso:
+    python manage.py reconcile_seats            # corrige desfases
+    python manage.py reconcile_seats --dry-run  # solo reporta
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from bookings.models import Booking, Event
+
+
+class Command(BaseCommand):
+    help = "Recalcula el contador de lugares ocupados de cada evento desde las reservas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Solo reporta eventos desfasados.")
+
+    def handle(self, *args, **options):
+        taken = (
+            Booking.objects.filter(event=OuterRef("pk"), cancelled=False)
+            .values("event")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        actual = Coalesce(Subquery(taken), 0)
+
+        with transaction.atomic():
+            drifted = (
+                Event.objects.select_for_update()
+                .annotate(actual=actual)
+                .exclude(seats_taken=F("actual"))
+            )
+            rows = list(drifted.values_list("pk", "title", "seats_taken", "actual"))
+            for pk, title, stored, real in rows:
+                self.stdout.write(f"  #{pk} {title}: contador={stored} reservas={real}")
+
+            if options["dry_run"] or not rows:
+                self.stdout.write(self.style.SUCCESS(f"Eventos desfasados: {len(rows)}"))
+                return
+
+            Event.objects.filter(pk__in=[r[0] for r in rows]).update(seats_taken=actual)
+
+        self.stdout.write(self.style.SUCCESS(f"Eventos corregidos: {len(rows)}"))
@@ -0,0 +1,63 @@
+"""
+Worker de la cola de trabajos (correos de confirmación, PDFs…).
+---------------------------------------------------------------
+Uso:
+    python manage.py run_outbox                 # bucle continuo
+    python manage.py run_outbox --once          # procesa lo pendiente y termina
+    python manage.py run_outbox --workers 8 --batch 50
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from bookings.jobs import claim_batch, run_job
+from bookings.mailer import mailer
+from bookings.models import JobStatus
+
+
+def _run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        # Cada hilo abre su propia conexión; se cierra al terminar el trabajo
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de trabajos en segundo plano (outbox)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Hilos concurrentes.")
+        parser.add_argument("--batch", type=int, default=20, help="Trabajos reclamados por ronda.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Segundos de espera si no hay trabajo.")
+        parser.add_argument("--once", action="store_true", help="Vacía la cola una vez y termina.")
+
+    def handle(self, *args, **options):
+        totals = {JobStatus.DONE: 0, JobStatus.PENDING: 0, JobStatus.DEAD: 0}
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    jobs = claim_batch(options["batch"])
+                    if not jobs:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+                        continue
+
+                    for status in pool.map(_run_in_thread, jobs):
+                        totals[status] += 1
+            except KeyboardInterrupt:
+                self.stdout.write("Deteniendo worker…")
+            finally:
+                mailer.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Completados: {totals[JobStatus.DONE]} · "
+            f"Reintentos programados: {totals[JobStatus.PENDING]} · "
+            f"Fallidos: {totals[JobStatus.DEAD]}"
+        ))
@@ -0,0 +1,54 @@
+"""
+Genera un conjunto de datos sintético para reproducir volúmenes de producción.
+------------------------------------------------------------------------------
+Uso:
+    python manage.py seed_dataset                       # escala "small"
+    python manage.py seed_dataset --scale large --seed 7
+    python manage.py seed_dataset --scale medium --bookings 500000 --years 5
+
+Misma semilla + misma fecha ancla (--anchor) = mismos datos. Usar sobre una
+base de desarrollo: inserta sin borrar lo que ya existe.
+"""
+
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.synthetic import CHUNK_SIZE, SCALES, generate
+
+
+class Command(BaseCommand):
+    help = "Llena la base con eventos, reservas, personas y citas sintéticas (bulk_create por bloques)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=list(SCALES), default="small")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--years", type=int, default=3, help="Años de historial hacia atrás.")
+        parser.add_argument("--anchor", type=date.fromisoformat, help="Fecha 'hoy' del conjunto (YYYY-MM-DD).")
+        parser.add_argument("--cancel-rate", type=float, default=0.1, help="Proporción de reservas canceladas.")
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Filas por bulk_create.")
+        for name in SCALES["small"]:
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                                help=f"Sobrescribe el volumen de {name}.")
+        parser.add_argument("--force", action="store_true", help="Permite correr con DEBUG=False.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("DEBUG=False: ¿es producción? Usa --force si de verdad quieres generar datos.")
+
+        started = time.monotonic()
+
+        def progress(label, total):
+            if total % (options["chunk"] * 20) == 0:
+                self.stdout.write(f"  {label}: {total:,}")
+
+        counts = generate(
+            scale=options["scale"], seed=options["seed"], years=options["years"],
+            cancel_rate=options["cancel_rate"], anchor=options["anchor"],
+            chunk_size=options["chunk"], progress=progress,
+            **{name: options[name] for name in SCALES["small"]},
+        )
+        summary = " · ".join(f"{name}: {n:,}" for name, n in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"{summary} ({time.monotonic() - started:.1f} s)"))
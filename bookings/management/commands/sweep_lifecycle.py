@@ -0,0 +1,45 @@
+"""
+Cierra eventos y citas que ya pasaron (ver bookings/lifecycle.py).
+------------------------------------------------------------------
+Uso (p. ej. desde cron cada hora):
+    python manage.py sweep_lifecycle
+    python manage.py sweep_lifecycle --grace-hours 48 --pending-to cancelled --confirmed-to done
+    python manage.py sweep_lifecycle --dry-run
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.lifecycle import BATCH_SIZE, STALE_APPOINTMENTS, close_stale_appointments, finish_past_events
+
+TERMINAL = ["done", "cancelled"]
+
+
+class Command(BaseCommand):
+    help = "Marca eventos pasados como finalizados y cierra citas pendientes/confirmadas vencidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-hours", type=float, default=12,
+                            help="Horas de margen después del evento o de la cita.")
+        parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Filas por transacción.")
+        parser.add_argument("--pending-to", choices=TERMINAL, default=STALE_APPOINTMENTS.get("pending"))
+        parser.add_argument("--confirmed-to", choices=TERMINAL, default=STALE_APPOINTMENTS.get("confirmed"))
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta lo que se cerraría.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        transitions = {
+            old: new for old, new in (("pending", options["pending_to"]), ("confirmed", options["confirmed_to"]))
+            if new
+        }
+
+        events = finish_past_events(cutoff, options["batch"], options["dry_run"])
+        appointments = close_stale_appointments(cutoff, transitions, options["batch"], options["dry_run"])
+
+        verb = "Por cerrar" if options["dry_run"] else "Cerrados"
+        self.stdout.write(f"  eventos → finished: {events}")
+        for old, count in appointments.items():
+            self.stdout.write(f"  citas {old} → {transitions[old]}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {events + sum(appointments.values())}"))
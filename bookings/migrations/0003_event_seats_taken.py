@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats_taken(apps, schema_editor):
+    Event = apps.get_model("bookings", "Event")
+    Booking = apps.get_model("bookings", "Booking")
+    taken = (
+        Booking.objects.filter(event=OuterRef("pk"), cancelled=False)
+        .values("event")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    Event.objects.update(seats_taken=Coalesce(Subquery(taken), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_client_is_whatsapp_staff_is_whatsapp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Lugares ocupados'),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+    ]
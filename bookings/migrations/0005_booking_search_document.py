@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+from bookings.search import build_search_document, install_search_index, uninstall_search_index
+
+
+def backfill_search_document(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    batch = []
+    for booking in Booking.objects.only("name", "email", "phone").iterator(chunk_size=2000):
+        booking.search_document = build_search_document(booking)
+        batch.append(booking)
+        if len(batch) >= 2000:
+            Booking.objects.bulk_update(batch, ["search_document"])
+            batch = []
+    if batch:
+        Booking.objects.bulk_update(batch, ["search_document"])
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection, rebuild=True)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_outboxjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
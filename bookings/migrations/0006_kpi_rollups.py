@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_stats(apps, schema_editor):
+    Booking = apps.get_model("bookings", "Booking")
+    EventStats = apps.get_model("bookings", "EventStats")
+    DailyStats = apps.get_model("bookings", "DailyStats")
+    aggregates = {
+        "bookings": Count("id"),
+        "tickets": Coalesce(Sum("quantity", filter=Q(cancelled=False)), 0),
+        "cancellations": Count("id", filter=Q(cancelled=True)),
+    }
+    per_event = Booking.objects.order_by().values("event_id").annotate(**aggregates)
+    EventStats.objects.bulk_create([EventStats(**row) for row in per_event], batch_size=1000)
+    per_day = Booking.objects.order_by().annotate(day=TruncDate("created_at")).values("day").annotate(**aggregates)
+    DailyStats.objects.bulk_create([DailyStats(**row) for row in per_day], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('bookings', models.IntegerField(default=0)),
+                ('tickets', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='bookings.event')),
+                ('bookings', models.IntegerField(default=0)),
+                ('tickets', models.IntegerField(default=0)),
+                ('cancellations', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+DEFAULT_MINUTES = 60
+
+# Respaldo en la base de datos: dos citas bloqueantes del mismo staff no pueden traslaparse
+POSTGRES_EXCLUDE = """
+    ALTER TABLE bookings_appointment ADD CONSTRAINT appointment_no_overlap
+    EXCLUDE USING gist (staff_id WITH =, tstzrange(start, "end", '[)') WITH &&)
+    WHERE (staff_exclusive AND status <> 'cancelled')
+"""
+
+
+def backfill_schedule(apps, schema_editor):
+    """
+    Duración, fin y exclusividad de las citas existentes. Antes nada impedía
+    traslapes, así que si un staff exclusivo ya tiene citas encimadas, las que
+    chocan con una anterior quedan como no exclusivas (se conservan tal cual y
+    no rompen la restricción; al editarlas se validan de nuevo).
+    """
+    Appointment = apps.get_model("bookings", "Appointment")
+    batch = []
+    staff_id, latest_end = None, None
+    rows = Appointment.objects.select_related("staff").order_by("staff_id", "start", "pk")
+    for appt in rows.iterator(chunk_size=1000):
+        if appt.staff_id != staff_id:
+            staff_id, latest_end = appt.staff_id, None
+        appt.duration_minutes = DEFAULT_MINUTES
+        appt.end = appt.start + timedelta(minutes=DEFAULT_MINUTES)
+        appt.staff_exclusive = not appt.staff.allow_multiple
+        if appt.staff_exclusive and appt.status != "cancelled":
+            if latest_end is not None and appt.start < latest_end:
+                appt.staff_exclusive = False
+            else:
+                latest_end = appt.end
+        batch.append(appt)
+        if len(batch) >= 1000:
+            Appointment.objects.bulk_update(batch, ["duration_minutes", "end", "staff_exclusive"])
+            batch = []
+    Appointment.objects.bulk_update(batch, ["duration_minutes", "end", "staff_exclusive"])
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(POSTGRES_EXCLUDE)
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("ALTER TABLE bookings_appointment DROP CONSTRAINT IF EXISTS appointment_no_overlap")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Duración (min)'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='end',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='service',
+            field=models.ForeignKey(blank=True, help_text='Define la duración por defecto', null=True, on_delete=django.db.models.deletion.PROTECT, to='bookings.eventtype', verbose_name='Servicio'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='staff_exclusive',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_schedule, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='appointment',
+            name='end',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_appointment_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(verbose_name='Primera cita')),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True, verbose_name='Duración (min)')),
+                ('frequency', models.CharField(choices=[('weekly', 'Semanal'), ('biweekly', 'Cada dos semanas'), ('monthly', 'Mensual')], default='weekly', max_length=10, verbose_name='Frecuencia')),
+                ('until', models.DateField(blank=True, null=True, verbose_name='Repetir hasta')),
+                ('count', models.PositiveIntegerField(blank=True, null=True, verbose_name='Número de citas')),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.client')),
+                ('service', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='bookings.eventtype', verbose_name='Servicio')),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bookings.staff')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='series',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='bookings.appointmentseries'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+from bookings.search import normalize_text, phone_search_key
+
+
+def backfill_keys(apps, schema_editor):
+    for model_name in ("Client", "Staff"):
+        Model = apps.get_model("bookings", model_name)
+        batch = []
+        for person in Model.objects.only("id", "name", "phone", "email").iterator(chunk_size=1000):
+            person.name_key = normalize_text(person.name)
+            person.phone_key = phone_search_key(person.phone)
+            person.email_key = (person.email or "").strip().lower()
+            batch.append(person)
+            if len(batch) >= 1000:
+                Model.objects.bulk_update(batch, ["name_key", "phone_key", "email_key"])
+                batch = []
+        Model.objects.bulk_update(batch, ["name_key", "phone_key", "email_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_appointment_status_end_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['active', 'name_key'], name='client_name_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['active', 'phone_key'], name='client_phone_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['active', 'email_key'], name='client_email_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['active', 'name_key'], name='staff_name_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['active', 'phone_key'], name='staff_phone_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['active', 'email_key'], name='staff_email_key_idx'),
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+    ]
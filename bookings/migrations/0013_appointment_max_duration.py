@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:27
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0012_person_name_order_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(1440)], verbose_name='Duración (min)'),
+        ),
+        migrations.AlterField(
+            model_name='appointmentseries',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MaxValueValidator(1440)], verbose_name='Duración (min)'),
+        ),
+    ]
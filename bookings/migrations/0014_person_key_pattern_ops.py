@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0013_appointment_max_duration'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_name_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_phone_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_email_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='staff',
+            name='staff_name_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='staff',
+            name='staff_phone_key_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='staff',
+            name='staff_email_key_idx',
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('active', True)), fields=['name_key'], name='client_name_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('active', True)), fields=['phone_key'], name='client_phone_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('active', True)), fields=['email_key'], name='client_email_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(condition=models.Q(('active', True)), fields=['name_key'], name='staff_name_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(condition=models.Q(('active', True)), fields=['phone_key'], name='staff_phone_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(condition=models.Q(('active', True)), fields=['email_key'], name='staff_email_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -1,10 +1,18 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 import uuid
 from datetime import timedelta
 
+from .search import build_search_document, normalize_text, phone_search_key
+
 User = get_user_model()
 
 # --------------------------------------------------------------------
@@ -25,6 +33,16 @@ class EventStatus(models.TextChoices):
     FINISHED = "finished", "Finalizado"
 
 
+class SeatsUnavailable(Exception):
+    """No hay suficientes lugares disponibles para completar la reserva."""
+
+
+class EventQuerySet(models.QuerySet):
+    def with_availability(self):
+        """Anota `seats_left` en la misma consulta (evita una consulta por tarjeta)."""
+        return self.annotate(seats_left=Greatest(F("capacity") - F("seats_taken"), 0))
+
+
 # --------------------------------------------------------------------
 #  Eventos
 # --------------------------------------------------------------------
@@ -34,6 +52,9 @@ class Event(models.Model):
     description = models.TextField(blank=True)
     start = models.DateTimeField()
     capacity = models.PositiveIntegerField(default=1)
+    # Contador desnormalizado: suma de `quantity` de reservas no canceladas.
+    # Solo se modifica con UPDATE condicionales (reserve_seats / release_seats).
+    seats_taken = models.PositiveIntegerField("Lugares ocupados", default=0, editable=False)
     organizer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     allow_group_booking = models.BooleanField(default=False)
     max_tickets_per_booking = models.PositiveIntegerField(default=1)
@@ -51,6 +72,8 @@ class Event(models.Model):
         help_text="Evento original si fue reprogramado",
     )
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.CheckConstraint(
@@ -58,17 +81,48 @@ class Event(models.Model):
                 name="valid_group_booking_limit",
             ),
         ]
+        indexes = [
+            models.Index(fields=["start"], name="event_start_idx"),
+        ]
         ordering = ["-start"]
 
     def __str__(self):
         return f"{self.title} — {self.start.strftime('%d/%m/%Y %H:%M')} ({self.get_status_display()})"
 
-    @property
-    def seats_taken(self):
-        return self.bookings.filter(cancelled=False).aggregate(models.Sum("quantity"))["quantity__sum"] or 0
+    def save(self, *args, **kwargs):
+        # Nunca sobrescribir el contador con un valor leído antes (ediciones del panel)
+        if not self._state.adding and self.pk and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "seats_taken"
+            ]
+        super().save(*args, **kwargs)
+
+    def reserve_seats(self, quantity):
+        """
+        Ocupa `quantity` lugares de forma atómica.
+        El UPDATE solo aplica si cabe dentro de la capacidad; si no, lanza SeatsUnavailable.
+        """
+        updated = Event.objects.filter(
+            pk=self.pk, seats_taken__lte=F("capacity") - quantity
+        ).update(seats_taken=F("seats_taken") + quantity)
+        if not updated:
+            raise SeatsUnavailable("No hay suficientes lugares disponibles.")
+        self.refresh_from_db(fields=["seats_taken"])
+
+    def release_seats(self, quantity):
+        """Libera `quantity` lugares (sin bajar de cero)."""
+        updated = Event.objects.filter(pk=self.pk).update(
+            seats_taken=Greatest(F("seats_taken") - quantity, 0)
+        )
+        if updated:
+            self.refresh_from_db(fields=["seats_taken"])
 
     @property
     def seats_available(self):
+        # Reutiliza la anotación de EventQuerySet.with_availability() si existe
+        if "seats_left" in self.__dict__:
+            return self.seats_left
         return max(0, self.capacity - self.seats_taken)
 
     @property
@@ -108,14 +162,72 @@ class Booking(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     cancelled = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    confirmation_code = models.UUIDField(default=uuid.uuid4, editable=False, null=True, blank=True)
+    confirmation_code = models.UUIDField(default=uuid.uuid4, editable=False, null=True, blank=True, unique=True)
+    # Texto normalizado (nombre, correo, dígitos del teléfono) indexado por search.py
+    search_document = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["event", "cancelled"], name="booking_event_cancelled_idx"),
+            models.Index(fields=["-created_at"], name="booking_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.event.title})"
 
+    @property
+    def seats_held(self):
+        return 0 if self.cancelled else self.quantity
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda la reserva manteniendo `Event.seats_taken` en la misma transacción.
+        Lanza SeatsUnavailable si el evento no tiene cupo para la diferencia.
+        """
+        self.search_document = build_search_document(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"name", "email", "phone"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "search_document"}
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = (
+                    Booking.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values("event_id", "quantity", "cancelled", "created_at")
+                    .first()
+                )
+
+            held_before = 0
+            if previous and not previous["cancelled"]:
+                held_before = previous["quantity"]
+
+            if previous and previous["event_id"] != self.event_id:
+                # Cambio de evento: liberar en el anterior y reservar completo en el nuevo
+                if held_before:
+                    Event(pk=previous["event_id"]).release_seats(held_before)
+                held_before = 0
+
+            delta = self.seats_held - held_before
+            if delta > 0:
+                self.event.reserve_seats(delta)
+            elif delta < 0:
+                self.event.release_seats(-delta)
+
+            super().save(*args, **kwargs)
+
+            from .rollups import record_booking_change
+            record_booking_change(previous, self)
+
+    def cancel(self):
+        """Cancela la reserva y devuelve sus lugares al evento."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.save()
+
 
 # --------------------------------------------------------------------
 #  Personas base y derivadas
@@ -131,14 +243,47 @@ class Person(models.Model):
     available_days = models.JSONField("Días disponibles", blank=True, null=True)
     active = models.BooleanField("Activo", default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Claves normalizadas para la búsqueda por prefijo (search.person_prefix_filter)
+    name_key = models.CharField(max_length=100, blank=True, editable=False)
+    phone_key = models.CharField(max_length=20, blank=True, editable=False)
+    email_key = models.CharField(max_length=254, blank=True, editable=False)
+
+    KEY_SOURCES = {"name": "name_key", "phone": "phone_key", "email": "email_key"}
 
     class Meta:
         abstract = True
         ordering = ["name"]
+        # Índices parciales (solo activos): Django escribe `WHERE active` sin "= 1" y
+        # así ningún motor usaba (active, *_key). varchar_pattern_ops: en PostgreSQL
+        # LIKE 'prefijo%' solo usa el índice con esta clase (SQLite ignora opclasses).
+        indexes = [
+            models.Index(fields=["name_key"], name="%(class)s_name_key_idx",
+                         condition=Q(active=True), opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["phone_key"], name="%(class)s_phone_key_idx",
+                         condition=Q(active=True), opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["email_key"], name="%(class)s_email_key_idx",
+                         condition=Q(active=True), opclasses=["varchar_pattern_ops"]),
+            # Listado alfabético paginado por keyset (views_persons.person_list)
+            models.Index(fields=["name_key", "id"], name="%(class)s_name_order_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def set_search_keys(self):
+        """Calcula las claves normalizadas (bulk_create/bulk_update no pasan por save)."""
+        self.name_key = normalize_text(self.name)
+        self.phone_key = phone_search_key(self.phone)
+        self.email_key = (self.email or "").strip().lower()
+
+    def save(self, *args, **kwargs):
+        self.set_search_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            keys = {self.KEY_SOURCES[f] for f in update_fields if f in self.KEY_SOURCES}
+            kwargs["update_fields"] = {*update_fields, *keys}
+        super().save(*args, **kwargs)
+
 
 class Client(Person):
     """Cliente del sistema de reservas."""
@@ -154,15 +299,109 @@ class Staff(Person):
     allow_multiple = models.BooleanField("Permitir citas simultáneas", default=True)
     is_whatsapp = models.BooleanField("WhatsApp activo", default=False)
 
+    def exclusivity_conflict(self, was_multiple):
+        """
+        Mensaje de error si el staff pasa de citas simultáneas a exclusivo y ya
+        tiene citas futuras que se traslapan (la regla no podría cumplirse); si no, None.
+        """
+        if self.allow_multiple or not was_multiple:
+            return None
+        from .scheduling import describe_overlap, exclusivity_overlaps
+
+        overlap = exclusivity_overlaps([self.pk], timezone.now()).get(self.pk)
+        return describe_overlap(self, overlap) if overlap else None
+
+    def clean(self):
+        super().clean()
+        if self.pk and not self.allow_multiple:
+            was_multiple = Staff.objects.filter(pk=self.pk).values_list("allow_multiple", flat=True).first()
+            message = self.exclusivity_conflict(was_multiple)
+            if message:
+                raise ValidationError({"allow_multiple": message})
+
+    def save(self, *args, **kwargs):
+        """
+        Si cambia allow_multiple, propaga la regla a las citas futuras (las
+        pasadas no cambian). Lanza ScheduleConflict si el staff deja de admitir
+        citas simultáneas pero ya tiene citas futuras traslapadas.
+        """
+        from .scheduling import apply_exclusivity
+
+        with transaction.atomic():
+            was_multiple = None
+            if self.pk:
+                # Mismo candado que Appointment.save: nadie agenda mientras cambia la regla
+                was_multiple = (
+                    Staff.objects.select_for_update().filter(pk=self.pk)
+                    .values_list("allow_multiple", flat=True).first()
+                )
+            message = self.exclusivity_conflict(was_multiple)
+            if message:
+                raise ScheduleConflict(message)
+            super().save(*args, **kwargs)
+            if was_multiple is not None and was_multiple != self.allow_multiple:
+                apply_exclusivity([self.pk], not self.allow_multiple, timezone.now())
+
 
 
 # --------------------------------------------------------------------
 #  Citas
 # --------------------------------------------------------------------
+class ScheduleConflict(Exception):
+    """El staff ya tiene una cita que se traslapa y no permite citas simultáneas."""
+
+
+DEFAULT_APPOINTMENT_MINUTES = getattr(settings, "DEFAULT_APPOINTMENT_MINUTES", 60)
+# Duración máxima de una cita; acota la búsqueda de traslapes (scheduling.find_conflict)
+MAX_APPOINTMENT_MINUTES = getattr(settings, "MAX_APPOINTMENT_MINUTES", 24 * 60)
+
+
+class SeriesFrequency(models.TextChoices):
+    WEEKLY = "weekly", "Semanal"
+    BIWEEKLY = "biweekly", "Cada dos semanas"
+    MONTHLY = "monthly", "Mensual"
+
+
+class AppointmentSeries(models.Model):
+    """
+    Regla de recurrencia de un grupo de citas (ver recurrence.py). Las citas
+    se materializan todas al crear la serie; la regla queda como referencia
+    para editar o cancelar las ocurrencias futuras de una vez.
+    """
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE)
+    client = models.ForeignKey(Client, on_delete=models.CASCADE)
+    service = models.ForeignKey(EventType, on_delete=models.PROTECT, null=True, blank=True, verbose_name="Servicio")
+    start = models.DateTimeField("Primera cita")
+    duration_minutes = models.PositiveIntegerField("Duración (min)", null=True, blank=True,
+                                                   validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)])
+    frequency = models.CharField("Frecuencia", max_length=10, choices=SeriesFrequency.choices,
+                                 default=SeriesFrequency.WEEKLY)
+    until = models.DateField("Repetir hasta", null=True, blank=True)
+    count = models.PositiveIntegerField("Número de citas", null=True, blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.client} con {self.staff} ({self.get_frequency_display().lower()})"
+
+
 class Appointment(models.Model):
     staff = models.ForeignKey(Staff, on_delete=models.CASCADE)
     client = models.ForeignKey(Client, on_delete=models.CASCADE)
+    service = models.ForeignKey(
+        EventType, on_delete=models.PROTECT, null=True, blank=True,
+        verbose_name="Servicio", help_text="Define la duración por defecto",
+    )
+    series = models.ForeignKey(
+        AppointmentSeries, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="occurrences", editable=False,
+    )
     start = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField("Duración (min)", null=True, blank=True,
+                                                   validators=[MaxValueValidator(MAX_APPOINTMENT_MINUTES)])
+    # Calculados en save(): fin de la cita y si el staff admite traslapes
+    end = models.DateTimeField(editable=False)
+    staff_exclusive = models.BooleanField(default=False, editable=False)
     notes = models.TextField(blank=True)
     status = models.CharField(
         max_length=20,
@@ -175,9 +414,57 @@ class Appointment(models.Model):
         default="pending"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["start"], name="appointment_start_idx"),
+            models.Index(fields=["staff", "start"], name="appointment_staff_start_idx"),
+            # Barrido de citas vencidas (lifecycle.close_stale_appointments)
+            models.Index(fields=["status", "end"], name="appointment_status_end_idx"),
+        ]
+
     def __str__(self):
         return f"{self.client} con {self.staff} el {self.start:%d/%m %H:%M}"
 
+    def resolve_schedule(self):
+        """Completa duración (del servicio o por defecto), fin y exclusividad del staff."""
+        if not self.duration_minutes:
+            self.duration_minutes = (
+                min(self.service.duration_minutes, MAX_APPOINTMENT_MINUTES) if self.service_id
+                else DEFAULT_APPOINTMENT_MINUTES
+            )
+        self.end = self.start + timedelta(minutes=self.duration_minutes)
+        self.staff_exclusive = not self.staff.allow_multiple
+
+    @property
+    def blocks_staff(self):
+        return self.staff_exclusive and self.status != "cancelled"
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda validando traslapes para staff sin citas simultáneas.
+        Bloquea la fila del staff para serializar altas concurrentes; en
+        PostgreSQL además lo garantiza una restricción EXCLUDE (ver migración 0008).
+        """
+        self.resolve_schedule()
+        if not self.blocks_staff:
+            return super().save(*args, **kwargs)
+
+        from .scheduling import describe_conflict, find_conflict
+
+        with transaction.atomic():
+            Staff.objects.select_for_update().only("pk").get(pk=self.staff_id)
+            conflict = find_conflict(self.staff_id, self.start, self.end, exclude_pk=self.pk)
+            if conflict:
+                raise ScheduleConflict(describe_conflict(self.staff, conflict))
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar la fecha original para invalidar cachés si la cita se mueve
+        instance._loaded_start = instance.__dict__.get("start")
+        return instance
+
 
 class AppointmentStatusHistory(models.Model):
     appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name="history")
@@ -185,3 +472,80 @@ class AppointmentStatusHistory(models.Model):
     new_status = models.CharField(max_length=20)
     changed_at = models.DateTimeField(auto_now_add=True)
     changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+
+
+
+
+# --------------------------------------------------------------------
+#  Cola de trabajos en segundo plano (outbox)
+# --------------------------------------------------------------------
+class JobStatus(models.TextChoices):
+    PENDING = "pending", "Pendiente"
+    RUNNING = "running", "En proceso"
+    DONE = "done", "Completado"
+    DEAD = "dead", "Fallido (sin más reintentos)"
+
+
+class OutboxJob(models.Model):
+    """Trabajo diferido (correo, PDF…) que procesa `manage.py run_outbox`."""
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run_after"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="outbox_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+
+# --------------------------------------------------------------------
+#  Acumulados para KPIs (mantenidos por rollups.py)
+# --------------------------------------------------------------------
+class EventStats(models.Model):
+    """Totales por evento: reservas creadas, boletos activos y cancelaciones."""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    bookings = models.IntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    cancellations = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats {self.event_id}: {self.bookings} reservas"
+
+
+class DailyStats(models.Model):
+    """Totales por día de creación de la reserva (fecha local)."""
+    day = models.DateField(primary_key=True)
+    bookings = models.IntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    cancellations = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+
+    def __str__(self):
+        return f"Stats {self.day}: {self.bookings} reservas"
+
+
+@receiver(post_delete, sender=Booking)
+def release_seats_on_booking_delete(sender, instance, **kwargs):
+    """Libera los lugares de una reserva eliminada (incluye borrados masivos del admin)."""
+    if instance.seats_held:
+        Event(pk=instance.event_id).release_seats(instance.seats_held)
+
+    from .rollups import record_booking_change
+    record_booking_change(
+        {"event_id": instance.event_id, "quantity": instance.quantity,
+         "cancelled": instance.cancelled, "created_at": instance.created_at},
+        None,
+    )
@@ -0,0 +1,78 @@
+"""
+Planes de ejecución de las consultas calientes (EXPLAIN).
+---------------------------------------------------------
+hot_queries() reúne las consultas de agenda, boletos, eventos y typeahead que
+dependen de los índices de las migraciones 0007 y 0014; check_plans() las pasa
+por EXPLAIN y marca las que recorren la tabla completa. Lo usan bookings/tests/test_query_plans.py
+(CI) y `manage.py check_query_plans` (contra una base real).
+
+Soporta SQLite y PostgreSQL; en PostgreSQL se desactiva el seq scan durante
+la verificación para que el planificador muestre si existe un índice usable
+aun con tablas pequeñas.
+"""
+
+import re
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils.timezone import localdate
+
+from .models import Appointment, Booking, Client, Event
+from .scheduling import day_start
+from .search import person_prefix_filter
+
+SUPPORTED_VENDORS = ("sqlite", "postgresql")
+
+
+def hot_queries():
+    """{descripción: (queryset, tabla que debe resolverse por índice)}."""
+    day = localdate()
+    start, end = day_start(day), day_start(day + timedelta(days=1))
+    week_end = day_start(day + timedelta(days=7))
+    return {
+        "agenda día (Appointment.start)": (
+            Appointment.objects.filter(start__gte=start, start__lt=end), "bookings_appointment"
+        ),
+        "agenda semana (Appointment.start)": (
+            Appointment.objects.filter(start__gte=start, start__lt=week_end), "bookings_appointment"
+        ),
+        "agenda por staff (Appointment.staff, start)": (
+            Appointment.objects.filter(staff_id=1, start__gte=start, start__lt=week_end), "bookings_appointment"
+        ),
+        "boleto por código (Booking.confirmation_code)": (
+            Booking.objects.filter(confirmation_code=uuid.uuid4()), "bookings_booking"
+        ),
+        "reservas activas por evento (Booking.event, cancelled)": (
+            Booking.objects.filter(event_id=1, cancelled=False), "bookings_booking"
+        ),
+        "eventos por fecha (Event.start)": (
+            Event.objects.filter(start__gte=start, start__lt=week_end), "bookings_event"
+        ),
+        "typeahead por nombre (Client.active, name_key / email_key)": (
+            Client.objects.filter(person_prefix_filter("ana")), "bookings_client"
+        ),
+        "typeahead por teléfono (Client.active, phone_key)": (
+            Client.objects.filter(person_prefix_filter("5512")), "bookings_client"
+        ),
+    }
+
+
+def uses_full_scan(plan, table):
+    if connection.vendor == "sqlite":
+        # "SCAN bookings_x" (o "SCAN TABLE bookings_x" en SQLite < 3.36) = recorrido completo
+        return re.search(rf"\bSCAN (TABLE )?{table}\b", plan) is not None
+    return f"Seq Scan on {table}" in plan
+
+
+def check_plans():
+    """Lista de (descripción, plan, usa_índice) para cada consulta caliente."""
+    results = []
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        for label, (qs, table) in hot_queries().items():
+            plan = qs.explain()
+            results.append((label, plan, not uses_full_scan(plan, table)))
+    return results
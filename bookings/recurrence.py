@@ -0,0 +1,217 @@
+"""
+Series de citas recurrentes.
+----------------------------
+Una serie (AppointmentSeries) se expande en memoria a todas sus ocurrencias
+(semanal, cada dos semanas o mensual; hasta una fecha o N citas) y:
+  • valida traslapes contra la agenda del staff con UNA consulta por rango
+    y un barrido de dos listas ordenadas,
+  • inserta todas las citas con bulk_create dentro de una transacción.
+
+Editar o cancelar "esta y las siguientes" es un solo UPDATE sobre las
+ocurrencias futuras. Como bulk_create/update no disparan señales, aquí se
+invalida la caché de la agenda a mano.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.timezone import get_current_timezone, localtime, make_aware
+
+from .agenda_cache import bump_agenda, invalidate_year_summary
+from .models import (
+    DEFAULT_APPOINTMENT_MINUTES,
+    MAX_APPOINTMENT_MINUTES,
+    Appointment,
+    AppointmentStatusHistory,
+    ScheduleConflict,
+    SeriesFrequency,
+    Staff,
+)
+
+MAX_OCCURRENCES = getattr(settings, "SERIES_MAX_OCCURRENCES", 200)
+
+# Ocurrencias que no se tocan al editar o cancelar una serie
+CLOSED_STATUSES = ("cancelled", "done")
+
+
+# ============================
+#  EXPANSIÓN
+# ============================
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    # 31 de enero → 28/29 de febrero, etc.
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _nth_day(first, frequency, n):
+    if frequency == SeriesFrequency.MONTHLY:
+        return _add_months(first, n)
+    weeks = 2 if frequency == SeriesFrequency.BIWEEKLY else 1
+    return first + timedelta(weeks=weeks * n)
+
+
+def last_allowed_day(first, frequency):
+    """Día de la ocurrencia número MAX_OCCURRENCES: una fecha final posterior da más citas de las permitidas."""
+    return _nth_day(first, frequency, MAX_OCCURRENCES - 1)
+
+
+def expand_occurrences(series):
+    """Inicios (aware) de todas las ocurrencias; conserva la hora local aunque cambie el horario de verano."""
+    if not series.until and not series.count:
+        raise ValueError("La serie necesita fecha final o número de citas.")
+    tz = get_current_timezone()
+    local_start = localtime(series.start)
+    # AppointmentSeriesForm ya rechaza series más largas; esto es solo el tope de seguridad
+    limit = min(series.count or MAX_OCCURRENCES, MAX_OCCURRENCES)
+
+    starts = []
+    for n in range(limit):
+        day = _nth_day(local_start.date(), series.frequency, n)
+        if series.until and day > series.until:
+            break
+        starts.append(make_aware(datetime.combine(day, local_start.time()), tz))
+    return starts
+
+
+def series_duration(series):
+    if series.duration_minutes:
+        return series.duration_minutes
+    if series.service_id:
+        return min(series.service.duration_minutes, MAX_APPOINTMENT_MINUTES)
+    return DEFAULT_APPOINTMENT_MINUTES
+
+
+# ============================
+#  TRASLAPES
+# ============================
+def find_overlaps(staff_id, intervals, exclude_series=None):
+    """
+    Intervalos de `intervals` (lista de (inicio, fin) ordenada) que chocan con
+    citas bloqueantes del staff. Una sola consulta acotada al rango de la serie.
+    """
+    if not intervals:
+        return []
+    busy = (
+        Appointment.objects.filter(
+            staff_id=staff_id, staff_exclusive=True,
+            start__lt=intervals[-1][1], end__gt=intervals[0][0],
+        )
+        .exclude(status="cancelled")
+        .order_by("start")
+    )
+    if exclude_series is not None:
+        busy = busy.exclude(series=exclude_series)
+    busy = list(busy.values_list("start", "end"))
+
+    # Barrido por inicio: hay choque si alguna cita ya vista termina después del inicio
+    clashes, i, latest_end = [], 0, None
+    for start, end in intervals:
+        while i < len(busy) and busy[i][0] < end:
+            latest_end = busy[i][1] if latest_end is None else max(latest_end, busy[i][1])
+            i += 1
+        if latest_end is not None and latest_end > start:
+            clashes.append((start, end))
+    return clashes
+
+
+def _raise_conflict(staff, clashes):
+    shown = ", ".join(f"{localtime(start):%d/%m %H:%M}" for start, _ in clashes[:5])
+    extra = f" y {len(clashes) - 5} más" if len(clashes) > 5 else ""
+    raise ScheduleConflict(f"{staff} ya tiene citas en: {shown}{extra}.")
+
+
+def _invalidate(starts):
+    days = {localtime(s).date() for s in starts}
+    years = {d.year for d in days}
+    invalidate_year_summary(*years)
+    bump_agenda(days=days, years=years)
+
+
+# ============================
+#  CREAR / EDITAR / CANCELAR
+# ============================
+def create_series(series):
+    """Guarda la serie y todas sus citas. Lanza ScheduleConflict si alguna choca."""
+    series.duration_minutes = series_duration(series)
+    duration = timedelta(minutes=series.duration_minutes)
+    intervals = [(start, start + duration) for start in expand_occurrences(series)]
+    exclusive = not series.staff.allow_multiple
+
+    with transaction.atomic():
+        if exclusive:
+            Staff.objects.select_for_update().only("pk").get(pk=series.staff_id)
+            clashes = find_overlaps(series.staff_id, intervals)
+            if clashes:
+                _raise_conflict(series.staff, clashes)
+        series.save()
+        occurrences = Appointment.objects.bulk_create([
+            Appointment(
+                series=series, staff_id=series.staff_id, client_id=series.client_id,
+                service_id=series.service_id, notes=series.notes,
+                start=start, end=end, duration_minutes=series.duration_minutes,
+                staff_exclusive=exclusive,
+            )
+            for start, end in intervals
+        ])
+
+    _invalidate(start for start, _ in intervals)
+    return occurrences
+
+
+def _future(series, since):
+    return series.occurrences.filter(start__gte=since or timezone.now()).exclude(status__in=CLOSED_STATUSES)
+
+
+def update_series(series, staff=None, duration_minutes=None, notes=None, since=None):
+    """
+    Aplica cambios a las ocurrencias futuras abiertas con un solo UPDATE.
+    Devuelve cuántas citas cambiaron.
+    """
+    future = _future(series, since)
+    changes = {}
+    if notes is not None:
+        changes["notes"] = series.notes = notes
+    if duration_minutes:
+        series.duration_minutes = duration_minutes
+        changes["duration_minutes"] = duration_minutes
+        changes["end"] = F("start") + timedelta(minutes=duration_minutes)
+    if staff is not None:
+        series.staff = staff
+        changes["staff"] = staff
+        changes["staff_exclusive"] = not staff.allow_multiple
+    if not changes:
+        return 0
+
+    with transaction.atomic():
+        starts = list(future.order_by("start").values_list("start", flat=True))
+        if not series.staff.allow_multiple and ("staff" in changes or "end" in changes):
+            Staff.objects.select_for_update().only("pk").get(pk=series.staff_id)
+            duration = timedelta(minutes=series_duration(series))
+            clashes = find_overlaps(series.staff_id, [(s, s + duration) for s in starts], exclude_series=series)
+            if clashes:
+                _raise_conflict(series.staff, clashes)
+        updated = future.update(**changes)
+        series.save()
+
+    _invalidate(starts)
+    return updated
+
+
+def cancel_series(series, since=None, user=None):
+    """Cancela las ocurrencias futuras abiertas y deja su historial. Devuelve cuántas."""
+    future = _future(series, since)
+    with transaction.atomic():
+        rows = list(future.values_list("pk", "start", "status"))
+        updated = future.update(status="cancelled")
+        AppointmentStatusHistory.objects.bulk_create([
+            AppointmentStatusHistory(appointment_id=pk, old_status=status, new_status="cancelled", changed_by=user)
+            for pk, _, status in rows
+        ])
+
+    _invalidate(start for _, start, _ in rows)
+    return updated
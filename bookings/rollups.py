@@ -0,0 +1,114 @@
+"""
+Acumulados incrementales para el dashboard.
+-------------------------------------------
+Cada alta, cancelación, edición o borrado de una reserva resta la contribución
+del estado anterior y suma la del nuevo en EventStats y DailyStats, con
+UPDATE ... SET x = x + n (sin leer-modificar-escribir). Así el costo del
+dashboard no crece con el historial.
+
+Si alguna vez se desincronizan: `python manage.py rebuild_stats`.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils.timezone import localdate
+
+from .models import Booking, DailyStats, EventStats
+
+FIELDS = ("bookings", "tickets", "cancellations")
+
+
+def _contribution(state):
+    """(event_id, día, {bookings, tickets, cancellations}) de un estado de reserva."""
+    if not state:
+        return None
+    cancelled = state["cancelled"]
+    return (
+        state["event_id"],
+        localdate(state["created_at"]),
+        {
+            "bookings": 1,
+            "tickets": 0 if cancelled else state["quantity"],
+            "cancellations": 1 if cancelled else 0,
+        },
+    )
+
+
+def _bump(model, lookup, deltas):
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    updated = model.objects.filter(**lookup).update(**{k: F(k) + v for k, v in deltas.items()})
+    if updated or any(v < 0 for v in deltas.values()):
+        # Sin fila y con decremento: nada que restar (rebuild_stats lo corrige)
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Otra transacción creó la fila en paralelo
+        model.objects.filter(**lookup).update(**{k: F(k) + v for k, v in deltas.items()})
+
+
+def record_booking_change(before, after):
+    """
+    Aplica la diferencia entre dos estados de una reserva.
+    `before` / `after`: dict con event_id, quantity, cancelled, created_at, un
+    Booking, o None (alta / borrado).
+    """
+    if isinstance(after, Booking):
+        after = {
+            "event_id": after.event_id, "quantity": after.quantity,
+            "cancelled": after.cancelled, "created_at": after.created_at,
+        }
+    old, new = _contribution(before), _contribution(after)
+    if old == new:
+        return
+
+    changes = {}
+    for sign, contrib in ((-1, old), (1, new)):
+        if contrib is None:
+            continue
+        event_id, day, values = contrib
+        for key in (("event", event_id), ("day", day)):
+            bucket = changes.setdefault(key, dict.fromkeys(FIELDS, 0))
+            for field, value in values.items():
+                bucket[field] += sign * value
+
+    for (kind, value), deltas in changes.items():
+        if kind == "event":
+            _bump(EventStats, {"event_id": value}, deltas)
+        else:
+            _bump(DailyStats, {"day": value}, deltas)
+
+
+def _aggregates():
+    return {
+        "bookings": Count("id"),
+        "tickets": Coalesce(Sum("quantity", filter=Q(cancelled=False)), 0),
+        "cancellations": Count("id", filter=Q(cancelled=True)),
+    }
+
+
+@transaction.atomic
+def rebuild():
+    """Recalcula ambos acumulados desde las reservas. Devuelve (eventos, días)."""
+    EventStats.objects.all().delete()
+    DailyStats.objects.all().delete()
+
+    per_event = Booking.objects.order_by().values("event_id").annotate(**_aggregates())
+    EventStats.objects.bulk_create(
+        (EventStats(**row) for row in per_event.iterator()), batch_size=1000
+    )
+
+    per_day = (
+        Booking.objects.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(**_aggregates())
+    )
+    DailyStats.objects.bulk_create(
+        (DailyStats(**row) for row in per_day.iterator()), batch_size=1000
+    )
+    return EventStats.objects.count(), DailyStats.objects.count()
@@ -0,0 +1,174 @@
+"""
+Agenda del staff: traslapes y huecos libres.
+--------------------------------------------
+Ninguna cita dura más de MAX_APPOINTMENT_MINUTES, así que una cita que choque
+con [start, end) tiene que empezar en [start - máximo, end): find_conflict lee
+solo ese rango del índice (staff, start), O(log n + citas de la ventana). No
+depende de que las citas bloqueantes no se traslapen entre sí.
+
+El staff solo puede pasar a exclusivo (allow_multiple=False) si sus citas
+futuras no se traslapan (exclusivity_overlaps); Staff.save y el importador lo
+validan antes de marcar las citas con apply_exclusivity.
+
+free_slots() busca los primeros N huecos entre todo el staff activo con una
+sola consulta por rango, respetando `available_days` y el horario
+AGENDA_DAY_START–AGENDA_DAY_END.
+"""
+
+import heapq
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils.timezone import get_current_timezone, localtime, make_aware, now
+
+from .models import MAX_APPOINTMENT_MINUTES, Appointment, Staff
+
+DAY_START = getattr(settings, "AGENDA_DAY_START", 8)
+DAY_END = getattr(settings, "AGENDA_DAY_END", 21)
+
+# Mismo orden que date.weekday(); así se guardan en Staff.available_days
+WEEK_DAYS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+def day_start(day):
+    """
+    Medianoche local de `day` como datetime aware. Los filtros por día usan
+    rangos semiabiertos [day_start(d), day_start(d + 1)) sobre la columna, que
+    sí aprovechan el índice (a diferencia de `start__date`).
+    """
+    return make_aware(datetime.combine(day, time.min), get_current_timezone())
+
+
+def find_conflict(staff_id, start, end, exclude_pk=None):
+    """Cita bloqueante del staff que se traslapa con [start, end), o None."""
+    return (
+        Appointment.objects.filter(
+            staff_id=staff_id, staff_exclusive=True,
+            start__gt=start - timedelta(minutes=MAX_APPOINTMENT_MINUTES), start__lt=end, end__gt=start,
+        )
+        .exclude(status="cancelled")
+        .exclude(pk=exclude_pk)
+        .order_by("-start")
+        .only("pk", "start", "end")
+        .first()
+    )
+
+
+def describe_conflict(staff, conflict):
+    return (
+        f"{staff} ya tiene una cita de {localtime(conflict.start):%H:%M} "
+        f"a {localtime(conflict.end):%H:%M}."
+    )
+
+
+def exclusivity_overlaps(staff_ids, since):
+    """
+    {staff_id: (cita, cita)} con el primer par de citas no canceladas desde
+    `since` que se traslapan. Una sola consulta para todos los staff.
+    """
+    rows = (
+        Appointment.objects.filter(staff_id__in=staff_ids, start__gte=since)
+        .exclude(status="cancelled")
+        .order_by("staff_id", "start")
+        .only("pk", "staff_id", "start", "end")
+    )
+    found, staff_id, latest = {}, None, None
+    for appt in rows.iterator():
+        if appt.staff_id != staff_id:
+            staff_id, latest = appt.staff_id, None
+        if staff_id in found:
+            continue
+        if latest and appt.start < latest.end:
+            found[staff_id] = (latest, appt)
+        elif latest is None or appt.end > latest.end:
+            latest = appt
+    return found
+
+
+def describe_overlap(staff, overlap):
+    first, second = overlap
+    return (
+        f"{staff} tiene citas que se traslapan ({localtime(first.start):%d/%m %H:%M} y "
+        f"{localtime(second.start):%d/%m %H:%M}); resuélvelas antes de quitar las citas simultáneas."
+    )
+
+
+def apply_exclusivity(staff_ids, exclusive, since):
+    """Marca las citas del staff desde `since` según su regla (las pasadas no cambian)."""
+    return (
+        Appointment.objects.filter(staff_id__in=staff_ids, start__gte=since)
+        .exclude(staff_exclusive=exclusive)
+        .update(staff_exclusive=exclusive)
+    )
+
+
+def _works_on(staff, day):
+    return not staff.available_days or WEEK_DAYS[day.weekday()] in staff.available_days
+
+
+def _staff_slots(staff, busy, first_day, last_day, duration, step, not_before):
+    """Genera (inicio, fin) libres del staff en orden cronológico."""
+    tz = get_current_timezone()
+    busy = iter(busy)
+    current = next(busy, None)
+    day = first_day
+    while day <= last_day:
+        if _works_on(staff, day):
+            slot = make_aware(datetime.combine(day, time(DAY_START)), tz)
+            closing = make_aware(datetime.combine(day, time(DAY_END)), tz)
+            while slot + duration <= closing:
+                # Avanzar sobre citas que ya terminaron antes de este hueco
+                while current and current[1] <= slot:
+                    current = next(busy, None)
+                if current and current[0] < slot + duration:
+                    # Choque: saltar al primer paso alineado tras el fin de la cita
+                    gap = current[1] - slot
+                    slot += step * -(-gap // step)
+                    continue
+                if slot >= not_before:
+                    yield slot, slot + duration
+                slot += step
+        day += timedelta(days=1)
+
+
+def free_slots(first_day, last_day, duration_minutes=60, limit=10, step_minutes=30, staff_ids=None):
+    """
+    Primeros `limit` huecos libres (de cualquier staff activo) entre dos fechas
+    locales inclusive. Devuelve dicts ordenados por inicio.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    range_start, range_end = day_start(first_day), day_start(last_day + timedelta(days=1))
+
+    staff_qs = Staff.objects.filter(active=True).only("id", "name", "available_days")
+    if staff_ids:
+        staff_qs = staff_qs.filter(pk__in=staff_ids)
+    staff_list = list(staff_qs)
+
+    busy = {s.pk: [] for s in staff_list}
+    rows = (
+        Appointment.objects.filter(staff_id__in=busy, start__lt=range_end, end__gt=range_start)
+        .exclude(status="cancelled")
+        .order_by("staff_id", "start")
+        .values_list("staff_id", "start", "end")
+    )
+    for staff_id, start, end in rows.iterator():
+        busy[staff_id].append((start, end))
+
+    not_before = now()
+    streams = [
+        ((start, s.pk, s.name, end) for start, end in
+         _staff_slots(s, busy[s.pk], first_day, last_day, duration, step, not_before))
+        for s in staff_list
+    ]
+    result = []
+    for start, staff_id, name, end in heapq.merge(*streams):
+        result.append({
+            "staff_id": staff_id,
+            "staff": name,
+            "start": localtime(start).isoformat(),
+            "end": localtime(end).isoformat(),
+        })
+        if len(result) >= limit:
+            break
+    return result
@@ -0,0 +1,197 @@
+"""
+Búsqueda indexada de reservas.
+------------------------------
+Cada Booking guarda `search_document`: nombre y correo normalizados (minúsculas,
+sin acentos) + solo los dígitos del teléfono. Sobre esa columna:
+  • SQLite     → tabla virtual FTS5 (tokenizer trigram) sincronizada por triggers.
+  • PostgreSQL → índice GIN pg_trgm; `LIKE '%…%'` lo aprovecha.
+  • Otros      → LIKE sobre la columna (sin índice).
+
+El título del evento no se desnormaliza: se resuelve contra la tabla de
+eventos (pequeña) y se combina con OR por event_id.
+
+Clientes y staff (typeahead) guardan name_key / phone_key / email_key y se
+buscan por prefijo:
+  • SQLite     → rango [prefijo, prefijo + U+10FFFF); la colación BINARY compara
+                 por punto de código, así que el rango es exacto y usa el índice.
+  • PostgreSQL → `LIKE 'prefijo%'` (__startswith) sobre índices varchar_pattern_ops;
+                 con la colación de la base (p. ej. es_MX.UTF-8) el rango no es
+                 exacto y un índice normal no sirve para LIKE.
+  • Otros      → __startswith (LIKE, como haga el motor).
+
+install_search_index() es idempotente; lo llaman la migración y post_migrate
+(en SQLite, reconstruir la tabla en una migración borra sus triggers).
+"""
+
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "bookings_booking_fts"
+PG_INDEX = "booking_search_trgm_idx"
+
+# FTS5 trigram solo puede usar el índice con términos de 3+ caracteres
+MIN_FTS_TERM = 3
+
+# Dígitos del número nacional (México: 10); lo anterior se toma como lada internacional
+NATIONAL_DIGITS = getattr(settings, "PHONE_NATIONAL_DIGITS", 10)
+
+_PHONE_RE = re.compile(r"^[\d\s()+.-]+$")
+
+_fts_available = {}
+
+
+# ============================
+#  NORMALIZACIÓN
+# ============================
+def normalize_text(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def normalize_phone(value):
+    return re.sub(r"\D", "", value or "")
+
+
+def phone_search_key(value):
+    """Número nacional (últimos NATIONAL_DIGITS dígitos): "+52 55 1234 5678" → "5512345678"."""
+    return normalize_phone(value)[-NATIONAL_DIGITS:]
+
+
+def build_search_document(booking):
+    return " ".join(filter(None, [
+        normalize_text(booking.name),
+        normalize_text(booking.email),
+        normalize_phone(booking.phone),
+    ]))
+
+
+def _terms(query):
+    """Términos normalizados de la búsqueda; los que parecen teléfono quedan en dígitos."""
+    query = query.strip()
+    if _PHONE_RE.match(query) and len(normalize_phone(query)) >= MIN_FTS_TERM:
+        return [normalize_phone(query)]
+    return normalize_text(query).split()
+
+
+# ============================
+#  CONSULTA
+# ============================
+def _has_fts(conn):
+    if conn.alias not in _fts_available:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_available[conn.alias] = cursor.fetchone() is not None
+    return _fts_available[conn.alias]
+
+
+def _term_filter(term, conn):
+    if conn.vendor == "sqlite" and len(term) >= MIN_FTS_TERM and _has_fts(conn):
+        phrase = '"' + term.replace('"', '""') + '"'
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [phrase]))
+    return Q(search_document__contains=term)
+
+
+def search_bookings(queryset, query):
+    """Filtra `queryset` con todos los términos de `query` (AND), por contacto o título de evento."""
+    from .models import Event
+
+    terms = _terms(query)
+    if not terms:
+        return queryset
+
+    conn = connections[queryset.db]
+    by_contact = Q()
+    for term in terms:
+        by_contact &= _term_filter(term, conn)
+
+    matching_events = Event.objects.filter(title__icontains=query.strip()).values("pk")
+    return queryset.filter(by_contact | Q(event_id__in=matching_events))
+
+
+# ============================
+#  PERSONAS (prefijo)
+# ============================
+# Solo válido con colación por punto de código (BINARY de SQLite)
+_PREFIX_END = "\U0010ffff"
+
+
+def _prefix(field, prefix, vendor):
+    # `active` va en cada rama: cada una debe implicar el WHERE de su índice parcial
+    if vendor == "sqlite":
+        return Q(active=True, **{f"{field}__gte": prefix, f"{field}__lt": prefix + _PREFIX_END})
+    return Q(active=True, **{f"{field}__startswith": prefix})
+
+
+def person_prefix_filter(query, using=DEFAULT_DB_ALIAS):
+    """Q por prefijo sobre las claves normalizadas de Client/Staff activos de la base `using`."""
+    vendor = connections[using].vendor
+    query = query.strip()
+    if _PHONE_RE.match(query) and normalize_phone(query):
+        return _prefix("phone_key", phone_search_key(query), vendor)
+    email = query.lower()
+    if "@" in email:
+        return _prefix("email_key", email, vendor)
+    return _prefix("name_key", normalize_text(query), vendor) | _prefix("email_key", email, vendor)
+
+
+# ============================
+#  ÍNDICES (DDL por motor)
+# ============================
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        search_document, content='bookings_booking', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON bookings_booking BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON bookings_booking BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON bookings_booking BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+        INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);
+    END""",
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON bookings_booking USING gin (search_document gin_trgm_ops)",
+]
+
+
+def install_search_index(conn, rebuild=False):
+    """Crea (si falta) el índice de búsqueda del motor actual. Idempotente."""
+    _fts_available.pop(conn.alias, None)
+    try:
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            if conn.vendor == "sqlite":
+                for sql in SQLITE_DDL:
+                    cursor.execute(sql)
+                if rebuild:
+                    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            elif conn.vendor == "postgresql":
+                for sql in POSTGRES_DDL:
+                    cursor.execute(sql)
+    except DatabaseError:
+        # p. ej. SQLite sin FTS5/trigram: la búsqueda cae a LIKE sobre la columna
+        logger.warning("No se pudo instalar el índice de búsqueda en %s.", conn.vendor, exc_info=True)
+
+
+def uninstall_search_index(conn):
+    _fts_available.pop(conn.alias, None)
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif conn.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
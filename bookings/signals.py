@@ -0,0 +1,74 @@
+"""
+Receivers de señales del módulo bookings.
+-----------------------------------------
+Se registran desde BookingsConfig.ready().
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django.utils.timezone import localdate
+
+from . import ticket_cache
+from .agenda_cache import bump_agenda, invalidate_year_summary
+from .models import Appointment, Booking, Client, Event, EventType, Staff
+
+logger = logging.getLogger(__name__)
+
+
+# ============================
+#  CACHÉ DE BOLETOS PDF
+# ============================
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_ticket(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    try:
+        ticket_cache.invalidate_booking(instance)
+    except Exception:
+        logger.exception("No se pudo invalidar el boleto en caché de la reserva %s", instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_tickets(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    try:
+        ticket_cache.invalidate_event(instance.pk)
+    except Exception:
+        logger.exception("No se pudieron invalidar los boletos en caché del evento %s", instance.pk)
+
+
+# ============================
+#  CACHÉ DE LA AGENDA
+# ============================
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_agenda_for_appointment(sender, instance, **kwargs):
+    days = {localdate(instance.start)}
+    original = getattr(instance, "_loaded_start", None)
+    if original:
+        days.add(localdate(original))
+    years = {d.year for d in days}
+    invalidate_year_summary(*years)
+    bump_agenda(days=days, years=years)
+
+
+@receiver(post_save, sender=Staff)
+@receiver(post_delete, sender=Staff)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_agenda_for_people(sender, instance, **kwargs):
+    bump_agenda(people=True)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+def invalidate_event_feeds(sender, instance, **kwargs):
+    bump_agenda(events=True)
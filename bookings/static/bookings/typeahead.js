@@ -0,0 +1,71 @@
+// Selectores con búsqueda para <select data-typeahead-url> (ver forms.TypeaheadSelect).
+// El <select> queda oculto y sigue siendo el campo que se envía.
+(() => {
+  const DEBOUNCE_MS = 200;
+  const MIN_CHARS = 2;
+
+  const setup = (select) => {
+    const wrapper = document.createElement('div');
+    wrapper.className = 'position-relative';
+    const input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'form-control';
+    input.autocomplete = 'off';
+    input.placeholder = 'Buscar por nombre, teléfono o correo…';
+    input.value = select.value ? select.selectedOptions[0].text : '';
+    const list = document.createElement('div');
+    list.className = 'list-group position-absolute w-100 shadow-sm d-none';
+    list.style.zIndex = 1050;
+
+    select.classList.add('d-none');
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.append(input, list, select);
+
+    const choose = (id, text) => {
+      select.replaceChildren(new Option(text, id, true, true));
+      select.dispatchEvent(new Event('change', { bubbles: true }));
+      input.value = text;
+      list.classList.add('d-none');
+    };
+
+    let timer, controller;
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      const q = input.value.trim();
+      if (q.length < MIN_CHARS) { list.classList.add('d-none'); return; }
+      timer = setTimeout(async () => {
+        controller?.abort();
+        controller = new AbortController();
+        try {
+          const res = await fetch(`${select.dataset.typeaheadUrl}?q=${encodeURIComponent(q)}`,
+                                  { signal: controller.signal });
+          const { results } = await res.json();
+          list.replaceChildren(...results.map(r => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action';
+            item.textContent = r.text;
+            if (r.detail) {
+              const small = document.createElement('small');
+              small.className = 'text-muted ms-2';
+              small.textContent = r.detail;
+              item.append(small);
+            }
+            item.addEventListener('click', () => choose(r.id, r.text));
+            return item;
+          }));
+          list.classList.toggle('d-none', !results.length);
+        } catch (err) {
+          if (err.name !== 'AbortError') console.error(err);
+        }
+      }, DEBOUNCE_MS);
+    });
+
+    input.addEventListener('keydown', (e) => { if (e.key === 'Escape') list.classList.add('d-none'); });
+    document.addEventListener('click', (e) => { if (!wrapper.contains(e.target)) list.classList.add('d-none'); });
+  };
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('select[data-typeahead-url]').forEach(setup);
+  });
+})();
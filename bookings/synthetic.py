@@ -0,0 +1,325 @@
+"""
+Datos sintéticos a escala de producción.
+----------------------------------------
+generate() llena la base con tipos de evento, eventos (pasados y futuros),
+reservas con cancelaciones, staff, clientes, años de citas y su historial de
+estados. Todo sale de un random.Random(seed) y de una fecha ancla, así que
+la misma semilla y la misma fecha reproducen exactamente el mismo conjunto.
+
+Las filas se generan con iteradores y se insertan con bulk_create en
+bloques (una transacción por bloque); la memoria no crece con el volumen.
+Como bulk_create no pasa por save() ni por señales, aquí se calculan a mano
+los campos derivados (search_document, name_key…, end, staff_exclusive) y al
+final se recalculan seats_taken, los acumulados (rollups.rebuild) y la caché
+de la agenda.
+
+Pensado para una base de desarrollo vacía: `python manage.py seed_dataset`.
+"""
+
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.timezone import get_current_timezone, make_aware
+
+from .agenda_cache import bump_agenda, invalidate_year_summary
+from .models import (
+    Appointment,
+    AppointmentStatusHistory,
+    Booking,
+    Client,
+    Event,
+    EventStatus,
+    EventType,
+    Staff,
+)
+from .scheduling import WEEK_DAYS
+from .search import build_search_document, normalize_text
+
+CHUNK_SIZE = 5000
+
+# Volúmenes por escala; cualquier valor se puede sobrescribir desde el comando
+SCALES = {
+    "small": {"event_types": 5, "events": 200, "bookings": 5_000,
+              "staff": 10, "clients": 1_000, "appointments": 5_000},
+    "medium": {"event_types": 10, "events": 2_000, "bookings": 100_000,
+               "staff": 40, "clients": 20_000, "appointments": 100_000},
+    "large": {"event_types": 20, "events": 20_000, "bookings": 2_000_000,
+              "staff": 200, "clients": 200_000, "appointments": 1_000_000},
+}
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "José", "Carmen", "Juan", "Sofía", "Carlos", "Lucía", "Miguel",
+    "Valeria", "Jorge", "Fernanda", "Diego", "Daniela", "Ricardo", "Paola", "Andrés", "Mariana", "Raúl",
+]
+LAST_NAMES = [
+    "García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez",
+    "Ramírez", "Cruz", "Flores", "Gómez", "Morales", "Vázquez", "Reyes", "Jiménez", "Torres", "Ruiz",
+]
+EMAIL_DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com", "icloud.com"]
+SERVICES = ["Consulta", "Seguimiento", "Valoración", "Terapia", "Taller", "Asesoría", "Revisión"]
+ROLES = ["Especialista", "Consultor", "Terapeuta", "Instructor", "Asesor"]
+COMPANIES = ["", "", "", "ACME", "Grupo Norte", "Particular", "Empresa local"]
+
+DAY_HOURS = (9, 19)
+SLOT_MINUTES = 30
+
+
+# ============================
+#  UTILIDADES
+# ============================
+@contextmanager
+def _historical(model, field="created_at"):
+    """Permite fijar a mano un campo auto_now_add (fechas en el pasado)."""
+    field = model._meta.get_field(field)
+    previous, field.auto_now_add = field.auto_now_add, False
+    try:
+        yield
+    finally:
+        field.auto_now_add = previous
+
+
+def _insert(model, objs, chunk_size, progress=None):
+    """bulk_create por bloques de un iterador; devuelve cuántas filas insertó."""
+    total = 0
+    objs = iter(objs)
+    while chunk := list(islice(objs, chunk_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk)
+        total += len(chunk)
+        if progress:
+            progress(model._meta.verbose_name_plural, total)
+    return total
+
+
+def _person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _email(name, n, rng):
+    # Sin acentos: EmailValidator rechaza "josé.garcía@…"
+    first, last = normalize_text(name).split()[:2]
+    return f"{first}.{last}{n}@{rng.choice(EMAIL_DOMAINS)}"
+
+
+def _phone(rng):
+    return f"55{rng.randrange(10**8):08d}"
+
+
+def _local(day, hour, minute=0):
+    return make_aware(datetime.combine(day, time(hour, minute)), get_current_timezone())
+
+
+# ============================
+#  CATÁLOGOS Y PERSONAS
+# ============================
+def _event_types(n, rng):
+    return [
+        EventType(name=f"{SERVICES[i % len(SERVICES)]} {i // len(SERVICES) + 1}",
+                  duration_minutes=rng.choice([30, 45, 60, 90]))
+        for i in range(n)
+    ]
+
+
+def _people(model, n, rng, first_day, anchor):
+    span = max((anchor - first_day).days, 1)
+    for i in range(n):
+        name = _person_name(rng)
+        person = model(
+            name=name,
+            phone=_phone(rng),
+            email=_email(name, i, rng),
+            active=rng.random() > 0.05,
+            created_at=_local(first_day + timedelta(days=rng.randrange(span)), rng.randrange(8, 20)),
+        )
+        if model is Staff:
+            person.role = rng.choice(ROLES)
+            person.specialty = rng.choice(SERVICES)
+            person.allow_multiple = rng.random() < 0.3
+            person.available_days = WEEK_DAYS[:5] if rng.random() < 0.8 else WEEK_DAYS[:6]
+        else:
+            person.company = rng.choice(COMPANIES)
+            person.is_whatsapp = rng.random() < 0.6
+        person.set_search_keys()
+        yield person
+
+
+# ============================
+#  EVENTOS Y RESERVAS
+# ============================
+def _events(n, types, rng, first_day, anchor, per_event):
+    span = (anchor - first_day).days + 90  # hasta ~3 meses en el futuro
+    now = _local(anchor, 0)
+    # Capacidad acorde al volumen pedido: algunos se llenan, la mayoría no
+    base = max(20, int(per_event * 4))
+    for i in range(n):
+        start = _local(first_day + timedelta(days=rng.randrange(span)), rng.randrange(9, 21))
+        group = rng.random() < 0.5
+        status = EventStatus.ACTIVE
+        if rng.random() < 0.03:
+            status = EventStatus.CANCELLED
+        elif start < now:
+            status = EventStatus.FINISHED
+        yield Event(
+            type=rng.choice(types),
+            title=f"{rng.choice(SERVICES)} {start:%d/%m/%Y} #{i + 1}",
+            description="Evento generado para pruebas de carga.",
+            start=start,
+            capacity=int(base * rng.choice([0.5, 1, 1.5, 2, 3])),
+            allow_group_booking=group,
+            max_tickets_per_booking=rng.randint(2, 6) if group else 1,
+            status=status,
+        )
+
+
+def _bookings(events, n, cancel_rate, rng, taken, now):
+    """Reparte ~n reservas entre los eventos sin pasar su capacidad; acumula lugares en `taken`."""
+    average = n / max(len(events), 1)
+    serial = 0
+    for event in events:
+        seats = 0
+        for _ in range(int(average * rng.uniform(0.2, 1.8))):
+            quantity = rng.randint(1, event.max_tickets_per_booking)
+            cancelled = rng.random() < cancel_rate
+            if not cancelled and seats + quantity > event.capacity:
+                break
+            name = _person_name(rng)
+            serial += 1
+            booking = Booking(
+                event_id=event.pk, name=name, email=_email(name, serial, rng), phone=_phone(rng),
+                quantity=quantity, cancelled=cancelled,
+                created_at=min(event.start - timedelta(minutes=rng.randrange(60, 60 * 24 * 60)), now),
+                confirmation_code=uuid.UUID(int=rng.getrandbits(128), version=4),
+            )
+            booking.search_document = build_search_document(booking)
+            if not cancelled:
+                seats += quantity
+            yield booking
+        taken[event.pk] = seats
+
+
+# ============================
+#  CITAS E HISTORIAL
+# ============================
+def _appointments(staff, clients, types, n, rng, first_day, last_day, anchor):
+    """Citas sin traslapes por staff (horarios distintos dentro del día) y con estado según la fecha."""
+    days = (last_day - first_day).days + 1
+    per_day = n / max(len(staff) * days * 5 / 7, 1)
+    slots_per_day = (DAY_HOURS[1] - DAY_HOURS[0]) * 60 // SLOT_MINUTES
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        weekday = WEEK_DAYS[day.weekday()]
+        for member in staff:
+            if weekday not in member.available_days:
+                continue
+            count = min(int(per_day) + (rng.random() < per_day % 1), slots_per_day // 3)
+            free_from = 0
+            for slot in sorted(rng.sample(range(0, slots_per_day - 3), count)):
+                service = rng.choice(types)
+                slot = max(slot, free_from)
+                start = _local(day, DAY_HOURS[0]) + timedelta(minutes=slot * SLOT_MINUTES)
+                end = start + timedelta(minutes=service.duration_minutes)
+                free_from = slot - (-service.duration_minutes // SLOT_MINUTES)
+                if end > _local(day, DAY_HOURS[1]):
+                    break
+                roll = rng.random()
+                if day < anchor:
+                    status = "done" if roll < 0.75 else "cancelled" if roll < 0.87 else "confirmed" if roll < 0.95 else "pending"
+                else:
+                    status = "pending" if roll < 0.5 else "confirmed" if roll < 0.9 else "cancelled"
+                yield Appointment(
+                    staff_id=member.pk, client_id=rng.choice(clients), service_id=service.pk,
+                    start=start, end=end, duration_minutes=service.duration_minutes,
+                    staff_exclusive=not member.allow_multiple, status=status,
+                )
+
+
+def _history(appointments, rng):
+    """Transiciones plausibles hasta el estado actual de cada cita."""
+    for apt in appointments:
+        path = {"pending": [], "confirmed": ["confirmed"], "done": ["confirmed", "done"],
+                "cancelled": ["confirmed", "cancelled"] if rng.random() < 0.5 else ["cancelled"]}[apt.status]
+        old, when = "pending", apt.start - timedelta(days=rng.randint(1, 14))
+        for new in path:
+            yield AppointmentStatusHistory(appointment_id=apt.pk, old_status=old, new_status=new, changed_at=when)
+            old, when = new, min(apt.end, when + timedelta(days=rng.randint(0, 7)))
+
+
+def _insert_appointments(rows, chunk_size, rng, progress):
+    total = history = 0
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        with transaction.atomic():
+            Appointment.objects.bulk_create(chunk)
+            history += len(AppointmentStatusHistory.objects.bulk_create(list(_history(chunk, rng))))
+        total += len(chunk)
+        if progress:
+            progress("citas", total)
+    return total, history
+
+
+# ============================
+#  ORQUESTACIÓN
+# ============================
+def generate(scale="small", seed=42, years=3, cancel_rate=0.1, anchor=None,
+             chunk_size=CHUNK_SIZE, progress=None, **overrides):
+    """
+    Genera un conjunto completo. `overrides` ajusta los volúmenes de SCALES
+    (event_types, events, bookings, staff, clients, appointments).
+    Devuelve un dict con cuántas filas se insertaron por tabla.
+    """
+    sizes = {**SCALES[scale], **{k: v for k, v in overrides.items() if v is not None}}
+    rng = random.Random(seed)
+    anchor = anchor or timezone.localdate()
+    first_day = anchor - timedelta(days=365 * years)
+    last_day = anchor + timedelta(days=60)
+    counts = {}
+
+    types = EventType.objects.bulk_create(_event_types(sizes["event_types"], rng))
+    counts["event_types"] = len(types)
+
+    # Las citas solo usan personas de esta corrida (las existentes podrían traslaparse)
+    last_staff = Staff.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    last_client = Client.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    with _historical(Staff), _historical(Client):
+        counts["staff"] = _insert(Staff, _people(Staff, sizes["staff"], rng, first_day, anchor), chunk_size, progress)
+        counts["clients"] = _insert(Client, _people(Client, sizes["clients"], rng, first_day, anchor),
+                                    chunk_size, progress)
+
+    per_event = sizes["bookings"] / max(sizes["events"], 1)
+    events, rows = [], _events(sizes["events"], types, rng, first_day, anchor, per_event)
+    while batch := list(islice(rows, chunk_size)):
+        with transaction.atomic():
+            events += Event.objects.bulk_create(batch)
+    counts["events"] = len(events)
+
+    taken = {}
+    with _historical(Booking):
+        counts["bookings"] = _insert(Booking, _bookings(events, sizes["bookings"], cancel_rate, rng, taken, _local(anchor, 0)),
+                                     chunk_size, progress)
+    for event in events:
+        event.seats_taken = taken.get(event.pk, 0)
+    Event.objects.bulk_update(events, ["seats_taken"], batch_size=chunk_size)
+
+    staff = list(Staff.objects.filter(pk__gt=last_staff, active=True).only("pk", "allow_multiple", "available_days"))
+    clients = list(Client.objects.filter(pk__gt=last_client, active=True).values_list("pk", flat=True))
+    if not clients:
+        staff = []
+    with _historical(AppointmentStatusHistory, "changed_at"):
+        counts["appointments"], counts["history"] = _insert_appointments(
+            _appointments(staff, clients, types, sizes["appointments"], rng, first_day, last_day, anchor),
+            chunk_size, rng, progress,
+        )
+
+    # bulk_create no dispara señales: acumulados y caché a mano
+    from .rollups import rebuild
+    rebuild()
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    years_touched = {d.year for d in days}
+    invalidate_year_summary(*years_touched)
+    bump_agenda(days=days, years=years_touched, people=True, events=True)
+    return counts
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking, Event, EventStatus, EventType, OutboxJob, SeatsUnavailable
+
+
+class BookingAdminSeatsTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(user)
+        event_type = EventType.objects.create(name="Taller")
+        self.event = Event.objects.create(type=event_type, title="Taller", capacity=5,
+                                          start=timezone.now() + timedelta(days=2))
+        self.booking = Booking.objects.create(event=self.event, name="Ana", email="ana@example.com",
+                                              phone="5512345678", quantity=2)
+        self.url = reverse("admin:bookings_booking_change", args=[self.booking.pk])
+
+    def post(self, quantity):
+        return self.client.post(self.url, {
+            "event": self.event.pk, "name": "Ana", "email": "ana@example.com",
+            "phone": "5512345678", "quantity": quantity,
+        })
+
+    def test_quantity_above_free_seats_is_a_form_error(self):
+        response = self.post(6)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "No hay suficientes lugares")
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.quantity, 2)
+
+    def test_quantity_within_free_seats_is_saved(self):
+        self.assertEqual(self.post(5).status_code, 302)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 5)
+
+    def test_lost_race_becomes_message(self):
+        with mock.patch.object(Event, "reserve_seats", side_effect=SeatsUnavailable("Sin cupo.")):
+            response = self.post(3)
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        messages = [str(m) for m in response.wsgi_request._messages]
+        self.assertEqual(messages, ["No se guardó la reserva: Sin cupo."])
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.quantity, 2)
+
+
+class CancelAndNotifyTests(TestCase):
+    def test_already_cancelled_events_are_skipped(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+        event_type = EventType.objects.create(name="Taller")
+        start = timezone.now() + timedelta(days=2)
+        live = Event.objects.create(type=event_type, title="Taller", start=start)
+        done = Event.objects.create(type=event_type, title="Charla", start=start, status=EventStatus.CANCELLED)
+
+        response = self.client.post(reverse("admin:bookings_event_changelist"), {
+            "action": "cancel_and_notify", "_selected_action": [live.pk, done.pk],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([str(m) for m in response.wsgi_request._messages],
+                         ["1 eventos cancelados; avisos encolados. 1 ya estaban cancelados."])
+        self.assertEqual(OutboxJob.objects.count(), 1)
@@ -0,0 +1,34 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+
+class BulkStatusPayloadTests(TestCase):
+    """Cuerpos mal formados responden 400 en JSON, nunca 500."""
+
+    def post(self, body):
+        return self.client.post(reverse("bookings:bulk_change_appointment_status"),
+                                data=body, content_type="application/json")
+
+    def assert_bad_request(self, body):
+        response = self.post(body)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    def test_malformed_json(self):
+        self.assert_bad_request("{ids: [1]")
+
+    def test_list_body(self):
+        self.assert_bad_request(json.dumps([1, 2]))
+
+    def test_ids_not_a_list(self):
+        self.assert_bad_request(json.dumps({"ids": "1", "status": "done"}))
+
+    def test_status_not_a_string(self):
+        self.assert_bad_request(json.dumps({"ids": [1], "status": ["done"]}))
+
+    def test_unknown_appointment_is_reported(self):
+        response = self.post(json.dumps({"ids": [999], "status": "done"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 0)
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Event, EventType
+
+
+class PublicFeedTests(TestCase):
+    def feed(self):
+        response = self.client.get(reverse("bookings:events_calendar"))
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_rescheduled_event_shows_new_date_only(self):
+        event_type = EventType.objects.create(name="Taller")
+        original = Event.objects.create(type=event_type, title="Taller", start=timezone.now() + timedelta(days=2))
+        moved = original.duplicate()
+        other = Event.objects.create(type=event_type, title="Charla", start=timezone.now() + timedelta(days=3))
+        body = self.feed()
+        self.assertIn(f"UID:event-{moved.pk}@", body)
+        self.assertIn(f"UID:event-{other.pk}@", body)
+        self.assertNotIn(f"UID:event-{original.pk}@", body)
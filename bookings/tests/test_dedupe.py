@@ -0,0 +1,81 @@
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings.dedupe import find_duplicate_groups, merge_clients, normalize_email, to_e164
+from bookings.models import Appointment, AppointmentSeries, Client, Staff
+
+from .test_scheduling import at
+
+
+class NormalizationTests(TestCase):
+    def test_to_e164(self):
+        cases = {
+            "55 1234 5678": "+525512345678",
+            "044 55 1234 5678": "+525512345678",
+            "045 55 1234 5678": "+525512345678",
+            "+52 1 55 1234 5678": "+525512345678",
+            "+52 55 1234 5678": "+525512345678",
+            "00 52 55 1234 5678": "+525512345678",
+            "00 1 212 555 0100": "+12125550100",
+            "12345": "",
+            "": "",
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw):
+                self.assertEqual(to_e164(raw), expected)
+
+    def test_normalize_email(self):
+        cases = {
+            "Juan.Perez+promo@GMail.com": "juanperez@gmail.com",
+            "juan.perez@googlemail.com": "juanperez@gmail.com",
+            "juan.perez+citas@hotmail.com": "juan.perez@hotmail.com",
+            "+solo@gmail.com": "",
+            "sin-arroba": "",
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw):
+                self.assertEqual(normalize_email(raw), expected)
+
+
+class DuplicateGroupsTests(TestCase):
+    def test_grouping_is_transitive(self):
+        a = Client.objects.create(name="Ana", phone="55 1234 5678")
+        b = Client.objects.create(name="Ana R.", phone="044 55 1234 5678", email="ana.ruiz@gmail.com")
+        c = Client.objects.create(name="Ana Ruiz", email="anaruiz+spa@gmail.com")
+        Client.objects.create(name="Otra", phone="33 9876 5432")
+        self.assertEqual(find_duplicate_groups(), [[a.pk, b.pk, c.pk]])
+
+
+class MergeClientsTests(TestCase):
+    def setUp(self):
+        self.staff = Staff.objects.create(name="Luis Pérez", role="Terapeuta", allow_multiple=True)
+        self.keep = Client.objects.create(name="Ana", phone="5512345678")
+        self.dup = Client.objects.create(name="Ana Ruiz", phone="5512345678", email="ana@example.com",
+                                         company="Spa Centro", notes="Alérgica", is_whatsapp=True)
+
+    def test_merge_fills_moves_and_deletes(self):
+        appointment = Appointment.objects.create(staff=self.staff, client=self.dup, start=at(10), duration_minutes=30)
+        series = AppointmentSeries.objects.create(staff=self.staff, client=self.dup, start=at(11), count=3)
+
+        self.assertEqual(merge_clients(self.keep.pk, [self.dup.pk]), 1)
+
+        self.keep.refresh_from_db()
+        self.assertEqual((self.keep.name, self.keep.email, self.keep.company, self.keep.notes),
+                         ("Ana", "ana@example.com", "Spa Centro", "Alérgica"))
+        self.assertTrue(self.keep.is_whatsapp)
+        appointment.refresh_from_db()
+        series.refresh_from_db()
+        self.assertEqual((appointment.client_id, series.client_id), (self.keep.pk, self.keep.pk))
+        self.assertFalse(Client.objects.filter(pk=self.dup.pk).exists())
+
+    def test_admin_action_needs_two_clients(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+        response = self.client.post(reverse("admin:bookings_client_changelist"), {
+            "action": "merge_selected", "_selected_action": [self.keep.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        [message] = list(response.wsgi_request._messages)
+        self.assertEqual(message.level, messages.WARNING)
+        self.assertEqual(Client.objects.count(), 2)
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking, Event, EventType
+
+
+class EventListQueryTests(TestCase):
+    """La lista pública sale en una sola consulta sin importar cuántos eventos haya."""
+
+    def setUp(self):
+        self.event_type = EventType.objects.create(name="Taller")
+
+    def add_events(self, count):
+        for i in range(count):
+            event = Event.objects.create(type=self.event_type, title=f"Taller {i}",
+                                         start=timezone.now() + timedelta(days=i + 1), capacity=10)
+            Booking.objects.create(event=event, name="Ana", email="ana@example.com", phone="5512345678", quantity=1)
+
+    def assert_list_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("bookings:event_list"))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_one_event(self):
+        self.add_events(1)
+        response = self.assert_list_queries()
+        self.assertContains(response, "Disponibles: 9")
+
+    def test_many_events(self):
+        self.add_events(25)
+        response = self.assert_list_queries()
+        self.assertEqual(len(response.context["events"]), 25)
+        self.assertContains(response, "Disponibles: 9", count=25)
+
+    def test_seats_available_reuses_annotation(self):
+        self.add_events(3)
+        events = list(Event.objects.with_availability())
+        with self.assertNumQueries(0):
+            self.assertEqual([e.seats_available for e in events], [9, 9, 9])
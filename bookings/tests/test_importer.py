@@ -0,0 +1,69 @@
+import io
+
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings.importer import ImportAborted, import_people
+from bookings.models import Appointment, Client, Staff
+
+from .test_scheduling import at
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode())
+
+
+class StaffImportExclusivityTests(TestCase):
+    def setUp(self):
+        self.staff = Staff.objects.create(name="Ana López", phone="5511112222", role="Terapeuta", allow_multiple=True)
+        self.client_ = Client.objects.create(name="Luis Pérez")
+
+    def book(self, start, minutes):
+        return Appointment.objects.create(staff=self.staff, client=self.client_, start=start, duration_minutes=minutes)
+
+    def import_staff(self):
+        return import_people("staff", csv_file("Nombre;Teléfono;Rol;Citas simultáneas\nAna López;5511112222;Terapeuta;no\n"),
+                             "staff.csv")
+
+    def test_overlapping_schedule_is_reported_as_row_error(self):
+        self.book(at(16), 60)
+        self.book(at(16, 30), 15)
+        report = self.import_staff()
+        self.assertEqual((report.updated, report.error_count), (0, 1))
+        self.assertEqual(report.errors[0][0], 2)
+        self.staff.refresh_from_db()
+        self.assertTrue(self.staff.allow_multiple)
+        self.assertFalse(Appointment.objects.filter(staff_exclusive=True).exists())
+
+    def test_clean_schedule_becomes_exclusive(self):
+        self.book(at(16), 60)
+        self.book(at(17), 30)
+        report = self.import_staff()
+        self.assertEqual((report.updated, report.error_count), (1, 0))
+        self.assertEqual(Appointment.objects.filter(staff_exclusive=True).count(), 2)
+
+    def test_client_import_is_unaffected(self):
+        report = import_people("client", csv_file("Nombre;Teléfono\nLuis Pérez;5533334444\n"), "clientes.csv")
+        self.assertEqual((report.created, report.error_count), (1, 0))
+
+
+class UnreadableFileTests(TestCase):
+    def test_corrupt_xlsx_is_a_value_error(self):
+        with self.assertRaisesMessage(ValueError, "no es un XLSX válido"):
+            import_people("client", io.BytesIO(b"not a zip"), "clientes.xlsx")
+
+    def test_bad_encoding_keeps_partial_report(self):
+        rows = "".join(f"Cliente {i};55000{i:05d}\n" for i in range(3000))
+        data = ("Nombre;Teléfono\n" + rows).encode() + "Peña;5599999999\n".encode("latin-1")
+        with self.assertRaises(ImportAborted) as ctx:
+            import_people("client", io.BytesIO(data), "clientes.csv", chunk_size=1000)
+        self.assertEqual(ctx.exception.report.created, Client.objects.count())
+        self.assertGreater(Client.objects.count(), 0)
+
+    def test_upload_view_shows_partial_report(self):
+        data = "Nombre;Teléfono\nAna;5511112222\n".encode() + "Peña;5599999999\n".encode("latin-1")
+        upload = io.BytesIO(data)
+        upload.name = "clientes.csv"
+        response = self.client.post(reverse("bookings:person_import"), {"type": "client", "file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "UTF-8")
@@ -0,0 +1,79 @@
+import json
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.template import Context, Engine
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+
+from bookings.instrumentation import THRESHOLD, QueryInstrumentationMiddleware, RequestStats, fingerprint
+from bookings.models import Appointment, Client, Staff
+
+from .test_scheduling import at
+
+# Plantilla con un N+1 clásico: cada vuelta lee la FK client (línea 3)
+ENGINE = Engine(loaders=[("django.template.loaders.locmem.Loader", {
+    "citas.html": "<ul>\n{% for a in appointments %}\n<li>{{ a.client.name }}</li>\n{% endfor %}\n</ul>",
+})])
+
+
+def appointment_list(request):
+    template = ENGINE.get_template("citas.html")
+    return HttpResponse(template.render(Context({"appointments": Appointment.objects.order_by("start")})))
+
+
+urlpatterns = [path("citas/", appointment_list)]
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_in_lists_collapse(self):
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+                         fingerprint('SELECT * FROM t WHERE id IN (%s)'))
+
+    def test_numbers_and_spaces(self):
+        self.assertEqual(fingerprint('SELECT *\n  FROM t  LIMIT 21 OFFSET 40'), "SELECT * FROM t LIMIT ? OFFSET ?")
+        self.assertEqual(fingerprint('SELECT "t"."col1" FROM t'), 'SELECT "t"."col1" FROM t')
+
+
+class RequestStatsTests(SimpleTestCase):
+    def test_threshold(self):
+        stats = RequestStats()
+        for _ in range(THRESHOLD - 1):
+            stats.record("SELECT * FROM t WHERE id = %s", 0.001)
+        stats.record("SELECT * FROM other", 0.001)
+        self.assertEqual(stats.repeated(), [])
+
+        stats.record("SELECT * FROM t WHERE id = %s", 0.001)
+        [row] = stats.repeated()
+        self.assertEqual((row["count"], row["sql"]), (THRESHOLD, "SELECT * FROM t WHERE id = %s"))
+        self.assertEqual(stats.queries, THRESHOLD + 1)
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled_middleware_opts_out(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(lambda request: HttpResponse())
+
+
+@override_settings(SQL_INSTRUMENTATION=True, ROOT_URLCONF=__name__)
+class MiddlewareTests(TestCase):
+    def setUp(self):
+        staff = Staff.objects.create(name="Ana López", role="Terapeuta", allow_multiple=True)
+        for i in range(THRESHOLD):
+            client = Client.objects.create(name=f"Cliente {i}")
+            Appointment.objects.create(staff=staff, client=client, start=at(9 + i), duration_minutes=30)
+
+    def test_template_loop_is_flagged(self):
+        with self.assertLogs("bookings.instrumentation", "WARNING") as logs:
+            response = self.client.get("/citas/")
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="SQL ({THRESHOLD + 1})"', timing)
+        self.assertIn('nplus1;desc="1 consultas repetidas"', timing)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], f"{__name__}.appointment_list")
+        [repeated] = line["n_plus_one"]
+        self.assertEqual(repeated["count"], THRESHOLD)
+        self.assertIn("bookings_client", repeated["sql"])
+        self.assertEqual(repeated["template"], "citas.html:3")
+        self.assertTrue(repeated["code"].startswith("bookings/tests/test_instrumentation.py:"))
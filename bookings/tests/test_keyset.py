@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from bookings.keyset import _decode, _encode, keyset_paginate
+from bookings.models import Booking, Event, EventType
+
+ORDERING = ("-created_at", "-id")
+
+
+class KeysetCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        event_type = EventType.objects.create(name="Taller")
+        event = Event.objects.create(type=event_type, title="Taller", start=timezone.now() + timedelta(days=3),
+                                     capacity=20)
+        base = timezone.now().replace(microsecond=500000)
+        for i in range(6):
+            booking = Booking.objects.create(event=event, name=f"Persona {i}", email=f"p{i}@example.com",
+                                             phone="5512345678")
+            # Todas en el mismo milisegundo, con microsegundos distintos
+            Booking.objects.filter(pk=booking.pk).update(created_at=base + timedelta(microseconds=i * 7))
+
+    def page(self, url=""):
+        request = RequestFactory().get("/panel/reservas/" + url)
+        return keyset_paginate(request, Booking.objects.all(), ORDERING, page_size=2)
+
+    def ids(self, page):
+        return [b.pk for b in page]
+
+    def test_cursor_round_trip_keeps_microseconds(self):
+        booking = Booking.objects.order_by("-created_at").first()
+        fields = [Booking._meta.get_field(name.lstrip("-")) for name in ORDERING]
+        values, backwards = _decode(_encode([booking.created_at, booking.pk], True), fields)
+        self.assertEqual(values, [booking.created_at, booking.pk])
+        self.assertTrue(backwards)
+
+    def test_forward_and_back_within_one_millisecond(self):
+        expected = list(Booking.objects.order_by(*ORDERING).values_list("pk", flat=True))
+        first = self.page()
+        second = self.page(first.next_url)
+        third = self.page(second.next_url)
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), expected)
+        self.assertFalse(third.has_next)
+        back = self.page(third.previous_url)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertEqual(self.ids(self.page(back.previous_url)), self.ids(first))
+        self.assertIn("cursor", QueryDict(second.previous_url[1:]))
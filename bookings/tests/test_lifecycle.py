@@ -0,0 +1,54 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings.lifecycle import close_stale_appointments, finish_past_events
+from bookings.models import Appointment, AppointmentStatusHistory, Client, Event, EventStatus, EventType, Staff
+
+from .test_scheduling import at
+
+
+class FinishPastEventsTests(TestCase):
+    def test_rescheduled_events_are_finished(self):
+        event_type = EventType.objects.create(name="Taller")
+        original = Event.objects.create(type=event_type, title="Taller", start=timezone.now() - timedelta(days=9))
+        moved = original.duplicate(new_date=timezone.now() - timedelta(days=2))
+        self.assertEqual(finish_past_events(timezone.now()), 2)
+        moved.refresh_from_db()
+        self.assertEqual(moved.status, EventStatus.FINISHED)
+
+
+class CloseStaleAppointmentsTests(TestCase):
+    def setUp(self):
+        staff = Staff.objects.create(name="Ana López", role="Terapeuta", allow_multiple=True)
+        client = Client.objects.create(name="Luis Pérez")
+        self.appointments = [
+            Appointment.objects.create(staff=staff, client=client, start=at(9 + i), duration_minutes=30,
+                                       status="confirmed")
+            for i in range(3)
+        ]
+
+    def history(self):
+        return set(AppointmentStatusHistory.objects.filter(old_status="confirmed", new_status="done")
+                   .values_list("appointment_id", flat=True))
+
+    def test_history_only_for_rows_the_update_moved(self):
+        raced = self.appointments[0]
+        real_update = QuerySet.update
+
+        def update(qs, **kwargs):
+            # Otra escritura gana la fila entre el SELECT y el UPDATE del barrido
+            if kwargs.get("status") == "done" and not Appointment.objects.filter(pk=raced.pk, status="cancelled").exists():
+                real_update(Appointment.objects.filter(pk=raced.pk), status="cancelled")
+            return real_update(qs, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", update):
+            counts = close_stale_appointments(at(23), transitions={"confirmed": "done"})
+
+        self.assertEqual(counts, {"confirmed": 2})
+        self.assertEqual(self.history(), {a.pk for a in self.appointments[1:]})
+        raced.refresh_from_db()
+        self.assertEqual(raced.status, "cancelled")
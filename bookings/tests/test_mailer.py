@@ -0,0 +1,162 @@
+"""
+PooledMailer contra un servidor SMTP simulado.
+----------------------------------------------
+StubSMTP reemplaza a smtplib.SMTP dentro del EmailBackend real de Django, así
+que se prueba el mismo camino que en producción (open → sendmail → close)
+sin red. El "servidor" es compartido entre conexiones y puede programarse
+para cortar la conexión o rechazar un destinatario.
+"""
+
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from bookings import jobs
+from bookings.mailer import PooledMailer
+from bookings.models import Booking, Event, EventType, JobStatus
+
+
+class StubServer:
+    def __init__(self):
+        self.delivered = []  # destinatarios aceptados, en orden
+        self.connections = 0
+        self.drop_before = set()  # destinatarios que cortan la conexión (una vez)
+        self.refuse = set()  # destinatarios rechazados siempre (550)
+        self.fail_before = set()  # destinatarios con error temporal (451, una vez)
+
+
+class StubSMTP:
+    server = None
+
+    def __init__(self, host, port, **kwargs):
+        self.server.connections += 1
+        self.open = True
+
+    def starttls(self, **kwargs):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        if not self.open:
+            raise smtplib.SMTPServerDisconnected("cerrada")
+        return 250, b"OK"
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if not self.open:
+            raise smtplib.SMTPServerDisconnected("cerrada")
+        rcpt = to_addrs[0]
+        if rcpt in self.server.drop_before:
+            self.server.drop_before.discard(rcpt)
+            self.open = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if rcpt in self.server.fail_before:
+            self.server.fail_before.discard(rcpt)
+            raise smtplib.SMTPDataError(451, b"Try again later")
+        if rcpt in self.server.refuse:
+            raise smtplib.SMTPRecipientsRefused({rcpt: (550, b"No such user")})
+        self.server.delivered.append(rcpt)
+        return {}
+
+    def quit(self):
+        self.open = False
+
+    def close(self):
+        self.open = False
+
+
+class StubBackend(EmailBackend):
+    connection_class = StubSMTP
+
+
+def stub_mailer(server, **kwargs):
+    StubSMTP.server = server
+    factory = lambda **kw: StubBackend(host="stub", port=25, username="", password="", use_tls=False, **kw)
+    kwargs.setdefault("batch_size", 7)
+    return PooledMailer(connection_factory=factory, **kwargs)
+
+
+def messages(count):
+    return [EmailMessage("Asunto", "Cuerpo", "app@example.com", [f"u{i:02d}@example.com"]) for i in range(count)]
+
+
+class PooledMailerTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StubServer()
+
+    def test_reuses_one_connection_across_batches(self):
+        mailer = stub_mailer(self.server)
+        self.assertEqual(mailer.send_messages(messages(50)), 50)
+        self.assertEqual(len(self.server.delivered), 50)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_recycles_connection_after_limit(self):
+        mailer = stub_mailer(self.server, messages_per_connection=20)
+        mailer.send_messages(messages(50))
+        self.assertEqual(self.server.connections, 3)
+
+    def test_dropped_connection_resends_only_the_rest(self):
+        self.server.drop_before.add("u03@example.com")
+        mailer = stub_mailer(self.server)
+        self.assertEqual(mailer.send_messages(messages(10)), 10)
+        self.assertEqual(self.server.delivered, [f"u{i:02d}@example.com" for i in range(10)])
+        self.assertEqual(self.server.connections, 2)
+
+    def test_refused_recipient_propagates_without_resending(self):
+        self.server.refuse.add("u03@example.com")
+        mailer = stub_mailer(self.server)
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            mailer.send_messages(messages(10))
+        self.assertEqual(self.server.delivered, ["u00@example.com", "u01@example.com", "u02@example.com"])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_data_error_is_not_treated_as_disconnect(self):
+        self.server.fail_before.add("u01@example.com")
+        mailer = stub_mailer(self.server)
+        with self.assertRaises(smtplib.SMTPDataError):
+            mailer.send_messages(messages(5))
+        self.assertEqual(self.server.delivered, ["u00@example.com"])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_skip_refused_continues_and_reports_progress(self):
+        self.server.refuse.add("u03@example.com")
+        mailer = stub_mailer(self.server)
+        accepted = []
+        sent = mailer.send_messages(messages(10), on_sent=lambda m: accepted.append(m.to[0]), skip_refused=True)
+        self.assertEqual(sent, 9)
+        self.assertEqual(accepted, self.server.delivered)
+        self.assertNotIn("u03@example.com", accepted)
+
+
+class EventCancelledJobTests(TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        event_type = EventType.objects.create(name="Taller")
+        self.event = Event.objects.create(type=event_type, title="Taller", start=timezone.now() + timedelta(days=3),
+                                          capacity=20)
+        for i in range(6):
+            Booking.objects.create(event=self.event, name=f"Persona {i}", email=f"u{i:02d}@example.com",
+                                   phone="5512345678")
+
+    def test_retry_resumes_after_last_accepted_recipient(self):
+        self.server.fail_before.add("u03@example.com")
+        job = jobs.enqueue_event_cancelled(self.event, "Lluvia")
+        with mock.patch("bookings.mailer.mailer", stub_mailer(self.server, batch_size=2)):
+            self.assertEqual(jobs.run_job(job), JobStatus.PENDING)
+            job.refresh_from_db()
+            self.assertEqual(job.payload["notified_through"], "u02@example.com")
+            self.assertEqual(jobs.run_job(job), JobStatus.DONE)
+        self.assertEqual(self.server.delivered, [f"u{i:02d}@example.com" for i in range(6)])
+
+    def test_refused_recipient_does_not_fail_the_job(self):
+        self.server.refuse.add("u02@example.com")
+        job = jobs.enqueue_event_cancelled(self.event)
+        with mock.patch("bookings.mailer.mailer", stub_mailer(self.server)):
+            self.assertEqual(jobs.run_job(job), JobStatus.DONE)
+        self.assertEqual(len(self.server.delivered), 5)
@@ -0,0 +1,14 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from bookings.query_plans import SUPPORTED_VENDORS, check_plans
+
+
+@skipUnless(connection.vendor in SUPPORTED_VENDORS, "EXPLAIN solo se interpreta en SQLite y PostgreSQL")
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        for label, plan, indexed in check_plans():
+            with self.subTest(label):
+                self.assertTrue(indexed, f"{label} recorre la tabla completa:\n{plan}")
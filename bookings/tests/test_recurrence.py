@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.test import TestCase
+
+from bookings.forms import AppointmentSeriesForm
+from bookings.models import Client, Staff
+from bookings.recurrence import MAX_OCCURRENCES, expand_occurrences
+
+from .test_scheduling import at
+
+
+class SeriesLimitTests(TestCase):
+    def setUp(self):
+        self.staff = Staff.objects.create(name="Ana López", role="Terapeuta")
+        self.client_ = Client.objects.create(name="Luis Pérez")
+        self.start = at(10)
+
+    def form(self, **data):
+        return AppointmentSeriesForm({
+            "client": self.client_.pk, "staff": self.staff.pk, "frequency": "weekly",
+            "start": self.start.strftime("%Y-%m-%dT%H:%M"), "duration_minutes": 30, **data,
+        })
+
+    def test_count_above_limit_is_rejected(self):
+        form = self.form(count=MAX_OCCURRENCES + 1)
+        self.assertFalse(form.is_valid())
+        self.assertIn("count", form.errors)
+        self.assertTrue(self.form(count=MAX_OCCURRENCES).is_valid())
+
+    def test_until_beyond_limit_is_rejected(self):
+        last = (self.start + timedelta(weeks=MAX_OCCURRENCES - 1)).date()
+        form = self.form(until=last + timedelta(days=7))
+        self.assertFalse(form.is_valid())
+        self.assertIn("until", form.errors)
+
+        form = self.form(until=last)
+        self.assertTrue(form.is_valid(), form.errors)
+        series = form.save(commit=False)
+        self.assertEqual(len(expand_occurrences(series)), MAX_OCCURRENCES)
+
+    def test_count_caps_a_long_until(self):
+        form = self.form(count=10, until=(self.start + timedelta(weeks=MAX_OCCURRENCES * 2)).date())
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(len(expand_occurrences(form.save(commit=False))), 10)
@@ -0,0 +1,61 @@
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.timezone import get_current_timezone, make_aware
+
+from bookings.models import Appointment, Client, ScheduleConflict, Staff
+from bookings.scheduling import exclusivity_overlaps, find_conflict
+
+
+def at(hour, minute=0, days=1):
+    day = timezone.localdate() + timedelta(days=days)
+    return make_aware(datetime.combine(day, time(hour, minute)), get_current_timezone())
+
+
+class StaffExclusivityTests(TestCase):
+    def setUp(self):
+        self.staff = Staff.objects.create(name="Ana López", role="Terapeuta", allow_multiple=True)
+        self.client_ = Client.objects.create(name="Luis Pérez")
+
+    def book(self, start, minutes):
+        return Appointment.objects.create(staff=self.staff, client=self.client_, start=start, duration_minutes=minutes)
+
+    def test_cannot_become_exclusive_with_overlapping_future_appointments(self):
+        self.book(at(16), 60)
+        self.book(at(16, 30), 15)
+        self.staff.allow_multiple = False
+        with self.assertRaises(ScheduleConflict):
+            self.staff.save()
+        with self.assertRaises(ValidationError) as ctx:
+            self.staff.full_clean()
+        self.assertIn("allow_multiple", ctx.exception.message_dict)
+        self.staff.refresh_from_db()
+        self.assertTrue(self.staff.allow_multiple)
+        self.assertFalse(Appointment.objects.filter(staff_exclusive=True).exists())
+
+    def test_becomes_exclusive_when_schedule_allows_it(self):
+        self.book(at(16), 60)
+        self.book(at(17), 30)
+        self.staff.allow_multiple = False
+        self.staff.save()
+        self.assertEqual(Appointment.objects.filter(staff_exclusive=True).count(), 2)
+        self.assertIsNotNone(find_conflict(self.staff.pk, at(17, 15), at(17, 45)))
+
+    def test_cancelled_appointments_do_not_block_the_change(self):
+        self.book(at(16), 60)
+        overlap = self.book(at(16, 30), 15)
+        overlap.status = "cancelled"
+        overlap.save()
+        self.staff.allow_multiple = False
+        self.staff.save()
+        self.assertEqual(exclusivity_overlaps([self.staff.pk], timezone.now()), {})
+
+    def test_find_conflict_sees_long_appointment_behind_a_short_one(self):
+        # Traslape heredado (p. ej. datos anteriores a la regla) entre citas bloqueantes
+        long = self.book(at(16), 60)
+        self.book(at(16, 30), 15)
+        Appointment.objects.update(staff_exclusive=True)
+        self.assertEqual(find_conflict(self.staff.pk, at(16, 50), at(17, 30)), long)
+        self.assertIsNone(find_conflict(self.staff.pk, at(17), at(17, 30)))
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from bookings.models import Client
+
+
+class PersonLookupTests(TestCase):
+    """Búsqueda por prefijo de las claves normalizadas (name_key, phone_key, email_key)."""
+
+    def setUp(self):
+        Client.objects.create(name="Ángela Ruiz", phone="55 1234 5678", email="angela@example.com")
+        Client.objects.create(name="Andrés_Pérez", phone="33 9876 5432", email="andres@example.com")
+        Client.objects.create(name="Beatriz", phone="55 1200 0000", email="bea@example.com", active=False)
+
+    def lookup(self, q):
+        response = self.client.get(reverse("bookings:person_lookup", args=["client"]), {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [r["text"] for r in response.json()["results"]]
+
+    def test_name_prefix_ignores_accents_and_case(self):
+        self.assertEqual(self.lookup("ANGE"), ["Ángela Ruiz"])
+        self.assertEqual(self.lookup("an"), ["Andrés_Pérez", "Ángela Ruiz"])
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual(self.lookup("andrés_"), ["Andrés_Pérez"])
+        self.assertEqual(self.lookup("a%"), [])
+
+    def test_phone_prefix_skips_inactive(self):
+        self.assertEqual(self.lookup("55 12"), ["Ángela Ruiz"])
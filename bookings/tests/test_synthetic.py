@@ -0,0 +1,19 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.test import TestCase
+
+from bookings.models import Booking, Client, Staff
+from bookings.synthetic import generate
+
+
+class SyntheticDatasetTests(TestCase):
+    def test_generated_emails_are_valid(self):
+        generate(years=1, event_types=2, events=20, bookings=200, staff=5, clients=100, appointments=100)
+        invalid = []
+        for model in (Booking, Client, Staff):
+            for email in model.objects.exclude(email="").values_list("email", flat=True):
+                try:
+                    validate_email(email)
+                except ValidationError:
+                    invalid.append(email)
+        self.assertEqual(invalid, [])
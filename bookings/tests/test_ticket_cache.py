@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase
+from django.utils import timezone
+
+from bookings import ticket_cache
+from bookings.models import Booking, Event, EventType
+
+PDF_SIZE = 25
+
+
+class TicketCacheEvictionTests(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.storage = FileSystemStorage(location=location)
+        for target, value in [("storage", self.storage), ("MAX_BYTES", 1000)]:
+            patcher = mock.patch.object(ticket_cache, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        pdf = mock.patch.object(ticket_cache.weasyprint, "HTML")
+        pdf.start().return_value.write_pdf.return_value = b"x" * PDF_SIZE
+        self.addCleanup(pdf.stop)
+        cache.delete(ticket_cache.BYTES_KEY)
+
+        event_type = EventType.objects.create(name="Taller")
+        event = Event.objects.create(type=event_type, title="Taller", start=timezone.now() + timedelta(days=3),
+                                     capacity=100)
+        self.bookings = [
+            Booking.objects.create(event=event, name=f"Persona {i}", email=f"p{i}@example.com", phone="5512345678")
+            for i in range(60)
+        ]
+
+    def test_walks_storage_only_when_over_the_limit(self):
+        with mock.patch.object(ticket_cache, "evict", wraps=ticket_cache.evict) as evict:
+            for booking in self.bookings:
+                ticket_cache.get_ticket_pdf(booking)
+        # Primer boleto (contador vacío), luego al pasar de 1000 bytes (boleto 41)
+        # y cada 5 boletos después (margen de 1000 - 900 bytes): 5 recorridos en 60 escrituras
+        self.assertEqual(evict.call_count, 5)
+        self.assertEqual(cache.get(ticket_cache.BYTES_KEY), 1000)
+        stored = list(ticket_cache._walk())
+        self.assertEqual(len(stored), 40)
+        # Se expulsaron los menos usados: los primeros boletos
+        oldest = ticket_cache._booking_dir(self.bookings[0]) + "/"
+        self.assertFalse(any(name.startswith(oldest) for name in stored))
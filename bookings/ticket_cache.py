@@ -0,0 +1,166 @@
+"""
+Caché de boletos PDF renderizados.
+----------------------------------
+WeasyPrint tarda cientos de ms por boleto; el HTML de origen se renderiza en
+pocos ms. Por eso la clave de caché es el hash del HTML (+ base_url): si cambia
+la reserva, el evento o la plantilla, cambia el hash y se genera un PDF nuevo.
+
+Estructura en el storage:
+    event_<id>/booking_<id>/<sha256>.pdf
+
+  • Invalidación explícita (signals.py): al guardar/eliminar una reserva o un
+    evento se borra su carpeta para liberar espacio de inmediato.
+  • Límite de tamaño (TICKET_CACHE_MAX_BYTES): cada escritura suma su tamaño
+    a un contador en la caché de Django; solo cuando pasa el límite se
+    recorre el storage (evict) y se expulsan los archivos menos usados
+    recientemente (cada acierto actualiza su mtime) hasta quedar en
+    LOW_WATER del límite. Así el recorrido completo ocurre una vez cada
+    ~10 % del límite escrito, no en cada boleto. Las invalidaciones no restan
+    del contador: solo adelantan el siguiente recorrido, que lo recalcula.
+    Con LocMemCache cada proceso lleva su propio contador.
+
+Storage configurable con STORAGES["tickets"]; por defecto, disco local en
+TICKET_CACHE_DIR.
+"""
+
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, InvalidStorageError, storages
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+import weasyprint
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = getattr(settings, "TICKET_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+# Fracción del límite a la que se baja al expulsar (margen antes del siguiente recorrido)
+LOW_WATER = 0.9
+BYTES_KEY = "ticket_cache:bytes"
+
+
+def _get_storage():
+    try:
+        return storages["tickets"]
+    except InvalidStorageError:
+        location = getattr(settings, "TICKET_CACHE_DIR", settings.BASE_DIR / "ticket_cache")
+        return FileSystemStorage(location=location)
+
+
+storage = SimpleLazyObject(_get_storage)
+
+
+def _event_dir(event_id):
+    return f"event_{event_id}"
+
+
+def _booking_dir(booking):
+    return f"{_event_dir(booking.event_id)}/booking_{booking.pk}"
+
+
+def _touch(name):
+    """Marca el archivo como usado recientemente (solo storages locales)."""
+    try:
+        os.utime(storage.path(name))
+    except (NotImplementedError, OSError):
+        pass
+
+
+# ============================
+#  API PÚBLICA
+# ============================
+def get_ticket_pdf(booking, template_name="bookings/booking_success.html", base_url=None):
+    """
+    Devuelve el nombre (dentro de `storage`) del PDF del boleto, renderizándolo
+    solo si no existe una versión para el contenido actual.
+    """
+    html = render_to_string(template_name, {"booking": booking})
+    digest = hashlib.sha256(f"{base_url or ''}\0{html}".encode("utf-8")).hexdigest()
+    name = f"{_booking_dir(booking)}/{digest}.pdf"
+
+    if storage.exists(name):
+        _touch(name)
+        return name
+
+    pdf = weasyprint.HTML(string=html, base_url=base_url).write_pdf()
+    name = storage.save(name, ContentFile(pdf))
+    _record_write(len(pdf))
+    return name
+
+
+def get_ticket_pdf_bytes(booking, template_name="bookings/booking_success.html", base_url=None):
+    name = get_ticket_pdf(booking, template_name, base_url)
+    with storage.open(name, "rb") as fh:
+        return fh.read()
+
+
+def invalidate_booking(booking):
+    _delete_tree(_booking_dir(booking))
+
+
+def invalidate_event(event_id):
+    _delete_tree(_event_dir(event_id))
+
+
+# ============================
+#  MANTENIMIENTO
+# ============================
+def _walk(path=""):
+    try:
+        dirs, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for f in files:
+        yield f"{path}/{f}" if path else f
+    for d in dirs:
+        yield from _walk(f"{path}/{d}" if path else d)
+
+
+def _delete_tree(path):
+    for name in list(_walk(path)):
+        storage.delete(name)
+
+
+def _record_write(size):
+    try:
+        total = cache.incr(BYTES_KEY, size)
+    except ValueError:
+        total = None  # contador perdido (caché reiniciada): recalcular recorriendo
+    if total is None or total > MAX_BYTES:
+        evict()
+
+
+def evict(max_bytes=None):
+    """
+    Recorre el storage y, si pasa de `max_bytes` (por defecto MAX_BYTES), expulsa
+    los PDFs menos usados hasta LOW_WATER × max_bytes. Fija el contador al total
+    real y lo devuelve.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_BYTES
+    entries = []
+    total = 0
+    for name in _walk():
+        try:
+            size = storage.size(name)
+            mtime = storage.get_modified_time(name)
+        except (FileNotFoundError, NotImplementedError):
+            continue
+        entries.append((mtime, size, name))
+        total += size
+
+    if total > max_bytes:
+        entries.sort()
+        for _, size, name in entries:
+            if total <= max_bytes * LOW_WATER:
+                break
+            storage.delete(name)
+            total -= size
+            logger.info("Boleto en caché expulsado: %s", name)
+
+    cache.set(BYTES_KEY, total, None)
+    return total
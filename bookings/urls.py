@@ -8,7 +8,7 @@ Contiene todas las rutas públicas y funcionales del módulo de:
 """
 
 from django.urls import path
-from . import views, views_appointments, views_persons
+from . import views, views_appointments, views_calendar, views_persons
 
 # Nombre de espacio para el módulo
 app_name = "bookings"
@@ -32,18 +32,34 @@ urlpatterns = [
     # ==========================
     path("agenda/", views_appointments.agenda, name="agenda"),
     path("agenda/semanal/", views_appointments.agenda_semanal, name="agenda_semanal"),
+    path("agenda/huecos/", views_appointments.free_slots, name="free_slots"),
 
     # Citas (CRUD)
     path("appointment/new/", views_appointments.create_appointment, name="create_appointment"),
     path("appointment/<int:pk>/edit/", views_appointments.edit_appointment, name="edit_appointment"),
     path("appointment/<int:pk>/delete/", views_appointments.delete_appointment, name="delete_appointment"),
     path("appointment/<int:pk>/status/<str:status>/", views_appointments.change_appointment_status, name="change_appointment_status"),
+    path("appointment/status/bulk/", views_appointments.bulk_change_appointment_status, name="bulk_change_appointment_status"),
+
+    # Series recurrentes
+    path("appointment/series/new/", views_appointments.create_series, name="create_series"),
+    path("appointment/series/<int:pk>/edit/", views_appointments.edit_series, name="edit_series"),
+    path("appointment/series/<int:pk>/cancel/", views_appointments.cancel_series, name="cancel_series"),
+
+    # ==========================
+    # 📆 Feeds iCalendar
+    # ==========================
+    path("calendario/eventos.ics", views_calendar.events_calendar, name="events_calendar"),
+    path("calendario/tipo/<int:type_id>.ics", views_calendar.event_type_calendar, name="event_type_calendar"),
+    path("calendario/staff/<int:pk>/<str:token>.ics", views_calendar.staff_calendar, name="staff_calendar"),
 
     # ==========================
     # 👥 Personas (Clientes / Staff)
     # ==========================
     path("personas/", views_persons.person_list, name="person_list"),
     path("personas/nueva/", views_persons.person_form, name="person_form"),
+    path("personas/importar/", views_persons.person_import, name="person_import"),
+    path("personas/buscar/<str:kind>/", views_persons.person_lookup, name="person_lookup"),
  
     path("personas/<int:pk>/editar/", views_persons.person_edit, name="person_edit"),
 
@@ -0,0 +1,65 @@
+import logging
+
+from django.core.mail import EmailMessage
+
+from .mailer import send_messages
+from .ticket_cache import get_ticket_pdf_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def build_booking_email(booking):
+    """Arma el correo de confirmación con el boleto PDF adjunto. Propaga cualquier error."""
+    pdf = get_ticket_pdf_bytes(booking, "bookings/booking_email.html")
+
+    email = EmailMessage(
+        subject=f"Confirmación de reserva: {booking.event.title}",
+        body="Gracias por tu reserva. Adjuntamos tu boleto.",
+        to=[booking.email],
+    )
+    email.attach(f"Boleto_{booking.confirmation_code}.pdf", pdf, "application/pdf")
+    return email
+
+
+def build_event_cancelled_emails(event, reason=None, after=None):
+    """
+    Un correo por reserva activa del evento cancelado (para envío masivo), en
+    orden de correo; `after` omite los destinatarios hasta ese correo inclusive.
+    """
+    body = f"Lamentamos informarte que el evento «{event.title}» fue cancelado."
+    if reason:
+        body += f"\n\nMotivo: {reason}"
+    recipients = event.bookings.filter(cancelled=False)
+    if after:
+        recipients = recipients.filter(email__gt=after)
+    recipients = (
+        recipients.order_by("email")
+        .values_list("email", flat=True)
+        .distinct()
+        .iterator(chunk_size=500)
+    )
+    for address in recipients:
+        yield EmailMessage(subject=f"Evento cancelado: {event.title}", body=body, to=[address])
+
+
+def send_booking_email_safe(booking):
+    """Genera PDF y envía correo, pero nunca lanza excepción."""
+    # Intentar generar PDF (o reutilizarlo desde la caché)
+    try:
+        pdf = get_ticket_pdf_bytes(booking, "bookings/booking_email.html")
+    except Exception:
+        logger.exception("Error generando PDF (reserva %s)", booking.pk)
+        pdf = None
+
+    # Intentar enviar correo
+    try:
+        email = EmailMessage(
+            subject=f"Confirmación de reserva: {booking.event.title}",
+            body="Gracias por tu reserva. Adjuntamos tu boleto.",
+            to=[booking.email],
+        )
+        if pdf:
+            email.attach(f"Boleto_{booking.confirmation_code}.pdf", pdf, "application/pdf")
+        send_messages([email])
+    except Exception:
+        logger.exception("Error enviando correo (reserva %s)", booking.pk)
@@ -2,11 +2,11 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import ListView
 from django.urls import reverse
 from django.contrib import messages
-from django.http import HttpResponse
-from django.template.loader import render_to_string
+from django.http import FileResponse
 from django.core.mail import EmailMessage
-import weasyprint
 
+from . import ticket_cache
+from .mailer import send_messages
 from .models import Event, Booking
 from .forms import BookingForm
 
@@ -18,18 +18,19 @@ class EventListView(ListView):
     model = Event
     template_name = "bookings/event_list.html"
     context_object_name = "events"
-    queryset = Event.objects.order_by("start").all()
+    queryset = Event.objects.with_availability().order_by("start")
 
 # ============================
 #  DETALLE / RESERVA DE EVENTO
 # ============================
 import uuid
-import traceback
+from django.db import transaction
 from django.shortcuts import get_object_or_404, render
 from django.contrib import messages
 from django.urls import reverse
-from .models import Event, Booking
+from .models import Event, Booking, SeatsUnavailable
 from .forms import BookingForm
+from .jobs import enqueue_booking_email
 
 
 def event_detail(request, pk):
@@ -44,20 +45,15 @@ def event_detail(request, pk):
         if not booking.confirmation_code:
             booking.confirmation_code = uuid.uuid4()
 
-        # Validar cupos
-        if booking.quantity > event.seats_available:
+        # Validar cupos: la reserva ocupa lugares con un UPDATE condicional atómico.
+        # El correo/PDF se encola en la misma transacción y lo envía `run_outbox`.
+        try:
+            with transaction.atomic():
+                booking.save()
+                enqueue_booking_email(booking)
+        except SeatsUnavailable:
             form.add_error("quantity", "No hay suficientes lugares disponibles.")
         else:
-            booking.save()
-
-            # Intentar envío de correo/PDF
-            try:
-                from .utils import send_booking_email_safe
-                send_booking_email_safe(booking)
-            except Exception:
-                print("⚠️ Error enviando correo o generando PDF:")
-                print(traceback.format_exc())
-
             # URLs para redirecciones
             success_url = reverse("bookings:booking_success", args=[booking.confirmation_code])
             list_url = reverse("bookings:event_list")
@@ -86,28 +82,29 @@ def booking_success(request, code):
 #  GENERAR PDF
 # ============================
 def booking_ticket_pdf(request, code):
-    booking = get_object_or_404(Booking, confirmation_code=code)
-    html = render_to_string("bookings/booking_success.html", {"booking": booking})
-    pdf = weasyprint.HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
-
-    response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="boleto_{booking.confirmation_code}.pdf"'
-    return response
+    booking = get_object_or_404(Booking.objects.select_related("event"), confirmation_code=code)
+    name = ticket_cache.get_ticket_pdf(booking, base_url=request.build_absolute_uri())
+
+    return FileResponse(
+        ticket_cache.storage.open(name, "rb"),
+        as_attachment=True,
+        filename=f"boleto_{booking.confirmation_code}.pdf",
+        content_type="application/pdf",
+    )
 
 
 # ============================
 #  CORREO CON PDF
 # ============================
 def send_booking_email(booking):
-    html = render_to_string("bookings/booking_email.html", {"booking": booking})
-    pdf = weasyprint.HTML(string=html).write_pdf()
+    pdf = ticket_cache.get_ticket_pdf_bytes(booking, "bookings/booking_email.html")
     email = EmailMessage(
         subject=f"🎟️ Confirmación de reserva: {booking.event.title}",
         body="Gracias por tu reserva. Te enviamos tu boleto adjunto en PDF.",
         to=[booking.email],
     )
     email.attach(f"Boleto_{booking.confirmation_code}.pdf", pdf, "application/pdf")
-    email.send()
+    send_messages([email])
 
 
 # ============================
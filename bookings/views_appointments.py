@@ -2,15 +2,22 @@
 
 from datetime import date, datetime, timedelta
 import calendar
+import json
 from collections import defaultdict
 from django.contrib import messages
-from django.db.models import Count, Prefetch, Q
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from django.utils.timezone import now, get_current_timezone, make_aware
-from .models import Staff, Appointment, AppointmentStatusHistory
-from .forms import AppointmentForm
+from django.utils.timezone import now, get_current_timezone, localdate, localtime, make_aware
+from .models import Staff, Appointment, AppointmentSeries, AppointmentStatusHistory, ScheduleConflict
+from . import recurrence
+from .forms import AppointmentForm, AppointmentSeriesForm, SeriesEditForm
+from .agenda_cache import (
+    bump_agenda, cached_agenda, day_scopes, invalidate_year_summary, year_scope, year_summary,
+)
+from .scheduling import day_start, find_conflict, free_slots as find_free_slots
 
 # ---- Opcional: locale (evitar crash en Windows) ----
 import locale
@@ -31,6 +38,24 @@ ALLOWED = {
     "done":      set(),
 }
 
+# ---- Cambio de estado masivo: máximo de citas por petición ----
+BULK_STATUS_MAX_IDS = 500
+
+
+def _transition_error(old, new, start):
+    """Motivo por el que no se permite old → new, o None si es válido."""
+    if new == "pending" and start <= now():
+        return "No se puede volver a pendiente una cita pasada."
+    if old == "done" and new != "done":
+        return "No se puede modificar una cita atendida."
+    if new not in ALLOWED.get(old, set()):
+        return "Transición de estado no permitida."
+    return None
+
+# ---- Vista mensual: máximo de citas visibles por celda (el resto se resume) ----
+MONTH_BADGES_PER_DAY = 4
+
+
 # ---- Helper: a dónde regresar después de crear/editar/accionar ----
 def _resolve_next(request, fallback_name="bookings:agenda_semanal"):
     return (
@@ -54,16 +79,25 @@ def agenda(request):
     """Tablero diario de citas — versión optimizada e interiorista digital."""
 
     # --- Día seleccionado: ?date=YYYY-MM-DD o hoy ---
-    today = now().date()
+    today = localdate()
     day_str = request.GET.get("date")
     try:
         selected_day = date.fromisoformat(day_str) if day_str else today
     except ValueError:
         selected_day = today
 
-    # --- Solo citas del día seleccionado ---
+    # --- Fragmento cacheado por versión del día (ver agenda_cache.py) ---
+    return cached_agenda(
+        request, day_scopes([selected_day]),
+        lambda: _render_agenda(request, today, selected_day),
+    )
+
+
+def _render_agenda(request, today, selected_day):
+    # --- Solo citas del día seleccionado (rango [00:00, 00:00 siguiente) indexable) ---
     todays_appointments = Appointment.objects.filter(
-        start__date=selected_day
+        start__gte=day_start(selected_day),
+        start__lt=day_start(selected_day + timedelta(days=1)),
     ).select_related("client", "staff").order_by("start")
 
     # --- Staff + Prefetch de citas del día ---
@@ -101,32 +135,40 @@ def agenda(request):
 # ====================================
 def agenda_semanal(request):
     view_type = request.GET.get("view", "week")
-    today = now().date()
+    today = localdate()
 
-    # ----- AÑO -----
+    # Fragmento cacheado según lo que cubre la vista (ver agenda_cache.py)
+    return cached_agenda(
+        request, _agenda_scopes(request, view_type, today),
+        lambda: _render_agenda_semanal(request, view_type, today),
+    )
+
+
+def _agenda_scopes(request, view_type, today):
+    """Versiones de caché de las que depende cada vista (mismo parseo que el render)."""
     if view_type == "year":
+        return [year_scope(int(request.GET.get("year", today.year)))]
+    if view_type == "month":
         year = int(request.GET.get("year", today.year))
-        months = []
-        for m in range(1, 13):
-            first_day = date(year, m, 1)
-            _, last_day = calendar.monthrange(year, m)
-            last_date = date(year, m, last_day)
-
-            qs = Appointment.objects.filter(start__date__range=[first_day, last_date])
-            agg = qs.aggregate(
-                total=Count("id"),
-                pending=Count("id", filter=Q(status="pending")),
-                confirmed=Count("id", filter=Q(status="confirmed")),
-                cancelled=Count("id", filter=Q(status="cancelled")),
-                done=Count("id", filter=Q(status="done")),
-            )
+        month = int(request.GET.get("month", today.month))
+        _, last_day = calendar.monthrange(year, month)
+        return day_scopes(date(year, month, d) for d in range(1, last_day + 1))
+    if view_type == "day":
+        return day_scopes([date.fromisoformat(request.GET.get("date", today.isoformat()))])
 
-            months.append({
-                "year": year,
-                "month": m,
-                "name": calendar.month_name[m],  # Nombre del mes (puede salir en inglés según locale)
-                "count": agg["total"] or 0,
-            })
+    anchor_str = request.GET.get("date")
+    anchor = date.fromisoformat(anchor_str) if anchor_str else today
+    offset = int(request.GET.get("week", 0))
+    start_of_week = (anchor - timedelta(days=anchor.weekday())) + timedelta(weeks=offset)
+    return day_scopes(start_of_week + timedelta(days=i) for i in range(7))
+
+
+def _render_agenda_semanal(request, view_type, today):
+    # ----- AÑO -----
+    if view_type == "year":
+        year = int(request.GET.get("year", today.year))
+        # Una consulta agrupada por mes/estado, cacheada por año (ver agenda_cache.py)
+        months = year_summary(year)
 
         context = {"view": "year", "year": year, "months": months, "today": today}
 
@@ -144,15 +186,32 @@ def agenda_semanal(request):
         prev_month = (first_day - timedelta(days=1)).replace(day=1)
         next_month = (first_day + timedelta(days=32)).replace(day=1)
 
-        citas = Appointment.objects.filter(start__date__range=[days[0], days[-1]])
+        # Citas agrupadas por fecha local en el servidor: solo las columnas que pinta la celda
+        citas = (
+            Appointment.objects.filter(start__gte=day_start(days[0]), start__lt=day_start(next_month))
+            .order_by("start")
+            .values("id", "start", "status", "client__name")
+        )
+        citas_por_dia = defaultdict(list)
+        for a in citas:
+            citas_por_dia[localtime(a["start"]).date()].append(a)
+
+        month_days = []
+        for d in days:
+            del_dia = citas_por_dia.get(d, [])
+            month_days.append({
+                "date": d,
+                "count": len(del_dia),
+                "citas": del_dia[:MONTH_BADGES_PER_DAY],
+                "more": max(0, len(del_dia) - MONTH_BADGES_PER_DAY),
+            })
 
         context = {
             "view": "month",
             "year": year,
             "month": month,
             "month_name": calendar.month_name[month],
-            "days": days,
-            "citas": citas,
+            "month_days": month_days,
             "today": today,
             "prev_month": prev_month,
             "next_month": next_month,
@@ -166,7 +225,8 @@ def agenda_semanal(request):
 
         # Prefetch SOLO citas del día para cada staff
         todays_appointments = Appointment.objects.filter(
-            start__date=selected
+            start__gte=day_start(selected),
+            start__lt=day_start(selected + timedelta(days=1)),
         ).select_related("client", "staff").order_by("start")
 
         staff_list = Staff.objects.prefetch_related(
@@ -200,12 +260,16 @@ def agenda_semanal(request):
         start_of_week = (anchor - timedelta(days=anchor.weekday())) + timedelta(weeks=offset)
         days = [start_of_week + timedelta(days=i) for i in range(7)]
 
-        appointments = Appointment.objects.filter(start__date__range=[days[0], days[-1]]).select_related("client")
+        appointments = Appointment.objects.filter(
+            start__gte=day_start(days[0]),
+            start__lt=day_start(days[-1] + timedelta(days=1)),
+        ).select_related("client")
 
         # Agrupar por día/hora
         citas_por_dia_hora = defaultdict(lambda: defaultdict(list))
         for a in appointments:
-            citas_por_dia_hora[a.start.date()][a.start.hour].append(a)
+            local_start = localtime(a.start)
+            citas_por_dia_hora[local_start.date()][local_start.hour].append(a)
 
         hours = list(range(8, 21))
         context = {
@@ -228,8 +292,13 @@ def create_appointment(request):
     if request.method == "POST":
         form = AppointmentForm(request.POST)
         if form.is_valid():
-            form.save()
-            return redirect(next_url)
+            try:
+                form.save()
+            except ScheduleConflict as exc:
+                # Otra cita ocupó el horario entre la validación y el guardado
+                form.add_error("start", str(exc))
+            else:
+                return redirect(next_url)
     else:
         initial = {}
         # Soporta ?date=YYYY-MM-DD o YYYY-MM-DDTHH:MM / :SS
@@ -260,8 +329,13 @@ def edit_appointment(request, pk):
     if request.method == "POST":
         form = AppointmentForm(request.POST, instance=apt)
         if form.is_valid():
-            form.save()
-            return redirect(next_url)
+            try:
+                form.save()
+            except ScheduleConflict as exc:
+                # Otra cita ocupó el horario entre la validación y el guardado
+                form.add_error("start", str(exc))
+            else:
+                return redirect(next_url)
     else:
         form = AppointmentForm(instance=apt)
 
@@ -271,6 +345,69 @@ def edit_appointment(request, pk):
         {"form": form, "is_edit": True, "cancel_url": next_url},
     )
 
+# =======================
+# SERIES RECURRENTES
+# =======================
+def create_series(request):
+    next_url = _resolve_next(request)
+    form = AppointmentSeriesForm(request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        try:
+            occurrences = recurrence.create_series(form.save(commit=False))
+        except ScheduleConflict as exc:
+            form.add_error(None, str(exc))
+        else:
+            messages.success(request, f"Serie creada con {len(occurrences)} citas.")
+            return redirect(next_url)
+
+    return render(
+        request,
+        "bookings/appointment_form.html",
+        {"form": form, "is_edit": False, "cancel_url": next_url,
+         "title": "Nueva serie de citas", "submit_label": "Crear serie"},
+    )
+
+
+def edit_series(request, pk):
+    """Cambia staff, duración o notas de todas las citas futuras de la serie."""
+    series = get_object_or_404(AppointmentSeries.objects.select_related("staff"), pk=pk)
+    next_url = _resolve_next(request)
+    form = SeriesEditForm(request.POST or None, initial={
+        "staff": series.staff_id, "duration_minutes": series.duration_minutes, "notes": series.notes,
+    })
+    if request.method == "POST" and form.is_valid():
+        data = form.cleaned_data
+        try:
+            updated = recurrence.update_series(
+                series,
+                staff=data["staff"] if data["staff"] and data["staff"].pk != series.staff_id else None,
+                duration_minutes=data["duration_minutes"] if data["duration_minutes"] != series.duration_minutes else None,
+                notes=data["notes"] if data["notes"] != series.notes else None,
+            )
+        except ScheduleConflict as exc:
+            form.add_error(None, str(exc))
+        else:
+            messages.success(request, f"Se actualizaron {updated} citas futuras.")
+            return redirect(next_url)
+
+    return render(
+        request,
+        "bookings/appointment_form.html",
+        {"form": form, "is_edit": True, "cancel_url": next_url,
+         "title": f"Editar serie: {series}", "submit_label": "Aplicar a citas futuras"},
+    )
+
+
+def cancel_series(request, pk):
+    if request.method != "POST":
+        return HttpResponseBadRequest("Usa POST para cancelar la serie.")
+    series = get_object_or_404(AppointmentSeries, pk=pk)
+    user = request.user if request.user.is_authenticated else None
+    cancelled = recurrence.cancel_series(series, user=user)
+    messages.success(request, f"Se cancelaron {cancelled} citas futuras de la serie.")
+    return redirect(_resolve_next(request))
+
+
 def delete_appointment(request, pk):
     next_url = _resolve_next(request)
     apt = get_object_or_404(Appointment, pk=pk)
@@ -287,16 +424,17 @@ def change_appointment_status(request, pk, status):
     old, new = apt.status, status
 
     # reglas de negocio
-    if new == "pending" and apt.start <= now():
-        return HttpResponseBadRequest("No se puede volver a pendiente una cita pasada.")
-    if old == "done" and new != "done":
-        return HttpResponseBadRequest("No se puede modificar una cita atendida.")
-    if new not in ALLOWED.get(old, set()):
-        return HttpResponseBadRequest("Transición de estado no permitida.")
+    error = _transition_error(old, new, apt.start)
+    if error:
+        return HttpResponseBadRequest(error)
 
-    # aplicar cambio
+    # aplicar cambio (post_save invalida la caché de la agenda para ese día)
     apt.status = new
-    apt.save()
+    try:
+        apt.save()
+    except ScheduleConflict as exc:
+        # p. ej. reactivar una cita cancelada cuyo horario ya se ocupó
+        return HttpResponseBadRequest(str(exc))
 
     # historial
     AppointmentStatusHistory.objects.create(
@@ -313,3 +451,115 @@ def change_appointment_status(request, pk, status):
     # Navegación normal
     next_url = _resolve_next(request)
     return redirect(next_url)
+
+
+
+def _bulk_status_payload(request):
+    """
+    ids + status desde JSON ({"ids": [...], "status": "done"}) o formulario.
+    Lanza ValueError si el cuerpo no tiene esa forma (JSON inválido incluido).
+    """
+    if request.content_type == "application/json":
+        data = json.loads(request.body or b"{}")
+        if not isinstance(data, dict) or not isinstance(data.get("ids") or [], list):
+            raise ValueError("Se esperaba {\"ids\": [...], \"status\": \"...\"}.")
+        return data.get("ids") or [], data.get("status")
+    return request.POST.getlist("ids"), request.POST.get("status")
+
+
+def _bulk_error(message):
+    return JsonResponse({"error": message}, status=400)
+
+
+def bulk_change_appointment_status(request):
+    """
+    Aplica un estado a muchas citas a la vez. Valida cada una contra ALLOWED en
+    memoria, hace un UPDATE por estado de origen y un bulk_create del historial,
+    todo en una transacción. Responde {"updated": n, "results": {id: "ok" | motivo}}.
+    """
+    if request.method != "POST":
+        return _bulk_error("Usa POST.")
+    try:
+        raw_ids, new = _bulk_status_payload(request)
+        ids = list(dict.fromkeys(int(pk) for pk in raw_ids))
+    except (ValueError, TypeError):
+        return _bulk_error("Parámetros inválidos.")
+    if not isinstance(new, str) or new not in ALLOWED:
+        return _bulk_error("Estado desconocido.")
+    if not ids or len(ids) > BULK_STATUS_MAX_IDS:
+        return _bulk_error(f"Envía entre 1 y {BULK_STATUS_MAX_IDS} citas.")
+
+    user = request.user if request.user.is_authenticated else None
+    results, by_old = {}, defaultdict(list)
+    reactivated = defaultdict(list)  # horarios recuperados en este lote, por staff
+
+    with transaction.atomic():
+        found = Appointment.objects.select_for_update().only(
+            "id", "start", "end", "status", "staff_id", "staff_exclusive"
+        ).in_bulk(ids)
+        for pk in ids:
+            apt = found.get(pk)
+            error = "La cita no existe." if apt is None else _transition_error(apt.status, new, apt.start)
+            # Reactivar una cancelada puede chocar con otra cita del mismo staff
+            if not error and apt.status == "cancelled" and apt.staff_exclusive:
+                taken = reactivated[apt.staff_id]
+                if find_conflict(apt.staff_id, apt.start, apt.end, exclude_pk=pk) or any(
+                    s < apt.end and apt.start < e for s, e in taken
+                ):
+                    error = "El staff ya tiene otra cita en ese horario."
+                else:
+                    taken.append((apt.start, apt.end))
+            if error:
+                results[pk] = error
+            else:
+                results[pk] = "ok"
+                by_old[apt.status].append(pk)
+
+        for old, pks in by_old.items():
+            Appointment.objects.filter(pk__in=pks, status=old).update(status=new)
+        AppointmentStatusHistory.objects.bulk_create([
+            AppointmentStatusHistory(appointment_id=pk, old_status=old, new_status=new, changed_by=user)
+            for old, pks in by_old.items() for pk in pks
+        ])
+
+    # UPDATE no dispara señales: invalidar la caché de agenda a mano
+    days = {localdate(found[pk].start) for pks in by_old.values() for pk in pks}
+    if days:
+        years = {d.year for d in days}
+        invalidate_year_summary(*years)
+        bump_agenda(days=days, years=years)
+
+    return JsonResponse({
+        "status": new,
+        "updated": sum(len(pks) for pks in by_old.values()),
+        "results": {str(pk): result for pk, result in results.items()},
+    })
+
+# =======================
+# HUECOS LIBRES (JSON)
+# =======================
+FREE_SLOTS_MAX_DAYS = 31
+FREE_SLOTS_MAX_LIMIT = 50
+
+
+def free_slots(request):
+    """
+    /agenda/huecos/?from=YYYY-MM-DD&to=YYYY-MM-DD&duration=60&limit=10&staff=1&staff=2
+    Primeros huecos libres del staff activo, ordenados por hora de inicio.
+    """
+    try:
+        first_day = date.fromisoformat(request.GET.get("from") or localdate().isoformat())
+        last_day = date.fromisoformat(request.GET.get("to") or (first_day + timedelta(days=7)).isoformat())
+        duration = int(request.GET.get("duration", 60))
+        limit = int(request.GET.get("limit", 10))
+        staff_ids = [int(pk) for pk in request.GET.getlist("staff")]
+    except ValueError:
+        return HttpResponseBadRequest("Parámetros inválidos.")
+
+    if last_day < first_day or (last_day - first_day).days > FREE_SLOTS_MAX_DAYS:
+        return HttpResponseBadRequest(f"El rango debe ser de 0 a {FREE_SLOTS_MAX_DAYS} días.")
+    if not (5 <= duration <= 24 * 60) or not (1 <= limit <= FREE_SLOTS_MAX_LIMIT):
+        return HttpResponseBadRequest("Duración o límite fuera de rango.")
+
+    slots = find_free_slots(first_day, last_day, duration_minutes=duration, limit=limit, staff_ids=staff_ids)
+    return JsonResponse({"slots": slots})
@@ -0,0 +1,147 @@
+# bookings/views_calendar.py
+"""
+Feeds iCalendar (.ics) para suscribirse desde el teléfono.
+----------------------------------------------------------
+  • /calendario/eventos.ics               → eventos públicos
+  • /calendario/tipo/<id>.ics             → eventos públicos de un tipo
+  • /calendario/staff/<id>/<token>.ics    → citas de un miembro del staff (privado)
+
+Solo se incluye la ventana [hoy − ICS_PAST_DAYS, hoy + ICS_FUTURE_DAYS].
+Los clientes de calendario consultan cada pocos minutos: el ETag sale de las
+versiones de la caché de agenda (agenda_cache), así que si nada cambió se
+responde 304 sin consultar la base de datos.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.utils.timezone import localdate
+from django.views.decorators.http import condition
+
+from . import ics
+from .agenda_cache import day_scopes, versions_etag
+from .models import Appointment, Event, EventStatus, EventType, Staff
+from .scheduling import day_start
+
+PAST_DAYS = getattr(settings, "ICS_PAST_DAYS", 30)
+FUTURE_DAYS = getattr(settings, "ICS_FUTURE_DAYS", 180)
+CHUNK_SIZE = 500
+
+_signer = signing.Signer(salt="bookings.staff-calendar")
+
+
+# ---- Helpers ----
+def _window():
+    today = localdate()
+    return today - timedelta(days=PAST_DAYS), today + timedelta(days=FUTURE_DAYS)
+
+
+def _window_days():
+    first, last = _window()
+    return [first + timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def staff_feed_token(staff_id):
+    return _signer.signature(str(staff_id))
+
+
+def staff_feed_url(staff_id):
+    return reverse("bookings:staff_calendar", args=[staff_id, staff_feed_token(staff_id)])
+
+
+def _ics_response(filename, name, vevents):
+    response = StreamingHttpResponse(
+        ics.stream_calendar(name, vevents), content_type="text/calendar; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
+
+
+# =======================
+# EVENTOS PÚBLICOS
+# =======================
+def _events_etag(request, type_id=None):
+    return versions_etag(["events"], "events", type_id, localdate())
+
+
+def _event_vevents(events):
+    for event in events.iterator(chunk_size=CHUNK_SIZE):
+        status = "CANCELLED" if event.status == EventStatus.CANCELLED else "CONFIRMED"
+        yield ics.vevent(
+            f"event-{event.pk}",
+            event.start,
+            event.start + timedelta(minutes=event.type.duration_minutes),
+            event.title,
+            event.description,
+            status,
+        )
+
+
+def _public_events(type_id=None):
+    first, last = _window()
+    qs = (
+        Event.objects.filter(start__gte=day_start(first), start__lt=day_start(last + timedelta(days=1)))
+        # Event.duplicate() crea la nueva fecha con estado POSTPONED: esa se publica
+        # y se omite la original a la que reemplaza
+        .exclude(Exists(Event.objects.filter(reference_event=OuterRef("pk"))))
+        .select_related("type")
+        .only("id", "title", "description", "start", "status", "type__duration_minutes")
+        .order_by("start")
+    )
+    if type_id is not None:
+        qs = qs.filter(type_id=type_id)
+    return qs
+
+
+@condition(etag_func=_events_etag)
+def events_calendar(request):
+    return _ics_response("eventos.ics", "Eventos", _event_vevents(_public_events()))
+
+
+@condition(etag_func=_events_etag)
+def event_type_calendar(request, type_id):
+    event_type = get_object_or_404(EventType, pk=type_id)
+    return _ics_response(
+        f"eventos-{type_id}.ics", f"Eventos · {event_type.name}", _event_vevents(_public_events(type_id))
+    )
+
+
+# =======================
+# CITAS DEL STAFF
+# =======================
+def _staff_etag(request, pk, token):
+    if not constant_time_compare(token, staff_feed_token(pk)):
+        return None  # la vista responde 404
+    return versions_etag(["people", *day_scopes(_window_days())], "staff", pk, localdate())
+
+
+@condition(etag_func=_staff_etag)
+def staff_calendar(request, pk, token):
+    if not constant_time_compare(token, staff_feed_token(pk)):
+        raise Http404
+    staff = get_object_or_404(Staff, pk=pk)
+    first, last = _window()
+    appointments = (
+        Appointment.objects.filter(
+            staff_id=pk, start__gte=day_start(first), start__lt=day_start(last + timedelta(days=1))
+        )
+        .select_related("client", "service")
+        .only("id", "start", "end", "status", "notes", "client__name", "service__name")
+        .order_by("start")
+    )
+
+    def vevents():
+        for apt in appointments.iterator(chunk_size=CHUNK_SIZE):
+            summary = f"{apt.client.name} · {apt.service.name}" if apt.service_id else apt.client.name
+            yield ics.vevent(
+                f"appointment-{apt.pk}", apt.start, apt.end, summary, apt.notes,
+                ics.APPOINTMENT_STATUS.get(apt.status, "CONFIRMED"),
+            )
+
+    return _ics_response(f"agenda-{pk}.ics", f"Agenda · {staff.name}", vevents())
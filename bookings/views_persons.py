@@ -1,8 +1,16 @@
 # bookings/views_persons.py
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db.models import Q
+from django.http import Http404, JsonResponse
 from .models import Client, Staff
 from .forms import ClientForm, StaffForm
+from .importer import MAX_ERRORS, import_people
+from .keyset import approximate_count, keyset_paginate
+from .search import person_prefix_filter
+
+# Typeahead: mínimo de caracteres y máximo de resultados por consulta
+LOOKUP_MIN_CHARS = 2
+LOOKUP_LIMIT = 20
 
 
 def person_list(request):
@@ -20,11 +28,14 @@ def person_list(request):
     if q:
         data = data.filter(Q(name__icontains=q) | Q(email__icontains=q) | Q(phone__icontains=q))
 
-    total = data.count()
+    total = approximate_count(data)
+    # Orden alfabético estable sobre el índice (name_key, id)
+    page = keyset_paginate(request, data, ("name_key", "id"))
 
     return render(request, "bookings/person_list.html", {
         "title": title,
-        "data": data,
+        "data": page.object_list,
+        "page": page,
         "show": show,
         "query": q,
         "total": total,
@@ -85,7 +96,7 @@ def person_form(request):
 
 
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Client, Staff
+from .models import Client, ScheduleConflict, Staff
 
 def person_edit(request, pk):
     """Edita una persona existente (cliente o staff)"""
@@ -127,7 +138,19 @@ def person_edit(request, pk):
             person.services = request.POST.get("services", "")
             person.allow_multiple = request.POST.get("allow_multiple") == "on"
             person.available_days = request.POST.getlist("available_days")
-            person.save()
+            try:
+                person.save()
+            except ScheduleConflict as exc:
+                # No puede volverse exclusivo con citas futuras traslapadas
+                return render(request, "bookings/person_form.html", {
+                    "type": type_param,
+                    "type_label": type_label,
+                    "is_edit": is_edit,
+                    "person": person,
+                    "week_days": week_days,
+                    "cancel_url": "/personas/",
+                    "error": str(exc),
+                })
 
         return redirect(f"/personas/?type={'clients' if type_param == 'client' else 'staff'}")
 
@@ -140,3 +163,53 @@ def person_edit(request, pk):
         "week_days": week_days,
         "cancel_url": "/personas/",
     })
+
+
+def person_lookup(request, kind):
+    """JSON para los selectores con búsqueda: ?q= prefijo de nombre, teléfono o correo (solo activos)."""
+    models = {"client": Client, "staff": Staff}
+    if kind not in models:
+        raise Http404
+    q = request.GET.get("q", "").strip()
+    if len(q) < LOOKUP_MIN_CHARS:
+        return JsonResponse({"results": []})
+
+    manager = models[kind].objects
+    rows = (
+        manager.filter(person_prefix_filter(q, using=manager.db))
+        .order_by("name_key")
+        .values("id", "name", "phone", "email")[:LOOKUP_LIMIT]
+    )
+    return JsonResponse({"results": [
+        {"id": r["id"], "text": r["name"], "detail": " · ".join(filter(None, [r["phone"], r["email"]]))}
+        for r in rows
+    ]})
+
+
+def person_import(request):
+    """Carga masiva de clientes o staff desde CSV/XLSX (?type=client|staff)."""
+    kind = request.POST.get("type") or request.GET.get("type", "client")
+    if kind not in ("client", "staff"):
+        kind = "client"
+    report, error = None, None
+
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        if not upload:
+            error = "Selecciona un archivo."
+        else:
+            try:
+                report = import_people(kind, upload, upload.name, dry_run=request.POST.get("dry_run") == "on")
+            except ValueError as exc:
+                # ImportAborted: lo guardado antes de que el archivo dejara de leerse
+                error, report = str(exc), getattr(exc, "report", None)
+
+    return render(request, "bookings/person_import.html", {
+        "type": kind,
+        "type_label": "Clientes" if kind == "client" else "Staff",
+        "report": report,
+        "error": error,
+        "dry_run": request.POST.get("dry_run") == "on",
+        "max_errors": MAX_ERRORS,
+        "cancel_url": f"/personas/?type={'clients' if kind == 'client' else 'staff'}",
+    })
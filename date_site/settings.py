@@ -23,12 +23,15 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "widget_tweaks",
+    "rest_framework",
     # tu app
     "bookings",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Opt-in con SQL_INSTRUMENTATION=True (si no, Django la descarta al arrancar)
+    "bookings.instrumentation.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -83,3 +86,40 @@ EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+
+# --- Caché (agenda, resúmenes) ---
+# LocMem es por proceso: con varios workers usar un backend compartido
+# (p. ej. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache, CACHE_LOCATION=redis://…)
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+AGENDA_CACHE_TIMEOUT = int(os.getenv("AGENDA_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+# --- API (Django REST framework) ---
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_PAGINATION_CLASS": "bookings.api.pagination.KeysetPagination",
+}
+
+
+# --- Instrumentación SQL por petición (bookings/instrumentation.py) ---
+# Server-Timing + una línea JSON por petición; marca consultas repetidas (posible N+1)
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "False") == "True"
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "bookings.instrumentation": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
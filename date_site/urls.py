@@ -17,4 +17,7 @@ urlpatterns = [
 
     # 🧩 Panel de administración visual (creación de eventos, reservas, métricas)
     path("panel/", include("bookings.admin_panel.urls")),
+
+    # 📱 API JSON de solo lectura (kiosco, app móvil)
+    path("api/", include("bookings.api.urls")),
 ]